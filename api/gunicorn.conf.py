@@ -0,0 +1,13 @@
+"""Gunicorn settings for the FastAPI app.
+
+Start with: gunicorn main:app -c gunicorn.conf.py
+"""
+
+import multiprocessing
+import os
+
+bind = os.environ.get("BIND", "0.0.0.0:8000")
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Job state and WebSocket updates go through Redis, so any worker can serve any job
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
@@ -0,0 +1,417 @@
+"""Job models, Redis-backed job state and the indexing/search job runners.
+
+Job state lives in Redis so that any API process can answer status requests
+and relay WebSocket updates, while the jobs themselves run in Celery workers
+(see worker.py).
+"""
+
+import asyncio
+import logging
+import os
+import sys
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+import httpx
+import orjson
+import redis.asyncio as aioredis
+from pydantic import BaseModel, field_serializer, field_validator
+
+# Add parent directory to path to import doc2mcp
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from doc2mcp.agents.doc_search import DocSearchAgent
+from doc2mcp.cache import PageCache
+from doc2mcp.config import Config, ToolConfig
+from doc2mcp.fetchers.web import WebFetcher
+
+logger = logging.getLogger(__name__)
+
+REDIS_URL = os.environ.get("REDIS_URL", "redis://localhost:6379")
+
+# Database URL for updating job status (Next.js web container)
+WEB_API_URL = os.environ.get("WEB_API_URL", "http://web:3000")
+
+# Finished jobs are kept around for a day so late status polls still resolve
+JOB_TTL = 24 * 60 * 60
+
+# Linked pages fetched per indexing job, and how many fetches may run at once
+MAX_LINKED_PAGES = 5
+LINK_FETCH_CONCURRENCY = 10
+
+# Seconds a single linked page may take before it is skipped
+LINK_FETCH_TIMEOUT = 10.0
+
+# Only the most recent log lines are kept, so job state stays bounded
+MAX_JOB_LOGS = 200
+
+
+# Models
+class IndexRequest(BaseModel):
+    job_id: str
+    user_id: str
+    tool_id: str
+    url: str
+
+
+class SearchRequest(BaseModel):
+    job_id: str
+    user_id: str
+    tool_id: str
+    tool_name: str
+    tool_description: str
+    query: str
+
+
+class SyncRequest(BaseModel):
+    job_id: str
+    user_id: str
+
+
+class JobStatus(BaseModel):
+    job_id: str
+    status: str
+    progress: int
+    logs: Deque[str]
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+    @field_validator("logs", mode="after")
+    @classmethod
+    def _bound_logs(cls, logs: Deque[str]) -> Deque[str]:
+        return deque(logs, maxlen=MAX_JOB_LOGS)
+
+    @field_serializer("logs")
+    def _serialize_logs(self, logs: Deque[str]) -> List[str]:
+        return list(logs)
+
+    async def transition(
+        self,
+        *,
+        progress: Optional[int] = None,
+        log: Optional[str] = None,
+        status: Optional[str] = None,
+    ) -> None:
+        """Apply a state change and emit it as one update, so the log line
+        and the progress/status it describes always arrive together"""
+        if progress is not None:
+            self.progress = progress
+        if status is not None:
+            self.status = status
+        await send_job_update(self, log)
+
+
+def job_key(job_id: str) -> str:
+    """Redis hash holding a job's state."""
+    return f"job:{job_id}"
+
+
+def job_snapshot_key(job_id: str) -> str:
+    """Redis string holding a job's state pre-encoded as a JSON response body."""
+    return f"job:{job_id}:snapshot"
+
+
+def job_channel(job_id: str) -> str:
+    """Redis pub/sub channel carrying a job's live updates."""
+    return f"job:{job_id}:events"
+
+
+class JobStore:
+    """Job state and update events stored in Redis.
+
+    Each job is a hash at ``job:{id}`` whose fields are JSON-encoded
+    ``JobStatus`` fields, plus the whole status encoded once per save at
+    ``job:{id}:snapshot`` so status polls can return it without re-encoding;
+    updates are published on ``job:{id}:events``.
+    """
+
+    def __init__(self, redis_url: str = REDIS_URL) -> None:
+        self.redis = aioredis.from_url(redis_url, decode_responses=True)
+
+    async def save(self, job: JobStatus) -> None:
+        """Write the full job state."""
+        key = job_key(job.job_id)
+        state = job.model_dump()
+        mapping = {field: orjson.dumps(value) for field, value in state.items()}
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping=mapping)
+            pipe.expire(key, JOB_TTL)
+            pipe.set(job_snapshot_key(job.job_id), orjson.dumps(state), ex=JOB_TTL)
+            await pipe.execute()
+
+    async def get(self, job_id: str) -> Optional[JobStatus]:
+        """Read a job's state, or None if it doesn't exist."""
+        data = await self.redis.hgetall(job_key(job_id))
+        if not data:
+            return None
+        return JobStatus.model_validate(
+            {field: orjson.loads(value) for field, value in data.items()}
+        )
+
+    async def get_snapshot(self, job_id: str) -> Optional[str]:
+        """Read a job's state as an encoded JSON document, or None if it doesn't exist."""
+        return await self.redis.get(job_snapshot_key(job_id))
+
+    async def publish(self, job_id: str, event: Dict[str, Any]) -> None:
+        """Publish an update event to every process relaying this job."""
+        await self.redis.publish(job_channel(job_id), orjson.dumps(event))
+
+    async def close(self) -> None:
+        await self.redis.aclose()
+
+
+# Per-process doc2mcp components, created on first use inside the worker;
+# API processes import this module too but never build them
+config: Optional[Config] = None
+cache: Optional[PageCache] = None
+web_fetcher: Optional[WebFetcher] = None
+link_fetch_sem = asyncio.Semaphore(LINK_FETCH_CONCURRENCY)
+store: Optional[JobStore] = None
+agent: Optional[DocSearchAgent] = None
+
+
+def get_config() -> Config:
+    global config
+    if config is None:
+        config = Config()
+    return config
+
+
+def get_cache() -> PageCache:
+    global cache
+    if cache is None:
+        cache = PageCache()
+    return cache
+
+
+def get_web_fetcher() -> WebFetcher:
+    global web_fetcher
+    if web_fetcher is None:
+        web_fetcher = WebFetcher()
+    return web_fetcher
+
+
+def get_store() -> JobStore:
+    global store
+    if store is None:
+        store = JobStore()
+    return store
+
+
+def get_agent() -> Optional[DocSearchAgent]:
+    """Initialize the search agent lazily; returns None if it can't be created."""
+    global agent
+    if agent is None:
+        try:
+            agent = DocSearchAgent(get_config(), max_pages=10)
+            logger.info("Doc2MCP agent initialized successfully")
+        except Exception as e:
+            logger.error(f"Failed to initialize agent: {e}")
+    return agent
+
+
+async def close_components():
+    """Release clients held by this process."""
+    if agent:
+        await agent.close()
+    if web_fetcher:
+        await web_fetcher.close()
+    if cache:
+        cache.close()
+    if store:
+        await store.close()
+
+
+async def run_indexing_job(request: IndexRequest):
+    """Background task for indexing - crawls and caches documentation"""
+    job = await get_store().get(request.job_id)
+    if job is None:
+        logger.error(f"Indexing job {request.job_id} not found")
+        return
+
+    try:
+        await job.transition(progress=10, log=f"Starting to index {request.url}...")
+
+        # Fetch the initial page
+        await job.transition(log=f"Fetching {request.url}...")
+        fetch_result = await get_web_fetcher().fetch_with_links(request.url, None)
+
+        pages_indexed = 1
+        links_found = len(fetch_result.links)
+
+        # Cache the main page
+        await job.transition(progress=30, log="Caching page content...")
+        # PageCache writes to SQLite (and updates its full-text index); keep that off the event loop
+        await asyncio.to_thread(
+            get_cache().put,
+            url=fetch_result.url,
+            title=fetch_result.title,
+            summary=fetch_result.title,
+            content=fetch_result.content,
+            links=fetch_result.links,
+            domain=request.url.split('/')[2] if '/' in request.url else request.url
+        )
+
+        # Index linked pages concurrently (limited to 5 for speed)
+        link_urls = [link['url'] for link in fetch_result.links[:MAX_LINKED_PAGES]]
+        await job.transition(progress=50, log=f"Indexing {len(link_urls)} linked pages...")
+
+        async def fetch_link(link_url: str):
+            await job.transition(log=f"Fetching: {link_url[:60]}...")
+            async with link_fetch_sem:
+                return await asyncio.wait_for(
+                    get_web_fetcher().fetch_with_links(link_url, None),
+                    timeout=LINK_FETCH_TIMEOUT,
+                )
+
+        link_results = await asyncio.gather(
+            *[fetch_link(link_url) for link_url in link_urls],
+            return_exceptions=True,
+        )
+
+        for i, (link_url, link_result) in enumerate(zip(link_urls, link_results)):
+            if isinstance(link_result, Exception):
+                logger.warning(f"Failed to index {link_url}: {link_result!r}")
+                continue
+
+            try:
+                await asyncio.to_thread(
+                    get_cache().put,
+                    url=link_result.url,
+                    title=link_result.title,
+                    summary=link_result.title,
+                    content=link_result.content,
+                    links=link_result.links,
+                    domain=request.url.split('/')[2] if '/' in request.url else request.url
+                )
+            except Exception as e:
+                logger.warning(f"Failed to cache {link_url}: {e}")
+                continue
+            pages_indexed += 1
+            await job.transition(
+                progress=50 + (i + 1) * 8,
+                log=f"Cached: {link_result.title[:60]}...",
+            )
+
+        job.result = {
+            "pages_indexed": pages_indexed,
+            "links_found": links_found,
+            "url": request.url
+        }
+        await job.transition(
+            progress=100,
+            status="completed",
+            log=f"Indexing complete! Indexed {pages_indexed} pages, found {links_found} links.",
+        )
+
+    except Exception as e:
+        logger.error(f"Indexing job {request.job_id} failed: {e}")
+        job.error = str(e)
+        await job.transition(status="failed", log=f"Error: {str(e)}")
+
+
+async def run_search_job(request: SearchRequest):
+    """Background task for search - uses doc2mcp agent"""
+    job = await get_store().get(request.job_id)
+    if job is None:
+        logger.error(f"Search job {request.job_id} not found")
+        return
+
+    try:
+        await job.transition(progress=10, log=f"Searching for: {request.query}")
+
+        # Create a temporary tool config for this search
+        tool_config = ToolConfig(
+            name=request.tool_name,
+            description=request.tool_description,
+            sources=[]  # Agent will use cached pages
+        )
+
+        # Update agent config
+        search_agent = get_agent()
+        if search_agent:
+            search_agent.config.tools[request.tool_id] = tool_config
+
+            await job.transition(progress=20, log="Initializing search agent...")
+
+            # Perform the search
+            await job.transition(log="Exploring documentation...")
+
+            async def forward_chunk(text: str):
+                await send_answer_chunk(job, text)
+
+            result = await search_agent.search(
+                request.tool_id, request.query, on_chunk=forward_chunk
+            )
+
+            if result.get("error"):
+                raise Exception(result["error"])
+
+            await job.transition(progress=95, log="Synthesizing answer...")
+
+            job.result = {
+                "content": result.get("content", "No content found"),
+                "sources": result.get("sources", []),
+                "pages_explored": result.get("pages_explored", 0),
+                "tool": result.get("tool", {})
+            }
+            await job.transition(progress=100, status="completed", log="Search complete!")
+        else:
+            raise Exception("Agent not initialized")
+
+    except Exception as e:
+        logger.error(f"Search job {request.job_id} failed: {e}")
+        job.error = str(e)
+        await job.transition(status="failed", log=f"Error: {str(e)}")
+
+
+async def send_job_update(job: JobStatus, log_message: Optional[str] = None):
+    """Persist job state, publish the update to WebSocket relays and sync to database"""
+    if log_message is not None:
+        job.logs.append(log_message)
+
+    job_store = get_store()
+    try:
+        await job_store.save(job)
+        await job_store.publish(job.job_id, {
+            "type": "log",
+            "message": log_message,
+            "progress": job.progress,
+            "status": job.status
+        })
+    except Exception as e:
+        logger.warning(f"Failed to store update for job {job.job_id}: {e}")
+
+    # Sync to database via Next.js API
+    await sync_job_to_db(job)
+
+
+async def send_answer_chunk(job: JobStatus, text: str):
+    """Publish a piece of the streamed answer to WebSocket relays.
+
+    Chunks are live-only: they are not added to the job logs or synced to the
+    database, since the full answer lands in the job result when it completes.
+    """
+    try:
+        await get_store().publish(job.job_id, {"type": "chunk", "text": text})
+    except Exception as e:
+        logger.warning(f"Failed to publish answer chunk for job {job.job_id}: {e}")
+
+
+async def sync_job_to_db(job: JobStatus):
+    """Sync job status to the database via Next.js API"""
+    try:
+        async with httpx.AsyncClient() as client:
+            await client.post(
+                f"{WEB_API_URL}/api/jobs/{job.job_id}/update",
+                json={
+                    "status": job.status,
+                    "progress": job.progress,
+                    "logs": list(job.logs),
+                    "result": job.result,
+                    "error": job.error
+                },
+                timeout=5.0
+            )
+    except Exception as e:
+        logger.warning(f"Failed to sync job {job.job_id} to database: {e}")
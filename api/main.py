@@ -1,23 +1,18 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, HTTPException, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import Optional, List, Dict, Any
+from fastapi.responses import ORJSONResponse
 import asyncio
 import logging
+import time
 from datetime import datetime
-import sys
-import os
-import httpx
+from typing import Any, Dict, Optional, Tuple
 
-# Add parent directory to path to import doc2mcp
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import orjson
 
-from doc2mcp.agents.doc_search import DocSearchAgent
-from doc2mcp.config import Config, ToolConfig, WebSource
-from doc2mcp.fetchers.web import WebFetcher
-from doc2mcp.cache import PageCache
+from jobs import IndexRequest, JobStatus, JobStore, SearchRequest, job_channel
+from worker import INDEX_TASK, SEARCH_TASK, celery_app
 
-app = FastAPI(title="Doc2MCP API", version="0.1.0")
+app = FastAPI(title="Doc2MCP API", version="0.1.0", default_response_class=ORJSONResponse)
 
 # CORS
 app.add_middleware(
@@ -31,304 +26,161 @@ app.add_middleware(
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Database URL for updating job status (Next.js web container)
-WEB_API_URL = os.environ.get("WEB_API_URL", "http://web:3000")
+# Job state is shared with the Celery workers through Redis
+store = JobStore()
 
-# Initialize doc2mcp components (use default empty config)
-config = Config()
-agent: Optional[DocSearchAgent] = None
-cache = PageCache("./doc_cache.json")
-web_fetcher = WebFetcher()
+# How long job updates are coalesced before being written to a WebSocket
+WS_FLUSH_INTERVAL = 0.05
 
-# Models
-class IndexRequest(BaseModel):
-    job_id: str
-    user_id: str
-    tool_id: str
-    url: str
+# Static and probe endpoints are served from pre-encoded bodies
+ROOT_BYTES = orjson.dumps({
+    "service": "Doc2MCP API",
+    "version": "0.1.0",
+    "status": "running",
+})
+HEALTH_CACHE_TTL = 1.0
+_health_cache: Tuple[float, bytes] = (0.0, b"")
 
-class SearchRequest(BaseModel):
-    job_id: str
-    user_id: str
-    tool_id: str
-    tool_name: str
-    tool_description: str
-    query: str
+class JobChannel:
+    """Per-connection queue that coalesces job updates into batched WebSocket frames"""
 
-class SyncRequest(BaseModel):
-    job_id: str
-    user_id: str
+    def __init__(self, websocket: WebSocket, flush_interval: float = WS_FLUSH_INTERVAL):
+        self.websocket = websocket
+        self.flush_interval = flush_interval
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self._writer: Optional[asyncio.Task] = None
 
-class JobStatus(BaseModel):
-    job_id: str
-    status: str
-    progress: int
-    logs: List[str]
-    result: Optional[Dict[str, Any]] = None
-    error: Optional[str] = None
+    def put(self, event: Dict[str, Any]):
+        """Queue an update without waiting on the socket"""
+        self.queue.put_nowait(event)
 
-# Job tracking with WebSocket support
-jobs: Dict[str, JobStatus] = {}
-websocket_connections: Dict[str, WebSocket] = {}
+    def start(self):
+        self._writer = asyncio.create_task(self._write_loop())
 
-@app.on_event("startup")
-async def startup_event():
-    """Initialize agent on startup"""
-    global agent
-    try:
-        agent = DocSearchAgent(config, max_pages=10)
-        logger.info("Doc2MCP agent initialized successfully")
-    except Exception as e:
-        logger.error(f"Failed to initialize agent: {e}")
+    async def close(self):
+        if self._writer:
+            self._writer.cancel()
+
+    async def _write_loop(self):
+        while True:
+            batch = [await self.queue.get()]
+            await asyncio.sleep(self.flush_interval)
+            while not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            await send_event(self.websocket, {"type": "logs", "events": batch})
+
+async def send_event(websocket: WebSocket, event: Dict[str, Any]):
+    """Send an event as a JSON text frame, encoded with orjson"""
+    await websocket.send_text(orjson.dumps(event).decode())
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown"""
-    if agent:
-        await agent.close()
-    await web_fetcher.close()
+    await store.close()
 
 @app.get("/")
 async def root():
-    return {
-        "service": "Doc2MCP API",
-        "version": "0.1.0",
-        "status": "running",
-        "agent_ready": agent is not None
-    }
+    return Response(content=ROOT_BYTES, media_type="application/json")
 
 @app.get("/health")
 async def health_check():
-    return {
-        "status": "healthy",
-        "timestamp": datetime.utcnow().isoformat(),
-        "agent": "ready" if agent else "not initialized"
-    }
+    """Health status, re-checked at most once per HEALTH_CACHE_TTL"""
+    global _health_cache
+    now = time.monotonic()
+    expires, body = _health_cache
+    if now >= expires:
+        try:
+            redis_ready = await store.redis.ping()
+        except Exception:
+            redis_ready = False
+        body = orjson.dumps({
+            "status": "healthy",
+            "timestamp": datetime.utcnow().isoformat(),
+            "redis": "ready" if redis_ready else "unavailable"
+        })
+        _health_cache = (now + HEALTH_CACHE_TTL, body)
+    return Response(content=body, media_type="application/json")
 
 @app.post("/index")
-async def start_indexing(request: IndexRequest, background_tasks: BackgroundTasks):
+async def start_indexing(request: IndexRequest):
     """Start a documentation indexing job"""
     
     # Initialize job
-    jobs[request.job_id] = JobStatus(
+    await store.save(JobStatus(
         job_id=request.job_id,
         status="running",
         progress=0,
         logs=["Starting indexing job..."],
-    )
+    ))
     
-    # Start background task
-    background_tasks.add_task(run_indexing_job, request)
+    # Hand off to the worker pool
+    celery_app.send_task(INDEX_TASK, args=[request.model_dump()])
     
     return {"job_id": request.job_id, "status": "started"}
 
 @app.post("/search")
-async def start_search(request: SearchRequest, background_tasks: BackgroundTasks):
+async def start_search(request: SearchRequest):
     """Start a documentation search job"""
     
     # Initialize job
-    jobs[request.job_id] = JobStatus(
+    await store.save(JobStatus(
         job_id=request.job_id,
         status="running",
         progress=0,
         logs=["Starting search job..."],
-    )
+    ))
     
-    # Start background task
-    background_tasks.add_task(run_search_job, request)
+    # Hand off to the worker pool
+    celery_app.send_task(SEARCH_TASK, args=[request.model_dump()])
     
     return {"job_id": request.job_id, "status": "started"}
 
 @app.get("/jobs/{job_id}/status")
 async def get_job_status(job_id: str):
     """Get status of a job"""
-    if job_id not in jobs:
+    # Served as the snapshot the worker encoded on its last update
+    snapshot = await store.get_snapshot(job_id)
+    if snapshot is None:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    return jobs[job_id]
-
-async def run_indexing_job(request: IndexRequest):
-    """Background task for indexing - crawls and caches documentation"""
-    job = jobs[request.job_id]
-    
-    try:
-        await send_job_update(request.job_id, f"Starting to index {request.url}...")
-        job.progress = 10
-        
-        # Fetch the initial page
-        await send_job_update(request.job_id, f"Fetching {request.url}...")
-        fetch_result = await web_fetcher.fetch_with_links(request.url, None)
-        job.progress = 30
-        
-        pages_indexed = 1
-        links_found = len(fetch_result.links)
-        
-        # Cache the main page
-        await send_job_update(request.job_id, "Caching page content...")
-        cache.put(
-            url=fetch_result.url,
-            title=fetch_result.title,
-            summary=fetch_result.title,
-            content=fetch_result.content,
-            links=fetch_result.links,
-            domain=request.url.split('/')[2] if '/' in request.url else request.url
-        )
-        job.progress = 50
-        
-        # Index linked pages (limited to 5 for speed)
-        await send_job_update(request.job_id, f"Indexing {min(5, len(fetch_result.links))} linked pages...")
-        for i, link in enumerate(fetch_result.links[:5]):
-            try:
-                link_url = link['url']
-                await send_job_update(request.job_id, f"Fetching: {link_url[:60]}...")
-                
-                link_result = await web_fetcher.fetch_with_links(link_url, None)
-                cache.put(
-                    url=link_result.url,
-                    title=link_result.title,
-                    summary=link_result.title,
-                    content=link_result.content,
-                    links=link_result.links,
-                    domain=request.url.split('/')[2] if '/' in request.url else request.url
-                )
-                pages_indexed += 1
-                job.progress = 50 + (i + 1) * 8
-                await send_job_update(request.job_id, f"Cached: {link_result.title[:60]}...")
-            except Exception as link_error:
-                logger.warning(f"Failed to index {link_url}: {link_error}")
-        
-        job.progress = 100
-        job.status = "completed"
-        job.result = {
-            "pages_indexed": pages_indexed,
-            "links_found": links_found,
-            "url": request.url
-        }
-        # Send final update AFTER setting completed status
-        await send_job_update(request.job_id, f"Indexing complete! Indexed {pages_indexed} pages, found {links_found} links.")
-        
-    except Exception as e:
-        logger.error(f"Indexing job {request.job_id} failed: {e}")
-        job.status = "failed"
-        job.error = str(e)
-        await send_job_update(request.job_id, f"Error: {str(e)}")
-
-async def run_search_job(request: SearchRequest):
-    """Background task for search - uses doc2mcp agent"""
-    job = jobs[request.job_id]
-    
-    try:
-        await send_job_update(request.job_id, f"Searching for: {request.query}")
-        job.progress = 10
-        
-        # Create a temporary tool config for this search
-        tool_config = ToolConfig(
-            name=request.tool_name,
-            description=request.tool_description,
-            sources=[]  # Agent will use cached pages
-        )
-        
-        # Update agent config
-        if agent:
-            agent.config.tools[request.tool_id] = tool_config
-            
-            await send_job_update(request.job_id, "Initializing search agent...")
-            job.progress = 20
-            
-            # Perform the search
-            await send_job_update(request.job_id, "Exploring documentation...")
-            result = await agent.search(request.tool_id, request.query)
-            job.progress = 80
-            
-            if result.get("error"):
-                raise Exception(result["error"])
-            
-            await send_job_update(request.job_id, "Synthesizing answer...")
-            job.progress = 95
-            
-            job.progress = 100
-            job.status = "completed"
-            job.result = {
-                "content": result.get("content", "No content found"),
-                "sources": result.get("sources", []),
-                "pages_explored": result.get("pages_explored", 0),
-                "tool": result.get("tool", {})
-            }
-            # Send final update AFTER setting completed status
-            await send_job_update(request.job_id, "Search complete!")
-        else:
-            raise Exception("Agent not initialized")
-        
-    except Exception as e:
-        logger.error(f"Search job {request.job_id} failed: {e}")
-        job.status = "failed"
-        job.error = str(e)
-        await send_job_update(request.job_id, f"Error: {str(e)}")
-
-async def send_job_update(job_id: str, log_message: str):
-    """Send job update to WebSocket if connected and sync to database"""
-    if job_id in jobs:
-        jobs[job_id].logs.append(log_message)
-        
-        # Send to WebSocket if connected
-        if job_id in websocket_connections:
-            try:
-                await websocket_connections[job_id].send_json({
-                    "type": "log",
-                    "message": log_message,
-                    "progress": jobs[job_id].progress,
-                    "status": jobs[job_id].status
-                })
-            except:
-                pass
-        
-        # Sync to database via Next.js API
-        await sync_job_to_db(job_id)
-
-async def sync_job_to_db(job_id: str):
-    """Sync job status to the database via Next.js API"""
-    if job_id not in jobs:
-        return
-    
-    job = jobs[job_id]
-    try:
-        async with httpx.AsyncClient() as client:
-            await client.post(
-                f"{WEB_API_URL}/api/jobs/{job_id}/update",
-                json={
-                    "status": job.status,
-                    "progress": job.progress,
-                    "logs": job.logs,
-                    "result": job.result,
-                    "error": job.error
-                },
-                timeout=5.0
-            )
-    except Exception as e:
-        logger.warning(f"Failed to sync job {job_id} to database: {e}")
+    return Response(content=snapshot, media_type="application/json")
 
 @app.websocket("/ws/jobs/{job_id}")
 async def websocket_endpoint(websocket: WebSocket, job_id: str):
-    """WebSocket for real-time job updates"""
+    """WebSocket for real-time job updates, relayed from the job's Redis channel"""
     await websocket.accept()
-    websocket_connections[job_id] = websocket
+    channel = JobChannel(websocket)
+
+    # Subscribe before reading the current status so no update is missed
+    pubsub = store.redis.pubsub()
+    await pubsub.subscribe(job_channel(job_id))
+
+    async def relay():
+        async for message in pubsub.listen():
+            if message["type"] == "message":
+                channel.put(orjson.loads(message["data"]))
+
+    relay_task = asyncio.create_task(relay())
     
     try:
-        # Send current job status
-        if job_id in jobs:
-            await websocket.send_json({
-                "type": "status",
-                "job": jobs[job_id].dict()
-            })
+        # Send current job status, embedding the pre-encoded snapshot as-is
+        snapshot = await store.get_snapshot(job_id)
+        if snapshot is not None:
+            await websocket.send_text(f'{{"type":"status","job":{snapshot}}}')
+        channel.start()
         
         # Keep connection alive
         while True:
             await websocket.receive_text()
             
     except WebSocketDisconnect:
-        if job_id in websocket_connections:
-            del websocket_connections[job_id]
+        pass
+    finally:
+        relay_task.cancel()
+        await channel.close()
+        await pubsub.unsubscribe()
+        await pubsub.aclose()
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    uvicorn.run(app, host="0.0.0.0", port=8000, loop="uvloop", http="httptools")
@@ -0,0 +1,79 @@
+"""Celery worker that runs indexing and search jobs outside the API process.
+
+Start with: celery -A worker worker --loglevel=info
+"""
+
+import asyncio
+import logging
+
+from celery import Celery
+from celery.signals import worker_process_init, worker_process_shutdown
+
+try:
+    import uvloop
+except ImportError:  # Not available on Windows
+    uvloop = None
+
+from jobs import (
+    REDIS_URL,
+    IndexRequest,
+    SearchRequest,
+    close_components,
+    run_indexing_job,
+    run_search_job,
+)
+
+logging.basicConfig(level=logging.INFO)
+
+# Task names, so the API can send jobs without importing the task functions
+INDEX_TASK = "doc2mcp.index"
+SEARCH_TASK = "doc2mcp.search"
+
+celery_app = Celery("doc2mcp", broker=REDIS_URL)
+celery_app.conf.update(
+    task_serializer="json",
+    accept_content=["json"],
+    task_acks_late=True,
+    worker_prefetch_multiplier=1,
+)
+
+# One event loop per worker process, so clients created by the job runners
+# (Redis, HTTP, Gemini) stay bound to the loop they were created on. It is
+# created in the worker process itself, never at import: API processes import
+# this module too, and prefork children would otherwise inherit the parent's
+_loop: asyncio.AbstractEventLoop | None = None
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    if _loop is None:
+        _loop = uvloop.new_event_loop() if uvloop else asyncio.new_event_loop()
+        asyncio.set_event_loop(_loop)
+    return _loop
+
+
+@worker_process_init.connect
+def _init(**kwargs) -> None:
+    _get_loop()
+
+
+@celery_app.task(name=INDEX_TASK)
+def index_task(request: dict) -> None:
+    """Crawl and cache a documentation URL."""
+    _get_loop().run_until_complete(run_indexing_job(IndexRequest(**request)))
+
+
+@celery_app.task(name=SEARCH_TASK)
+def search_task(request: dict) -> None:
+    """Answer a documentation query with the search agent."""
+    _get_loop().run_until_complete(run_search_job(SearchRequest(**request)))
+
+
+@worker_process_shutdown.connect
+def _shutdown(**kwargs) -> None:
+    global _loop
+    if _loop is None:
+        return
+    _loop.run_until_complete(close_components())
+    _loop.close()
+    _loop = None
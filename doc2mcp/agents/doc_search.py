@@ -1,23 +1,299 @@
 """Deep research agent for intelligent documentation search."""
 
-import json
+import asyncio
+import hashlib
+import heapq
+import itertools
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Collection
+from contextlib import aclosing
+from dataclasses import dataclass
+from operator import itemgetter
 from typing import Any
-from urllib.parse import urlparse
+from urllib.parse import urlparse, urlsplit
 
+import httpx
+import orjson
 from opentelemetry import trace
-
-from doc2mcp.cache import PageCache
-from doc2mcp.compression import ContentCompressor
+from pydantic import BaseModel, Field
+
+from doc2mcp.cache import DEFAULT_CACHE_PATH, AnswerCache, PageCache
+from doc2mcp.compression import (
+    CompressionResult,
+    fast_compress,
+    get_compressor,
+    strip_boilerplate,
+)
 from doc2mcp.config import Config, LocalSource, ToolConfig, WebSource
 from doc2mcp.fetchers.local import LocalFetcher
-from doc2mcp.fetchers.web import FetchResult, WebFetcher
-from doc2mcp.llm import create_llm_provider, LLMProvider
+from doc2mcp.fetchers.web import FetchResult, WebFetcher, canonicalize_url
+from doc2mcp.llm import LLMProvider, LLMResponse, create_llm_provider
+from doc2mcp.retrieval import ChunkIndex, dedupe_paragraphs, query_terms, term_coverage
 from doc2mcp.sitemap_index import SitemapIndex
+from doc2mcp.tokens import pack_sections, truncate_to_tokens
 from doc2mcp.tracing.phoenix import trace_doc_retrieval, trace_llm_call
 
+logger = logging.getLogger(__name__)
+
 # Default max pages to explore per query
 DEFAULT_MAX_PAGES = 10
 
+# Links picked by keyword from pages that skipped the LLM rank behind
+# every LLM recommendation
+PREFILTER_LINK_PENALTY = 100
+PREFILTER_MAX_LINKS = 3
+
+# Per path segment, deeper links rank this much lower in the navigation
+# prompt; small enough to only break ties between equal query matches
+LINK_DEPTH_PENALTY = 0.01
+
+# Output budget of a navigation call, per page analyzed; schema-constrained
+# decisions carry no filler, so this only needs room for the extract
+NAV_MAX_TOKENS = 2048
+
+# Navigation decisions remembered per (query, page content)
+NAV_MEMO_SIZE = 512
+
+# Cached pages returned as the answer when a search is settled by the cache
+CACHE_SHORTCUT_SOURCES = 2
+
+# Seconds a failed URL is skipped: client errors and empty pages are unlikely
+# to change soon, timeouts and server errors may clear up quickly
+PERMANENT_FAILURE_TTL = 3600
+TRANSIENT_FAILURE_TTL = 300
+
+# With at least this many sources overflowing the synthesis budget, each
+# source is first condensed on its own (in parallel) and the answer is
+# synthesized from the condensed versions
+MAP_REDUCE_MIN_SOURCES = 4
+SOURCE_SUMMARY_MAX_TOKENS = 1024
+SOURCE_NOT_RELEVANT = "NOT RELEVANT"
+
+# Receives each piece of the synthesized answer as it is generated
+ChunkCallback = Callable[[str], Awaitable[None]]
+
+# System prompts are fixed so every request shares the same cacheable prefix
+NAV_SYSTEM_INSTRUCTION = (
+    "You are a documentation research assistant. Your job is to analyze documentation pages and "
+    "decide how to navigate to find relevant information.\n"
+    "\n"
+    "You will be given:\n"
+    "1. A user's query about what they need to find\n"
+    "2. Content from the current page\n"
+    "3. Links available on the page\n"
+    "\n"
+    "Guidelines:\n"
+    '- Be conservative with "has_sufficient_info" - only true if the query is fully answered\n'
+    "- Extract ONLY directly relevant content, not the whole page\n"
+    "- Prioritize links that seem most likely to contain the answer\n"
+    "- If the page is not relevant at all, return empty relevant_content and suggest better links\n"
+    "- Focus on official documentation, API references, and getting-started guides"
+)
+
+# Appended for providers that can't enforce NavDecision as a response schema
+NAV_RESPONSE_FORMAT = """
+
+You must respond with a JSON object containing:
+{
+    "has_sufficient_info": boolean,  // true if current content fully answers the query
+    "relevant_content": string,      // extract of relevant content found (if any)
+    "summary": string,               // brief summary of this page (for caching)
+    "links_to_explore": [            // links worth exploring (max 3, most promising first)
+        {"url": "...", "reason": "..."}
+    ]
+}"""
+
+# Appended instead when several pages are analyzed in one call
+NAV_BATCH_RESPONSE_FORMAT = (
+    "\n"
+    "\n"
+    "You must respond with a JSON object holding one decision per page, in the order the pages "
+    "are given:\n"
+    "{\n"
+    '    "pages": [\n'
+    "        {\n"
+    "            \"has_sufficient_info\": boolean,  // true if this page's content fully answers "
+    "the query\n"
+    '            "relevant_content": string,      // extract of relevant content found on this '
+    "page (if any)\n"
+    '            "summary": string,               // brief summary of this page (for caching)\n'
+    '            "links_to_explore": [            // links from this page worth exploring (max '
+    "3, most promising first)\n"
+    '                {"url": "...", "reason": "..."}\n'
+    "            ]\n"
+    "        }\n"
+    "    ]\n"
+    "}"
+)
+
+SYNTHESIS_SYSTEM_INSTRUCTION = """You are a documentation search assistant. Your job is to:
+1. Read the provided documentation excerpts from multiple sources
+2. Synthesize a comprehensive answer to the user's query
+3. Preserve code examples, API signatures, and technical details
+4. Format the output clearly with proper markdown
+5. Include source references
+
+If the documentation doesn't fully answer the query, say what's missing.
+Do NOT make up information - only use what's in the provided documentation."""
+
+SOURCE_SUMMARY_SYSTEM_INSTRUCTION = (
+    "You are a documentation research assistant. Your job is to condense one documentation "
+    "source down to the parts that help answer a user's query.\n"
+    "\n"
+    "Keep code examples, API signatures, parameter names and technical details verbatim.\n"
+    "Drop navigation, boilerplate and anything unrelated to the query.\n"
+    f"If nothing in the source is relevant, reply with exactly: {SOURCE_NOT_RELEVANT}"
+)
+
+NAV_PROMPT_TEMPLATE = """Query: {query}
+
+Current page: {url}
+Title: {title}
+
+Page content:
+{content}
+
+Available links on this page:
+{links}
+
+Analyze this page and respond with a JSON object."""
+
+NAV_BATCH_PROMPT_TEMPLATE = (
+    "Query: {query}\n"
+    "\n"
+    "{pages}\n"
+    "\n"
+    "Analyze each of these {count} pages and respond with a JSON object holding one decision per "
+    "page, in order."
+)
+
+NAV_BATCH_PAGE_TEMPLATE = """### Page {number}: {url}
+Title: {title}
+
+Page content:
+{content}
+
+Available links on this page:
+{links}"""
+
+SOURCE_SUMMARY_PROMPT_TEMPLATE = """Query: {query}
+
+Source: {url}
+
+{content}
+
+Condense this source to what is relevant to the query."""
+
+SYNTHESIS_PROMPT_TEMPLATE = (
+    "Query: {query}\n"
+    "\n"
+    "Documentation excerpts found:\n"
+    "\n"
+    "{content}\n"
+    "\n"
+    "Please synthesize a comprehensive answer to the query using the documentation above. "
+    "Include code examples if available."
+)
+
+
+class LinkHint(BaseModel):
+    """A link the navigation model recommends exploring."""
+
+    url: str
+    reason: str = Field(description="Why this link may answer the query")
+
+
+class NavDecision(BaseModel):
+    """Navigation decision for one page, in the order it is streamed."""
+
+    has_sufficient_info: bool = Field(
+        description="True only if the current content fully answers the query"
+    )
+    relevant_content: str = Field(description="Extract of relevant content found, if any")
+    summary: str = Field(description="Brief summary of this page, for caching")
+    links_to_explore: list[LinkHint] = Field(
+        description="Links worth exploring, at most 3, most promising first"
+    )
+
+
+@dataclass
+class ToolSources:
+    """A tool's configured sources, split by type and parsed once."""
+
+    start_urls: list[str]
+    domains: list[str]  # Allowed domains, deduplicated, in source order
+    web: list[tuple[str, str]]  # (url, domain) for every web source
+    local: list[LocalSource]
+
+
+class NavBatch(BaseModel):
+    """Navigation decisions for several pages analyzed in one call."""
+
+    pages: list[NavDecision] = Field(description="One decision per page, in the order given")
+
+
+def _format_links(
+    links: list[dict[str, str]],
+    terms: set[str],
+    limit: int,
+    skip_urls: Collection[str] = (),
+) -> str:
+    """Render a page's most promising links as a markdown list for the navigation prompt.
+
+    Links are ranked by how many query terms their text or URL mention,
+    shallower paths first among equals, so navigation chrome ("Home",
+    "Docs index") doesn't crowd out the links worth following.
+
+    Args:
+        links: The page's links.
+        terms: Query terms from query_terms().
+        limit: Maximum number of links listed.
+        skip_urls: Already explored or queued URLs, left out of the list.
+
+    Returns:
+        One "- [text](url)" line per link, best first.
+    """
+    scored = [
+        (
+            term_coverage(terms, f"{text} {url}")
+            - LINK_DEPTH_PENALTY * urlsplit(url).path.count("/"),
+            text,
+            url,
+        )
+        for text, url in map(itemgetter("text", "url"), links)
+        if url not in skip_urls
+    ]
+    return "\n".join([
+        f"- [{text}]({url})"
+        for _, text, url in heapq.nlargest(limit, scored, key=itemgetter(0))
+    ])
+
+
+def _sufficient_decision(partial: str) -> str | None:
+    """Complete a partial navigation response that already reports sufficiency.
+
+    Args:
+        partial: JSON text streamed so far.
+
+    Returns:
+        The decision as valid JSON without its links, or None if the
+        response doesn't (yet) report sufficient information.
+    """
+    links_at = partial.find('"links_to_explore"')
+    if links_at == -1:
+        return None
+
+    decision = partial[:links_at].rstrip().rstrip(",") + ', "links_to_explore": []}'
+    try:
+        parsed = orjson.loads(decision)
+    except orjson.JSONDecodeError:
+        return None
+    if isinstance(parsed, dict) and parsed.get("has_sufficient_info") is True:
+        return decision
+    return None
+
 
 class DocSearchAgent:
     """Deep research agent that iteratively explores documentation.
@@ -33,7 +309,7 @@ class DocSearchAgent:
     def __init__(
         self,
         config: Config,
-        cache_path: str = "./doc_cache.json",
+        cache_path: str = DEFAULT_CACHE_PATH,
         sitemap_index_path: str = "./sitemap_index.json",
         max_pages: int = DEFAULT_MAX_PAGES,
         llm_provider: LLMProvider | None = None,
@@ -42,7 +318,31 @@ class DocSearchAgent:
         self.max_pages = max_pages
         self.web_fetcher = WebFetcher(timeout=config.settings.request_timeout)
         self.local_fetcher = LocalFetcher()
-        self.cache = PageCache(cache_path)
+        self.cache = PageCache(
+            cache_path,
+            ttl=config.settings.cache_ttl,
+            max_reads=config.settings.cache_max_reads,
+            domain_ttl=config.settings.cache_domain_ttl,
+            max_pages=config.settings.cache_max_pages,
+        )
+
+        # Synthesized answers, dropped when a page they were built from is re-cached
+        self.answer_cache = AnswerCache(ttl=config.settings.cache_ttl)
+        self.cache.subscribe(self.answer_cache.invalidate_url)
+
+        # Searches currently running, so identical concurrent queries share one
+        self._inflight: dict[str, asyncio.Future[dict[str, Any]]] = {}
+
+        # Chunk index so only the relevant parts of long documents reach the LLM
+        retrieval_settings = config.settings.retrieval
+        self.retrieval_enabled = retrieval_settings.enabled
+        self.chunk_index = ChunkIndex(
+            chunk_size=retrieval_settings.chunk_size,
+            embedding_model=retrieval_settings.embedding_model,
+            quantize=retrieval_settings.quantize_embeddings,
+        )
+        if self.retrieval_enabled:
+            self.cache.subscribe(self._index_cached_page)
 
         # Initialize sitemap index for faster URL lookup
         sitemap_settings = config.settings.sitemap_index
@@ -54,67 +354,59 @@ class DocSearchAgent:
         )
         self.sitemap_enabled = sitemap_settings.enabled
 
-        # Initialize content compressor for token optimization
+        # Content compressor for token optimization, shared with other agents
         compression_settings = config.settings.compression
-        self.compressor = ContentCompressor(
+        self.compressor = get_compressor(
             aggressiveness=compression_settings.aggressiveness,
             min_content_length=compression_settings.min_content_length,
             enabled=compression_settings.enabled,
+            gzip=compression_settings.gzip,
+            cache_ttl=config.settings.cache_ttl,
+            min_content_tokens=compression_settings.min_content_tokens,
         )
 
-        # Initialize LLM provider (supports Gemini, OpenAI, Local)
-        self.llm = llm_provider or create_llm_provider()
+        # LLM provider (supports Gemini, OpenAI, Local); created on first use so
+        # its SDK isn't imported by processes that never search
+        self._llm = llm_provider
 
-        # System prompts
-        self.nav_system_instruction = self._get_navigation_prompt()
-        self.synthesis_system_instruction = self._get_synthesis_prompt()
+        # Page analyses from all concurrent searches share one provider rate limit
+        self._nav_slots = asyncio.Semaphore(config.settings.navigation_concurrency)
 
-        self.tracer = trace.get_tracer("doc2mcp.agent")
+        # Likewise page fetches, so parallel searches don't flood a docs site
+        self._fetch_slots = asyncio.Semaphore(config.settings.fetch_concurrency)
 
-    def _get_navigation_prompt(self) -> str:
-        """System prompt for navigation decisions."""
-        return """You are a documentation research assistant. Your job is to analyze documentation pages and decide how to navigate to find relevant information.
+        # Each tool's sources split by type, keyed by tool name along with the
+        # ToolConfig they were built from; one entry per name, so configs
+        # replaced per job (see api.jobs) don't pile up
+        self._tool_sources: dict[str, tuple[ToolConfig, ToolSources]] = {}
 
-You will be given:
-1. A user's query about what they need to find
-2. Content from the current page
-3. Links available on the page
+        # Recent navigation decisions, so a query revisiting an unchanged
+        # page doesn't pay for another LLM call
+        self._nav_memo: OrderedDict[str, dict[str, Any]] = OrderedDict()
 
-You must respond with a JSON object containing:
-{
-    "has_sufficient_info": boolean,  // true if current content fully answers the query
-    "relevant_content": string,      // extract of relevant content found (if any)
-    "summary": string,               // brief summary of this page (for caching)
-    "links_to_explore": [            // links worth exploring (max 3, most promising first)
-        {"url": "...", "reason": "..."}
-    ]
-}
-
-Guidelines:
-- Be conservative with "has_sufficient_info" - only true if the query is fully answered
-- Extract ONLY directly relevant content, not the whole page
-- Prioritize links that seem most likely to contain the answer
-- If the page is not relevant at all, return empty relevant_content and suggest better links
-- Focus on official documentation, API references, and getting-started guides"""
-
-    def _get_synthesis_prompt(self) -> str:
-        """System prompt for final answer synthesis."""
-        return """You are a documentation search assistant. Your job is to:
-1. Read the provided documentation excerpts from multiple sources
-2. Synthesize a comprehensive answer to the user's query
-3. Preserve code examples, API signatures, and technical details
-4. Format the output clearly with proper markdown
-5. Include source references
+        # System prompts
+        self.nav_system_instruction = NAV_SYSTEM_INSTRUCTION
+        self.synthesis_system_instruction = SYNTHESIS_SYSTEM_INSTRUCTION
 
-If the documentation doesn't fully answer the query, say what's missing.
-Do NOT make up information - only use what's in the provided documentation."""
+        self.tracer = trace.get_tracer("doc2mcp.agent")
+
+    @property
+    def llm(self) -> LLMProvider:
+        """The LLM provider, created from the environment on first access."""
+        if self._llm is None:
+            self._llm = create_llm_provider()
+        return self._llm
 
-    async def search(self, tool_name: str, query: str) -> dict[str, Any]:
+    async def search(
+        self, tool_name: str, query: str, on_chunk: ChunkCallback | None = None
+    ) -> dict[str, Any]:
         """Search for documentation using deep exploration.
 
         Args:
             tool_name: Name of the tool to search documentation for.
             query: Search query describing what information is needed.
+            on_chunk: Optional coroutine called with each piece of the
+                      answer as the LLM streams it.
 
         Returns:
             Dictionary containing:
@@ -123,6 +415,43 @@ Do NOT make up information - only use what's in the provided documentation."""
                 - tool: Tool name and description
                 - pages_explored: Number of pages explored
         """
+        key = self.answer_cache.make_key(tool_name, query)
+
+        # Join an identical search that is already running
+        while (inflight := self._inflight.get(key)) is not None:
+            try:
+                result = dict(await asyncio.shield(inflight))
+            except asyncio.CancelledError:
+                # The search we joined was cancelled, not us; run it ourselves
+                if inflight.cancelled():
+                    continue
+                raise
+            if on_chunk is not None and result.get("content"):
+                await on_chunk(result["content"])
+            return result
+
+        future: asyncio.Future[dict[str, Any]] = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await self._search(tool_name, query, on_chunk)
+        except asyncio.CancelledError:
+            # Joined callers retry rather than inherit this caller's cancellation
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved in case nobody joined
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._inflight[key]
+
+    async def _search(
+        self, tool_name: str, query: str, on_chunk: ChunkCallback | None
+    ) -> dict[str, Any]:
+        """Run a search; see search() for arguments and result format."""
         with self.tracer.start_as_current_span("doc_search") as span:
             span.set_attribute("tool_name", tool_name)
             span.set_attribute("query", query)
@@ -139,7 +468,7 @@ Do NOT make up information - only use what's in the provided documentation."""
                 }
 
             # Perform deep search
-            result = await self._deep_search(query, tool_config)
+            result = await self._deep_search(query, tool_config, on_chunk)
 
             # Trace the retrieval
             trace_doc_retrieval(
@@ -158,7 +487,10 @@ Do NOT make up information - only use what's in the provided documentation."""
             }
 
     async def _deep_search(
-        self, query: str, tool_config: ToolConfig
+        self,
+        query: str,
+        tool_config: ToolConfig,
+        on_chunk: ChunkCallback | None = None,
     ) -> dict[str, Any]:
         """Perform deep iterative search through documentation.
 
@@ -168,35 +500,92 @@ Do NOT make up information - only use what's in the provided documentation."""
         Args:
             query: The user's search query.
             tool_config: Configuration for the tool.
+            on_chunk: Optional callback for streamed answer chunks.
 
         Returns:
             Dictionary with content, sources, and exploration stats.
         """
+        # Recent identical searches are answered without any fetching or LLM calls
+        result_key = self.answer_cache.make_key("search", tool_config.name, query)
+        cached_result = self.answer_cache.get(result_key)
+        if cached_result is not None:
+            if on_chunk is not None:
+                await on_chunk(cached_result["content"])
+            return dict(cached_result)
+
         # Collect relevant content from exploration
         collected_content: list[dict[str, str]] = []  # [{"url": ..., "content": ...}]
         visited_urls: set[str] = set()
         sources: list[str] = []
 
-        # Queue of URLs to explore: (url, priority)
-        to_explore: list[tuple[str, int]] = []
+        # Best-first frontier of URLs to explore: (priority, insertion order, url),
+        # lower priority first and FIFO among equals
+        frontier: asyncio.PriorityQueue[tuple[int, int, str]] = asyncio.PriorityQueue()
+        order = itertools.count()
+        queued_urls: set[str] = set()
+
+        def enqueue(url: str, priority: int) -> None:
+            # Dedupe at push time so visited or already-queued pages never take a
+            # slot; links shared by many pages are queued once, at first priority.
+            # Fragments, tracking parameters and query order don't make a new page
+            if not url:
+                return
+            url = canonicalize_url(url)
+            if url not in visited_urls and url not in queued_urls:
+                queued_urls.add(url)
+                frontier.put_nowait((priority, next(order), url))
 
         # Get starting URLs and domain restrictions
         start_urls, domains = self._get_starting_points(tool_config)
 
-        # Check cache for similar content first
-        for domain in domains:
-            cached = self.cache.find_similar(query, domain)
-            for page in cached[:3]:  # Use top 3 cached matches
+        # Check cache for similar content first; domains are scanned in
+        # parallel on worker threads so SQLite reads don't block the loop
+        coverages: list[float] = []  # Of each cached item in collected_content
+        cached_by_domain = await asyncio.gather(*[
+            asyncio.to_thread(self.cache.find_similar_scored, query, domain, 3)
+            for domain in domains
+        ])
+        for cached in cached_by_domain:
+            for coverage, page in cached:  # Use top 3 cached matches
                 if page["url"] not in visited_urls:
                     collected_content.append({
                         "url": page["url"],
-                        "content": page["content"][:5000],  # Limit cached content
+                        "content": self._select_relevant_content(
+                            query, page["url"], page["content"], fallback_chars=5000
+                        ),
                     })
-                    visited_urls.add(page["url"])
+                    coverages.append(coverage)
+                    visited_urls.add(canonicalize_url(page["url"]))
                     sources.append(f"[cached] {page['url']}")
 
+        # A cached page covering the query well enough skips navigation entirely
+        hit_threshold = self.config.settings.cache_hit_threshold
+        cache_hit = bool(coverages) and max(coverages) >= hit_threshold
+
+        # ...and, for tools without local docs to merge in, synthesis as well:
+        # the best covering pages are returned as they are
+        if (
+            cache_hit
+            and self.config.settings.cache_shortcut
+            and not self._get_tool_sources(tool_config).local
+        ):
+            best = heapq.nlargest(
+                CACHE_SHORTCUT_SOURCES,
+                (
+                    (coverage, item)
+                    for coverage, item in zip(coverages, collected_content)
+                    if coverage >= hit_threshold
+                ),
+                key=itemgetter(0),
+            )
+            return await self._cache_shortcut_result(
+                [item for _, item in best], on_chunk, result_key
+            )
+
         # Try to get candidate URLs from sitemap index (fast path)
-        sitemap_candidates = await self._get_sitemap_candidates(query, tool_config)
+        sitemap_candidates = (
+            [] if cache_hit else await self._get_sitemap_candidates(query, tool_config)
+        )
 
         if sitemap_candidates:
             # Use sitemap candidates as starting points with high priority
@@ -205,91 +594,108 @@ Do NOT make up information - only use what's in the provided documentation."""
                     # Lower priority number = higher priority (explored first)
                     # High-scoring matches get priority 0-4, lower scores get 5-9
                     priority = max(0, min(9, int(10 - score)))
-                    to_explore.append((url, priority))
+                    enqueue(url, priority)
                     sources.append(f"[sitemap-match] {url}")
 
         # Add original starting URLs as fallback (lower priority)
-        for url in start_urls:
-            if url not in visited_urls:
-                to_explore.append((url, 10))  # Lower priority than sitemap matches
+        if not cache_hit:
+            for url in start_urls:
+                enqueue(url, 10)  # Lower priority than sitemap matches
 
-        # Exploration loop
+        # Exploration: the frontier is consumed by concurrent workers
         pages_explored = 0
-        has_sufficient = False
-
-        while to_explore and pages_explored < self.max_pages and not has_sufficient:
-            # Get next URL (sort by priority, lower is better)
-            to_explore.sort(key=lambda x: x[1])
-            current_url, _ = to_explore.pop(0)
-
-            if current_url in visited_urls:
-                continue
-
-            visited_urls.add(current_url)
-            pages_explored += 1
-
-            # Check cache first
-            cached_page = self.cache.get(current_url)
-
-            if cached_page:
-                # Use cached content
-                fetch_result = FetchResult(
-                    url=cached_page["url"],
-                    content=cached_page["content"],
-                    title=cached_page["title"],
-                    links=cached_page["links"],
-                )
-            else:
-                # Fetch the page
+        has_sufficient = asyncio.Event()
+        settings = self.config.settings
+        collected_chars = sum(len(item["content"]) for item in collected_content)
+
+        async def explore_worker() -> None:
+            nonlocal pages_explored, collected_chars
+            while True:
+                # Take the best queued URL plus whatever else is already
+                # waiting, up to the batch size
+                batch = [await frontier.get()]
+                while len(batch) < settings.navigation_batch_size and not frontier.empty():
+                    batch.append(frontier.get_nowait())
                 try:
-                    base_domain = domains[0] if domains else None
-                    fetch_result = await self.web_fetcher.fetch_with_links(
-                        current_url, base_domain
-                    )
-                except Exception as e:
-                    # Skip failed fetches
-                    continue
-
-            # Ask LLM to analyze the page
-            nav_result = await self._analyze_page(query, fetch_result)
-
-            # Cache the page with summary
-            if not cached_page and fetch_result.content:
-                self.cache.put(
-                    url=fetch_result.url,
-                    title=fetch_result.title,
-                    summary=nav_result.get("summary", ""),
-                    content=fetch_result.content,
-                    links=fetch_result.links,
-                    domain=domains[0] if domains else urlparse(current_url).netloc,
-                )
-
-            # Collect relevant content
-            if nav_result.get("relevant_content"):
-                collected_content.append({
-                    "url": current_url,
-                    "content": nav_result["relevant_content"],
-                })
-                sources.append(current_url)
-
-            # Check if we have enough
-            if nav_result.get("has_sufficient_info"):
-                has_sufficient = True
-                break
-
-            # Add recommended links to queue
-            for i, link in enumerate(nav_result.get("links_to_explore", [])):
-                link_url = link.get("url", "")
-                if link_url and link_url not in visited_urls:
-                    # Priority based on position in recommendations
-                    to_explore.append((link_url, pages_explored * 10 + i))
+                    pages: list[tuple[str, int]] = []  # (url, page number)
+                    for _, _, url in batch:
+                        if url in visited_urls or pages_explored >= self.max_pages:
+                            continue
+                        visited_urls.add(url)
+                        pages_explored += 1
+                        pages.append((url, pages_explored))
+                    if not pages:
+                        continue
+
+                    try:
+                        nav_results = await self._explore_pages(
+                            query, [url for url, _ in pages], domains, queued_urls
+                        )
+                    except Exception as e:
+                        # Keep the worker alive; the failed pages count as explored
+                        logger.warning(f"Failed to explore {[url for url, _ in pages]}: {e}")
+                        continue
+
+                    for (current_url, page_number), nav_result in zip(pages, nav_results):
+                        if nav_result is None:
+                            continue
+
+                        # Collect relevant content
+                        if nav_result.get("relevant_content"):
+                            collected_content.append({
+                                "url": current_url,
+                                "content": nav_result["relevant_content"],
+                            })
+                            sources.append(current_url)
+                            collected_chars += len(nav_result["relevant_content"])
+
+                        # Check if we have enough, by the LLM's judgement or by volume
+                        enough_collected = (
+                            settings.sufficient_chars > 0
+                            and collected_chars >= settings.sufficient_chars
+                            and len(collected_content) >= settings.sufficient_min_sources
+                        )
+                        if nav_result.get("has_sufficient_info") or enough_collected:
+                            has_sufficient.set()
+                            return
+
+                        # Add recommended links to queue
+                        penalty = PREFILTER_LINK_PENALTY if nav_result.get("prefiltered") else 0
+                        for i, link in enumerate(nav_result.get("links_to_explore", [])):
+                            # Priority based on position in recommendations
+                            enqueue(link.get("url", ""), penalty + page_number * 10 + i)
+                finally:
+                    for _ in batch:
+                        frontier.task_done()
+
+        workers = [
+            asyncio.create_task(explore_worker())
+            for _ in range(self.config.settings.exploration_concurrency)
+        ]
+        frontier_drained = asyncio.create_task(frontier.join())
+        sufficient = asyncio.create_task(has_sufficient.wait())
+        # Should every worker die anyway, nobody is left to drain the frontier
+        workers_done = asyncio.ensure_future(asyncio.wait(workers))
+        try:
+            await asyncio.wait(
+                [frontier_drained, sufficient, workers_done],
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+        finally:
+            for task in (*workers, frontier_drained, sufficient, workers_done):
+                task.cancel()
+            for outcome in await asyncio.gather(*workers, return_exceptions=True):
+                if isinstance(outcome, Exception):
+                    logger.error(f"Exploration worker failed: {outcome!r}")
 
         # Handle local sources (not part of deep search)
         local_content = await self._fetch_local_sources(tool_config)
         if local_content:
             collected_content.append({
                 "url": "[local]",
-                "content": local_content,
+                "content": self._select_relevant_content(
+                    query, f"[local] {tool_config.name}", local_content
+                ),
             })
             sources.append("[local sources]")
 
@@ -305,20 +711,284 @@ Do NOT make up information - only use what's in the provided documentation."""
                 "sitemap_candidates": len(sitemap_candidates),
             }
 
-        final_content = await self._synthesize_answer(query, collected_content)
+        # A single short source already is the answer; skip the synthesis call
+        direct_max = self.config.settings.direct_answer_max_chars
+        synthesis_skipped = (
+            len(collected_content) == 1
+            and len(collected_content[0]["content"]) <= direct_max
+        )
+        trace.get_current_span().set_attribute("synthesis_skipped", synthesis_skipped)
+
+        if synthesis_skipped:
+            item = collected_content[0]
+            final_content = f"## Source: {item['url']}\n\n{item['content']}"
+            if on_chunk is not None:
+                await on_chunk(final_content)
+        else:
+            final_content = await self._synthesize_answer(
+                query, collected_content, tool_config.name, on_chunk
+            )
 
         # Truncate if needed
         max_len = self.config.settings.max_content_length
         if len(final_content) > max_len:
             final_content = final_content[:max_len] + "\n\n[Content truncated...]"
 
-        return {
+        result = {
             "content": final_content,
             "sources": sources,
             "pages_explored": pages_explored,
             "sitemap_used": sitemap_used,
             "sitemap_candidates": len(sitemap_candidates),
+            "cache_hit": cache_hit,
         }
+        self.answer_cache.put(
+            result_key, result, urls=(item["url"] for item in collected_content)
+        )
+        return result
+
+    async def _cache_shortcut_result(
+        self,
+        items: list[dict[str, str]],
+        on_chunk: ChunkCallback | None,
+        result_key: str,
+    ) -> dict[str, Any]:
+        """Answer a search straight from cached pages, with no fetches or LLM calls.
+
+        Args:
+            items: The cached pages' relevant content, best first.
+            on_chunk: Optional callback, sent the whole answer at once.
+            result_key: Answer cache key of the search result.
+
+        Returns:
+            The search result, in the format of _deep_search.
+        """
+        trace.get_current_span().set_attribute("cache_shortcut", True)
+
+        final_content = "\n\n---\n\n".join(
+            f"## Source: {item['url']}\n\n{item['content']}" for item in items
+        )
+        max_len = self.config.settings.max_content_length
+        if len(final_content) > max_len:
+            final_content = final_content[:max_len] + "\n\n[Content truncated...]"
+        if on_chunk is not None:
+            await on_chunk(final_content)
+
+        result = {
+            "content": final_content,
+            "sources": [f"[cached] {item['url']}" for item in items],
+            "pages_explored": 0,
+            "sitemap_used": False,
+            "sitemap_candidates": 0,
+            "cache_hit": True,
+        }
+        self.answer_cache.put(result_key, result, urls=(item["url"] for item in items))
+        return result
+
+    async def _explore_pages(
+        self,
+        query: str,
+        urls: list[str],
+        domains: list[str],
+        skip_urls: Collection[str] = (),
+    ) -> list[dict[str, Any] | None]:
+        """Fetch (or load from cache) and analyze a batch of pages.
+
+        Pages are loaded concurrently. Those the prefilter can't settle are
+        analyzed together in a single navigation call when there are several.
+
+        Args:
+            query: The user's search query.
+            urls: The pages to explore.
+            domains: Allowed domains for the tool, first one used for links.
+            skip_urls: URLs already explored or queued, not offered as links.
+
+        Returns:
+            The navigation analysis of each page, in order, or None for pages
+            that couldn't be fetched.
+        """
+        loaded = await asyncio.gather(*[self._load_page(url, domains) for url in urls])
+
+        # Ask LLM to analyze the pages, unless they are plainly off-topic
+        nav_results: list[dict[str, Any] | None] = [None] * len(urls)
+        pages: dict[int, FetchResult] = {}
+        to_analyze: list[int] = []
+        for i, page in enumerate(loaded):
+            if page is None:
+                continue
+            pages[i] = page[0]
+            nav_results[i] = self._prefilter_page(query, pages[i])
+            if nav_results[i] is None:
+                nav_results[i] = self._recall_decision(query, pages[i])
+            if nav_results[i] is None:
+                to_analyze.append(i)
+
+        if len(to_analyze) == 1:
+            i = to_analyze[0]
+            nav_results[i] = await self._analyze_page(query, pages[i], skip_urls)
+        elif to_analyze:
+            decisions = await self._analyze_pages_batch(
+                query, [pages[i] for i in to_analyze], skip_urls
+            )
+            for i, decision in zip(to_analyze, decisions):
+                nav_results[i] = decision
+
+        # Cache the fetched pages with their summaries, under the crawl URL
+        # that lookups and answer sources use rather than the redirect target
+        for url, page, nav_result in zip(urls, loaded, nav_results):
+            if page is None or nav_result is None:
+                continue
+            fetch_result, from_cache = page
+            if not from_cache and fetch_result.content:
+                self.cache.put(
+                    url=url,
+                    title=fetch_result.title,
+                    summary=nav_result.get("summary", ""),
+                    content=fetch_result.content,
+                    links=fetch_result.links,
+                    domain=domains[0] if domains else urlparse(url).netloc,
+                )
+
+        return nav_results
+
+    async def _load_page(
+        self, url: str, domains: list[str]
+    ) -> tuple[FetchResult, bool] | None:
+        """Load a page from the cache, or fetch it.
+
+        Args:
+            url: The page to load.
+            domains: Allowed domains for the tool, first one used for links.
+
+        Returns:
+            The page and whether it came from the cache, or None if it
+            couldn't be fetched.
+        """
+        # Check cache first
+        cached_page = self.cache.get(url)
+        if cached_page:
+            fetch_result = FetchResult(
+                url=cached_page["url"],
+                content=cached_page["content"],
+                title=cached_page["title"],
+                links=cached_page["links"],
+            )
+            return fetch_result, True
+
+        # Skip URLs that failed recently instead of waiting on them again
+        if self.cache.is_negative(url):
+            return None
+
+        # Fetch the page
+        try:
+            base_domain = domains[0] if domains else None
+            async with self._fetch_slots:
+                fetch_result = await self.web_fetcher.fetch_with_links(url, base_domain)
+        except Exception as e:
+            # Skip failed fetches, and remember them for a while
+            self.cache.put_negative(url, str(e) or type(e).__name__, ttl=self._failure_ttl(e))
+            return None
+
+        if not fetch_result.content and not fetch_result.links:
+            self.cache.put_negative(url, "empty page", ttl=PERMANENT_FAILURE_TTL)
+            return None
+
+        return fetch_result, False
+
+    @staticmethod
+    def _failure_ttl(error: Exception) -> int:
+        """How long to skip a URL after a fetch error."""
+        if isinstance(error, httpx.HTTPStatusError):
+            status = error.response.status_code
+            if 400 <= status < 500 and status not in (408, 429):
+                return PERMANENT_FAILURE_TTL
+        return TRANSIENT_FAILURE_TTL
+
+    def _prefilter_page(
+        self, query: str, fetch_result: FetchResult
+    ) -> dict[str, Any] | None:
+        """Build a navigation decision locally for pages unrelated to the query.
+
+        Args:
+            query: The user's search query.
+            fetch_result: The fetched page content and links.
+
+        Returns:
+            A keyword-based navigation decision if too few query words
+            appear on the page, or None if the page should go to the LLM.
+        """
+        min_relevance = self.config.settings.min_page_relevance
+        if min_relevance <= 0:
+            return None
+
+        terms = query_terms(query)
+        page_text = " ".join((
+            fetch_result.url,
+            fetch_result.title,
+            fetch_result.content[:self.config.settings.max_analysis_chars],
+        ))
+        if term_coverage(terms, page_text) >= min_relevance:
+            return None
+
+        # Follow the links whose text or URL mention the most query words
+        scored_links = []
+        for link in fetch_result.links:
+            score = term_coverage(terms, f"{link['text']} {link['url']}")
+            if score > 0:
+                scored_links.append((score, link["url"]))
+        top_links = heapq.nlargest(PREFILTER_MAX_LINKS, scored_links, key=itemgetter(0))
+
+        # Title and first paragraph stand in for the LLM summary in the cache
+        first_paragraph = fetch_result.content.strip().split("\n\n", 1)[0][:300]
+        summary = " - ".join(part for part in (fetch_result.title, first_paragraph) if part)
+
+        return {
+            "has_sufficient_info": False,
+            "relevant_content": "",
+            "summary": summary,
+            "links_to_explore": [
+                {"url": url, "reason": "keyword match"}
+                for _, url in top_links
+            ],
+            "prefiltered": True,
+        }
+
+    def _select_relevant_content(
+        self,
+        query: str,
+        doc_id: str,
+        content: str,
+        fallback_chars: int | None = None,
+    ) -> str:
+        """Reduce a document to the chunks most relevant to the query.
+
+        Args:
+            query: The user's search query.
+            doc_id: Identifier for the document in the chunk index.
+            content: Full document content.
+            fallback_chars: Characters to keep when retrieval is disabled or
+                            finds nothing (None keeps the whole document).
+
+        Returns:
+            The relevant chunks joined together, or the (truncated) content.
+        """
+        if self.retrieval_enabled:
+            self.chunk_index.add(doc_id, content)
+            chunks = self.chunk_index.search(
+                query,
+                k=self.config.settings.retrieval.top_k,
+                doc_ids=[doc_id],
+            )
+            if chunks:
+                return "\n\n".join(chunk.text for chunk in chunks)
+
+        return content[:fallback_chars] if fallback_chars else content
+
+    def _index_cached_page(self, url: str) -> None:
+        """Chunk and index a page as soon as it is written to the cache."""
+        page = self.cache.get(url, count_access=False)
+        if page:
+            self.chunk_index.add(url, page["content"])
 
     def _get_starting_points(
         self, tool_config: ToolConfig
@@ -331,17 +1001,38 @@ Do NOT make up information - only use what's in the provided documentation."""
         Returns:
             Tuple of (list of starting URLs, list of allowed domains).
         """
-        urls = []
-        domains = []
+        sources = self._get_tool_sources(tool_config)
+        return sources.start_urls, sources.domains
 
+    def _get_tool_sources(self, tool_config: ToolConfig) -> ToolSources:
+        """Split a tool's sources by type, parsing each web source's domain.
+
+        The result is remembered per tool and rebuilt whenever the tool's
+        config object is replaced.
+
+        Args:
+            tool_config: Configuration for the tool.
+
+        Returns:
+            The tool's web and local sources.
+        """
+        cached = self._tool_sources.get(tool_config.name)
+        if cached is not None and cached[0] is tool_config:
+            return cached[1]
+
+        sources = ToolSources(start_urls=[], domains=[], web=[], local=[])
         for source in tool_config.sources:
             if isinstance(source, WebSource):
-                urls.append(source.url)
-                parsed = urlparse(source.url)
-                if parsed.netloc and parsed.netloc not in domains:
-                    domains.append(parsed.netloc)
+                domain = urlparse(source.url).netloc
+                sources.start_urls.append(source.url)
+                sources.web.append((source.url, domain))
+                if domain and domain not in sources.domains:
+                    sources.domains.append(domain)
+            elif isinstance(source, LocalSource):
+                sources.local.append(source)
 
-        return urls, domains
+        self._tool_sources[tool_config.name] = (tool_config, sources)
+        return sources
 
     async def _get_sitemap_candidates(
         self, query: str, tool_config: ToolConfig
@@ -361,16 +1052,10 @@ Do NOT make up information - only use what's in the provided documentation."""
         sitemap_settings = self.config.settings.sitemap_index
         candidates: list[tuple[str, float]] = []
 
-        for source in tool_config.sources:
-            if not isinstance(source, WebSource):
-                continue
-
-            parsed = urlparse(source.url)
-            domain = parsed.netloc
-
+        for url, domain in self._get_tool_sources(tool_config).web:
             # Ensure domain is indexed (lazy indexing)
             try:
-                await self.sitemap_index.ensure_indexed(domain, source.url)
+                await self.sitemap_index.ensure_indexed(domain, url)
             except Exception:
                 # Skip if indexing fails - will fall back to normal search
                 continue
@@ -387,51 +1072,39 @@ Do NOT make up information - only use what's in the provided documentation."""
                 if match.score >= sitemap_settings.min_match_score:
                     candidates.append((match.url, match.score))
 
-        # Sort by score descending
-        candidates.sort(key=lambda x: x[1], reverse=True)
-        return candidates[:sitemap_settings.max_url_candidates]
+        # Best scores across all sources
+        return heapq.nlargest(
+            sitemap_settings.max_url_candidates, candidates, key=itemgetter(1)
+        )
 
     async def _analyze_page(
-        self, query: str, fetch_result: FetchResult
+        self, query: str, fetch_result: FetchResult, skip_urls: Collection[str] = ()
     ) -> dict[str, Any]:
         """Use LLM to analyze a page and decide next steps.
 
         Args:
             query: The user's search query.
             fetch_result: The fetched page content and links.
+            skip_urls: URLs already explored or queued, not offered as links.
 
         Returns:
             Navigation decision with relevant content and links to explore.
         """
-        # Truncate content for analysis
-        content = fetch_result.content[:50000]
-
-        # Compress content to reduce token usage
-        compression_settings = self.config.settings.compression
-        compressed_content = self.compressor.compress(
-            content,
-            aggressiveness=compression_settings.analysis_aggressiveness,
-        )
-
-        # Format links for the prompt
-        links_text = "\n".join(
-            f"- [{link['text']}]({link['url']})"
-            for link in fetch_result.links[:50]  # Limit links shown
+        (compressed_content,) = await self._compress_for_analysis([fetch_result])
+
+        prompt = NAV_PROMPT_TEMPLATE.format(
+            query=query,
+            url=fetch_result.url,
+            title=fetch_result.title,
+            content=compressed_content.compressed_text,
+            links=_format_links(
+                fetch_result.links,
+                query_terms(query),
+                self.config.settings.max_prompt_links,
+                skip_urls,
+            ),
         )
 
-        prompt = f"""Query: {query}
-
-Current page: {fetch_result.url}
-Title: {fetch_result.title}
-
-Page content:
-{compressed_content.compressed_text}
-
-Available links on this page:
-{links_text}
-
-Analyze this page and respond with a JSON object."""
-
         with self.tracer.start_as_current_span("nav_decision") as span:
             span.set_attribute("url", fetch_result.url)
             span.set_attribute("content_compressed", compressed_content.was_compressed)
@@ -440,13 +1113,7 @@ Analyze this page and respond with a JSON object."""
                 span.set_attribute("compression_ratio", compressed_content.compression_ratio)
 
             try:
-                response = await self.llm.generate(
-                    prompt=prompt,
-                    system_instruction=self.nav_system_instruction,
-                    max_tokens=4096,
-                    temperature=0.1,
-                    json_response=True,
-                )
+                response = await self._stream_navigation(prompt, span)
 
                 result_text = response.text
 
@@ -457,69 +1124,351 @@ Analyze this page and respond with a JSON object."""
                     response=result_text[:500],
                     tokens_in=response.tokens_in,
                     tokens_out=response.tokens_out,
+                    tokens_cached=response.tokens_cached,
                 )
 
-                return json.loads(result_text)
+                decision = NavDecision.model_validate_json(result_text).model_dump()
+                self._remember_decision(query, fetch_result, decision)
+                return decision
 
-            except (json.JSONDecodeError, Exception) as e:
+            except Exception as e:
                 # Return safe default on error
-                return {
-                    "has_sufficient_info": False,
-                    "relevant_content": "",
-                    "summary": fetch_result.title,
-                    "links_to_explore": [],
-                }
+                logger.warning(f"Navigation failed for {fetch_result.url}: {e}")
+                return self._default_decision(fetch_result)
+
+    async def _analyze_pages_batch(
+        self,
+        query: str,
+        fetch_results: list[FetchResult],
+        skip_urls: Collection[str] = (),
+    ) -> list[dict[str, Any]]:
+        """Use one LLM call to analyze several pages and decide next steps.
+
+        The system instruction and query are sent once for the whole batch.
+        Unlike single-page analysis the response isn't streamed, since each
+        page's decision is needed before any of them is acted on.
+
+        Args:
+            query: The user's search query.
+            fetch_results: The fetched pages.
+            skip_urls: URLs already explored or queued, not offered as links.
+
+        Returns:
+            Navigation decision for each page, in order.
+        """
+        terms = query_terms(query)
+        compressed_contents = await self._compress_for_analysis(fetch_results)
+        sections = []
+        for number, (fetch_result, compressed_content) in enumerate(
+            zip(fetch_results, compressed_contents), 1
+        ):
+            sections.append(NAV_BATCH_PAGE_TEMPLATE.format(
+                number=number,
+                url=fetch_result.url,
+                title=fetch_result.title,
+                content=compressed_content.compressed_text,
+                links=_format_links(
+                    fetch_result.links, terms, self.config.settings.max_prompt_links, skip_urls
+                ),
+            ))
+
+        prompt = NAV_BATCH_PROMPT_TEMPLATE.format(
+            query=query,
+            pages="\n\n".join(sections),
+            count=len(fetch_results),
+        )
+        defaults = [self._default_decision(fetch_result) for fetch_result in fetch_results]
+        system_instruction, response_schema = self._nav_format(
+            NavBatch, NAV_BATCH_RESPONSE_FORMAT
+        )
+
+        with self.tracer.start_as_current_span("nav_decision_batch") as span:
+            span.set_attribute("pages", len(fetch_results))
+
+            try:
+                started = time.perf_counter()
+                async with self._nav_slots:
+                    response = await self.llm.generate(
+                        prompt=prompt,
+                        system_instruction=system_instruction,
+                        max_tokens=NAV_MAX_TOKENS * len(fetch_results),
+                        temperature=0.1,
+                        json_response=True,
+                        response_schema=response_schema,
+                    )
+                span.set_attribute("latency_ms", (time.perf_counter() - started) * 1000)
+
+                # Trace the call
+                trace_llm_call(
+                    model=response.model or self.llm.name,
+                    messages=[{"role": "user", "content": prompt[:500]}],
+                    response=response.text[:500],
+                    tokens_in=response.tokens_in,
+                    tokens_out=response.tokens_out,
+                    tokens_cached=response.tokens_cached,
+                )
+
+                decisions = NavBatch.model_validate_json(response.text).pages
+
+            except Exception as e:
+                logger.warning(f"Batch navigation failed for {len(fetch_results)} pages: {e}")
+                return defaults
+
+        results = [decision.model_dump() for decision in decisions[:len(fetch_results)]]
+        for fetch_result, decision in zip(fetch_results, results):
+            self._remember_decision(query, fetch_result, decision)
+
+        # Pages the response left out keep the safe default
+        return results + defaults[len(results):]
+
+    async def _compress_for_analysis(
+        self, fetch_results: list[FetchResult]
+    ) -> list[CompressionResult]:
+        """Shrink pages' content for a navigation prompt.
+
+        Pages needing the compression API are sent to it concurrently.
+
+        Args:
+            fetch_results: The fetched pages.
+
+        Returns:
+            The compressed content of each page, for the prompt and span
+            attributes.
+        """
+        compression_settings = self.config.settings.compression
+        max_chars = self.config.settings.max_analysis_chars
+
+        contents = []
+        for fetch_result in fetch_results:
+            # Truncate content for analysis; the full page is still what gets cached
+            content = fetch_result.content
+            if len(content) > max_chars:
+                content = content[:max_chars]
+
+            # Cheap local passes first: nav chrome and filler go, and since links
+            # are listed separately in the prompt, inline link targets are dropped
+            if compression_settings.strip_boilerplate:
+                content = strip_boilerplate(content)
+            contents.append(fast_compress(content))
+
+        # Compress content to reduce token usage
+        return await self.compressor.compress_many(
+            contents,
+            aggressiveness=compression_settings.analysis_aggressiveness,
+        )
+
+    @staticmethod
+    def _decision_key(query: str, fetch_result: FetchResult) -> str:
+        """Memo key for a navigation decision; changes when the page does."""
+        digest = hashlib.blake2b(digest_size=16)
+        for part in (query, fetch_result.url, fetch_result.content):
+            digest.update(part.encode())
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _recall_decision(
+        self, query: str, fetch_result: FetchResult
+    ) -> dict[str, Any] | None:
+        """Return a remembered navigation decision for this query and page."""
+        key = self._decision_key(query, fetch_result)
+        decision = self._nav_memo.get(key)
+        if decision is not None:
+            self._nav_memo.move_to_end(key)
+        return decision
+
+    def _remember_decision(
+        self, query: str, fetch_result: FetchResult, decision: dict[str, Any]
+    ) -> None:
+        """Remember a successful navigation decision, evicting the oldest."""
+        self._nav_memo[self._decision_key(query, fetch_result)] = decision
+        while len(self._nav_memo) > NAV_MEMO_SIZE:
+            self._nav_memo.popitem(last=False)
+
+    @staticmethod
+    def _default_decision(fetch_result: FetchResult) -> dict[str, Any]:
+        """Navigation decision used when a page's analysis fails."""
+        return {
+            "has_sufficient_info": False,
+            "relevant_content": "",
+            "summary": fetch_result.title,
+            "links_to_explore": [],
+        }
+
+    def _nav_format(
+        self, schema: type[BaseModel], response_format: str
+    ) -> tuple[str, type[BaseModel] | None]:
+        """Pick how a navigation call asks for its JSON response.
+
+        Args:
+            schema: Model the response must follow.
+            response_format: The same layout described for the prompt.
+
+        Returns:
+            The system instruction and response schema to send.
+        """
+        # Schema-aware providers enforce the model themselves; the rest
+        # are told the JSON shape in the system instruction
+        if self.llm.supports_response_schema:
+            return self.nav_system_instruction, schema
+        return self.nav_system_instruction + response_format, None
+
+    async def _stream_navigation(self, prompt: str, span: trace.Span) -> LLMResponse:
+        """Stream a navigation decision, stopping once the rest isn't needed.
+
+        A decision reporting sufficient information ends the crawl, so the
+        links it goes on to recommend would never be followed; the stream is
+        closed as soon as the links_to_explore key appears and the decision
+        is returned with an empty list.
+
+        Args:
+            prompt: The navigation prompt.
+            span: The nav_decision span, for latency attributes.
+
+        Returns:
+            The (possibly cut short) JSON response.
+        """
+        parts: list[str] = []
+        tokens_in = tokens_out = tokens_cached = None
+        model = None
+        started = time.perf_counter()
+
+        system_instruction, response_schema = self._nav_format(
+            NavDecision, NAV_RESPONSE_FORMAT
+        )
+
+        async with self._nav_slots, aclosing(self.llm.stream_generate(
+            prompt=prompt,
+            system_instruction=system_instruction,
+            max_tokens=NAV_MAX_TOKENS,
+            temperature=0.1,
+            json_response=True,
+            response_schema=response_schema,
+        )) as stream:
+            async for chunk in stream:
+                tokens_in = chunk.tokens_in if chunk.tokens_in is not None else tokens_in
+                tokens_out = chunk.tokens_out if chunk.tokens_out is not None else tokens_out
+                tokens_cached = (
+                    chunk.tokens_cached if chunk.tokens_cached is not None else tokens_cached
+                )
+                model = chunk.model or model
+                if not chunk.text:
+                    continue
+                if not parts:
+                    span.set_attribute("first_token_ms", (time.perf_counter() - started) * 1000)
+                parts.append(chunk.text)
+
+                decision = _sufficient_decision("".join(parts))
+                if decision is not None:
+                    span.set_attribute("stopped_early", True)
+                    return LLMResponse(
+                        text=decision,
+                        tokens_in=tokens_in,
+                        tokens_out=tokens_out,
+                        model=model,
+                        tokens_cached=tokens_cached,
+                    )
+
+        return LLMResponse(
+            text="".join(parts),
+            tokens_in=tokens_in,
+            tokens_out=tokens_out,
+            model=model,
+            tokens_cached=tokens_cached,
+        )
 
     async def _synthesize_answer(
-        self, query: str, collected_content: list[dict[str, str]]
+        self,
+        query: str,
+        collected_content: list[dict[str, str]],
+        tool_name: str = "",
+        on_chunk: ChunkCallback | None = None,
     ) -> str:
         """Synthesize final answer from collected content.
 
+        Answers are cached by query, tool and a hash of the collected content,
+        so repeated queries over unchanged documentation skip the LLM call.
+
         Args:
             query: The user's search query.
             collected_content: List of content excerpts from explored pages.
+            tool_name: Name of the tool being searched (part of the cache key).
+            on_chunk: If given, each chunk of the answer is passed to this
+                      callback as it arrives from the LLM.
 
         Returns:
             Synthesized documentation answer.
         """
+        # Drop repeated boilerplate (sidebars, shared headers) across sources
+        # so the token budget goes to distinct content
+        deduped, paragraphs_dropped = dedupe_paragraphs(
+            item["content"] for item in collected_content
+        )
+
         # Format collected content
         content_parts = []
-        for item in collected_content:
-            content_parts.append(f"## Source: {item['url']}\n\n{item['content']}")
-
-        combined = "\n\n---\n\n".join(content_parts)
-
-        # Truncate if needed
-        if len(combined) > 100000:
-            combined = combined[:100000] + "\n\n[Content truncated...]"
-
-        # Compress combined content to reduce token usage (light compression for synthesis)
+        for item, content in zip(collected_content, deduped):
+            content_parts.append(f"## Source: {item['url']}\n\n{content}")
+
+        # Hashed part by part rather than joined into one more full-size copy
+        docs_digest = hashlib.blake2b(digest_size=16)
+        for part in content_parts:
+            docs_digest.update(part.encode())
+        cache_key = self.answer_cache.make_key(query, tool_name, docs_digest.hexdigest())
+        cached_answer: str | None = self.answer_cache.get(cache_key)
+        if cached_answer is not None:
+            if on_chunk is not None:
+                await on_chunk(cached_answer)
+            return cached_answer
+
+        # Pack whole sources into the token budget, cutting on section boundaries
+        max_tokens = self.config.settings.max_synthesis_tokens
+        combined, truncated = pack_sections(content_parts, max_tokens)
+
+        # Too much to send at once: condense every source in parallel (map),
+        # then synthesize from the condensed sources (reduce) so none is cut
+        map_reduced = truncated and len(content_parts) >= MAP_REDUCE_MIN_SOURCES
+        if map_reduced:
+            summaries = await asyncio.gather(*[
+                self._summarize_source(query, item["url"], content)
+                for item, content in zip(collected_content, deduped)
+            ])
+            condensed = [
+                f"## Source: {item['url']}\n\n{summary}"
+                for item, summary in zip(collected_content, summaries)
+                if summary
+            ]
+            if condensed:
+                combined, truncated = pack_sections(condensed, max_tokens)
+
+        if truncated:
+            combined += "\n\n[Content truncated...]"
+
+        # Compress combined content to reduce token usage (light compression for synthesis),
+        # off the event loop like analysis compression
         compression_settings = self.config.settings.compression
-        compressed_content = self.compressor.compress(
-            combined,
+        (compressed_content,) = await self.compressor.compress_many(
+            [combined],
             aggressiveness=compression_settings.synthesis_aggressiveness,
         )
 
-        prompt = f"""Query: {query}
-
-Documentation excerpts found:
-
-{compressed_content.compressed_text}
-
-Please synthesize a comprehensive answer to the query using the documentation above. Include code examples if available."""
+        prompt = SYNTHESIS_PROMPT_TEMPLATE.format(
+            query=query, content=compressed_content.compressed_text
+        )
 
         with self.tracer.start_as_current_span("synthesis") as span:
+            span.set_attribute("paras_dropped_dedupe", paragraphs_dropped)
+            span.set_attribute("map_reduced", map_reduced)
             span.set_attribute("content_compressed", compressed_content.was_compressed)
             if compressed_content.was_compressed:
                 span.set_attribute("tokens_saved", compressed_content.tokens_saved)
                 span.set_attribute("compression_ratio", compressed_content.compression_ratio)
 
-            response = await self.llm.generate(
-                prompt=prompt,
-                system_instruction=self.synthesis_system_instruction,
-                max_tokens=8192,
-                temperature=0.1,
-                json_response=False,
+            span.set_attribute("streamed", on_chunk is not None)
+
+            # Always streamed, so generation stops once the answer outgrows
+            # what the search will return anyway
+            response = await self._stream_answer(
+                prompt, on_chunk, self.config.settings.max_content_length, span
             )
 
             result = response.text
@@ -530,29 +1479,144 @@ Please synthesize a comprehensive answer to the query using the documentation ab
                 response=result[:500],
                 tokens_in=response.tokens_in,
                 tokens_out=response.tokens_out,
+                tokens_cached=response.tokens_cached,
             )
 
+            self.answer_cache.put(
+                cache_key, result, urls=(item["url"] for item in collected_content)
+            )
             return result
 
+    async def _summarize_source(self, query: str, url: str, content: str) -> str:
+        """Condense one source to the parts relevant to the query (map step).
+
+        Args:
+            query: The user's search query.
+            url: The source's URL, for context.
+            content: The source's collected content.
+
+        Returns:
+            The condensed source, an empty string if it isn't relevant, or
+            the start of the source if the LLM call fails.
+        """
+        content = truncate_to_tokens(content, self.config.settings.max_synthesis_tokens)
+        prompt = SOURCE_SUMMARY_PROMPT_TEMPLATE.format(query=query, url=url, content=content)
+
+        try:
+            async with self._nav_slots:
+                response = await self.llm.generate(
+                    prompt=prompt,
+                    system_instruction=SOURCE_SUMMARY_SYSTEM_INSTRUCTION,
+                    max_tokens=SOURCE_SUMMARY_MAX_TOKENS,
+                    temperature=0.1,
+                    json_response=False,
+                )
+        except Exception:
+            return truncate_to_tokens(content, SOURCE_SUMMARY_MAX_TOKENS)
+
+        trace_llm_call(
+            model=response.model or self.llm.name,
+            messages=[{"role": "user", "content": prompt[:500]}],
+            response=response.text[:500],
+            tokens_in=response.tokens_in,
+            tokens_out=response.tokens_out,
+            tokens_cached=response.tokens_cached,
+        )
+
+        summary = response.text.strip()
+        return "" if summary == SOURCE_NOT_RELEVANT else summary
+
+    async def _stream_answer(
+        self,
+        prompt: str,
+        on_chunk: ChunkCallback | None,
+        max_chars: int,
+        span: trace.Span,
+    ) -> LLMResponse:
+        """Stream a synthesis response, optionally forwarding each chunk.
+
+        The stream is closed once the answer passes max_chars, since the
+        search truncates its content there; the chunk that crosses the
+        limit is kept so the caller still sees the answer was cut.
+
+        Args:
+            prompt: The synthesis prompt.
+            on_chunk: Coroutine called with each non-empty chunk of text,
+                      up to max_chars in total.
+            max_chars: Answer length after which generation stops.
+            span: The synthesis span, for the stopped_at_max_len attribute.
+
+        Returns:
+            The complete (or cut off) response with token counts from the stream.
+        """
+        parts: list[str] = []
+        length = 0
+        tokens_in = tokens_out = tokens_cached = None
+        model = None
+
+        async with aclosing(self.llm.stream_generate(
+            prompt=prompt,
+            system_instruction=self.synthesis_system_instruction,
+            max_tokens=8192,
+            temperature=0.1,
+            json_response=False,
+        )) as stream:
+            async for chunk in stream:
+                tokens_in = chunk.tokens_in if chunk.tokens_in is not None else tokens_in
+                tokens_out = chunk.tokens_out if chunk.tokens_out is not None else tokens_out
+                tokens_cached = (
+                    chunk.tokens_cached if chunk.tokens_cached is not None else tokens_cached
+                )
+                model = chunk.model or model
+                if not chunk.text:
+                    continue
+
+                parts.append(chunk.text)
+                if on_chunk is not None and length < max_chars:
+                    await on_chunk(chunk.text[:max_chars - length])
+                length += len(chunk.text)
+                if length > max_chars:
+                    span.set_attribute("stopped_at_max_len", True)
+                    break
+
+        return LLMResponse(
+            text="".join(parts),
+            tokens_in=tokens_in,
+            tokens_out=tokens_out,
+            model=model,
+            tokens_cached=tokens_cached,
+        )
+
     async def _fetch_local_sources(self, tool_config: ToolConfig) -> str:
         """Fetch content from local sources.
 
+        All sources are read concurrently; results keep the configured order.
+
         Args:
             tool_config: Configuration for the tool.
 
         Returns:
             Combined local documentation content.
         """
-        parts = []
-        for source in tool_config.sources:
-            if isinstance(source, LocalSource):
-                try:
-                    content = await self.local_fetcher.fetch(source)
-                    if content:
-                        parts.append(content)
-                except Exception:
-                    pass
-        return "\n\n".join(parts)
+        local_sources = self._get_tool_sources(tool_config).local
+        contents = await asyncio.gather(
+            *[self._fetch_local_source(source) for source in local_sources]
+        )
+        return "\n\n".join(content for content in contents if content)
+
+    async def _fetch_local_source(self, source: LocalSource) -> str:
+        """Fetch a single local source, returning an empty string on failure.
+
+        Args:
+            source: Local source configuration.
+
+        Returns:
+            The source's documentation content.
+        """
+        try:
+            return await self.local_fetcher.fetch(source)
+        except Exception:
+            return ""
 
     async def list_tools(self) -> list[dict[str, str]]:
         """List all available tools.
@@ -572,3 +1636,5 @@ Please synthesize a comprehensive answer to the query using the documentation ab
     async def close(self) -> None:
         """Clean up resources."""
         await self.web_fetcher.close()
+        self.chunk_index.close()
+        self.cache.close()
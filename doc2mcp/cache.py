@@ -1,10 +1,81 @@
-"""JSON file-based cache for documentation pages."""
+"""SQLite-backed cache for documentation pages and in-memory answer cache."""
 
-import json
 import hashlib
-from datetime import datetime, timezone
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import TypedDict
+from typing import Any, TypedDict
+
+import orjson
+
+from doc2mcp.fetchers.web import canonicalize_url
+
+# Shared by the API, job workers and MCP server so they all see one cache
+DEFAULT_CACHE_PATH = os.environ.get("DOC2MCP_PAGE_CACHE", "./doc_cache.db")
+
+# Pages kept decoded in memory in front of SQLite
+DEFAULT_MEMORY_ENTRIES = 256
+
+# Pages kept in the database before the oldest are evicted (0 = unlimited)
+DEFAULT_MAX_PAGES = 10_000
+
+# Synthesized answers kept in memory before the least recently used are evicted
+DEFAULT_ANSWER_ENTRIES = 1024
+
+# Pages are refetched after an hour, or after this many reads (0 = unlimited)
+DEFAULT_PAGE_TTL = 3600
+DEFAULT_MAX_READS = 100
+
+# How long a URL that failed to fetch is skipped before being retried
+DEFAULT_NEGATIVE_TTL = 3600
+
+# BM25 column weights for (title, summary, content) in similarity search
+_FTS_WEIGHTS = (2.0, 1.0, 0.1)
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    content TEXT NOT NULL,
+    links TEXT NOT NULL,
+    domain TEXT NOT NULL,
+    fetched_at TEXT NOT NULL,
+    access_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS pages_domain_fetched_at ON pages (domain, fetched_at);
+CREATE VIRTUAL TABLE IF NOT EXISTS pages_fts USING fts5(
+    title, summary, content, content='pages', content_rowid='rowid'
+);
+CREATE TRIGGER IF NOT EXISTS pages_fts_insert AFTER INSERT ON pages BEGIN
+    INSERT INTO pages_fts (rowid, title, summary, content)
+    VALUES (new.rowid, new.title, new.summary, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS pages_fts_delete AFTER DELETE ON pages BEGIN
+    INSERT INTO pages_fts (pages_fts, rowid, title, summary, content)
+    VALUES ('delete', old.rowid, old.title, old.summary, old.content);
+END;
+CREATE TRIGGER IF NOT EXISTS pages_fts_update AFTER UPDATE OF title, summary, content ON pages
+BEGIN
+    INSERT INTO pages_fts (pages_fts, rowid, title, summary, content)
+    VALUES ('delete', old.rowid, old.title, old.summary, old.content);
+    INSERT INTO pages_fts (rowid, title, summary, content)
+    VALUES (new.rowid, new.title, new.summary, new.content);
+END;
+CREATE TABLE IF NOT EXISTS failures (
+    url TEXT PRIMARY KEY,
+    reason TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
 
 
 class CachedPage(TypedDict):
@@ -20,47 +91,252 @@ class CachedPage(TypedDict):
 
 
 class PageCache:
-    """File-based cache for documentation pages with similarity-based lookup.
+    """SQLite-backed cache for documentation pages with similarity-based lookup.
 
-    Pages are stored with descriptive keys that can be used for similarity matching
-    to find relevant cached content without re-fetching.
+    Pages are stored in a WAL-mode SQLite database so that the API, job
+    workers and MCP server can read and write the same cache concurrently,
+    with each write touching only its own row. Recently used pages are also
+    kept decoded in a small in-process LRU; a hit there is revalidated
+    against the row's fetched_at so writes from other processes are seen.
+
+    Pages expire after a TTL (overridable per domain) or after being read
+    max_reads times, whichever comes first; expired pages are treated as
+    misses and deleted, so the caller refetches them.
+
+    The database holds at most max_pages pages; beyond that the pages
+    fetched longest ago are evicted. hits and misses count get() results,
+    for sizing memory_entries and max_pages.
+
+    Titles, summaries and content are kept in an FTS5 full-text index
+    (maintained by triggers) for find_similar.
+
+    URLs that could not be fetched are remembered separately for a while
+    (see put_negative), so broken links aren't retried on every query.
     """
 
-    def __init__(self, cache_path: str | Path = "./doc_cache.json") -> None:
+    def __init__(
+        self,
+        cache_path: str | Path = DEFAULT_CACHE_PATH,
+        memory_entries: int = DEFAULT_MEMORY_ENTRIES,
+        ttl: int = DEFAULT_PAGE_TTL,
+        max_reads: int = DEFAULT_MAX_READS,
+        domain_ttl: dict[str, int] | None = None,
+        max_pages: int = DEFAULT_MAX_PAGES,
+    ) -> None:
+        """Initialize the page cache.
+
+        Args:
+            cache_path: Path to the SQLite database.
+            memory_entries: Pages kept decoded in the in-process LRU.
+            ttl: Seconds before a page expires (0 = never).
+            max_reads: Reads before a page expires (0 = unlimited).
+            domain_ttl: Per-domain TTL overrides in seconds.
+            max_pages: Pages kept before the oldest are evicted (0 = unlimited).
+        """
         self.cache_path = Path(cache_path)
-        self._cache: dict[str, CachedPage] = {}
-        self._load_cache()
-
-    def _load_cache(self) -> None:
-        """Load cache from disk."""
-        if self.cache_path.exists():
-            try:
-                with open(self.cache_path, encoding="utf-8") as f:
-                    self._cache = json.load(f)
-            except (json.JSONDecodeError, OSError):
-                self._cache = {}
-
-    def _save_cache(self) -> None:
-        """Save cache to disk."""
+        self.memory_entries = memory_entries
+        self.ttl = ttl
+        self.max_reads = max_reads
+        self.domain_ttl = domain_ttl or {}
+        self.max_pages = max_pages
+        self.hits = 0
+        self.misses = 0
+        self._memory: OrderedDict[str, CachedPage] = OrderedDict()
+        self._listeners: list[Callable[[str], object]] = []
+        self._lock = threading.Lock()
+
         self.cache_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(self.cache_path, "w", encoding="utf-8") as f:
-            json.dump(self._cache, f, indent=2, ensure_ascii=False)
+        self._conn = sqlite3.connect(self.cache_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        # INSERT OR REPLACE must fire the delete trigger that updates the FTS index
+        self._conn.execute("PRAGMA recursive_triggers=ON")
+        had_fts = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'pages_fts'"
+        ).fetchone()
+        self._conn.executescript(_SCHEMA)
+        if not had_fts:
+            # Index pages written before the full-text index existed
+            with self._conn:
+                self._conn.execute("INSERT INTO pages_fts (pages_fts) VALUES ('rebuild')")
+        self._import_legacy_json()
+        self.sweep()
+        self._page_count = self._conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    def _import_legacy_json(self) -> None:
+        """Import pages from the old JSON cache file next to a new database."""
+        legacy_path = self.cache_path.with_suffix(".json")
+        if legacy_path == self.cache_path or not legacy_path.exists():
+            return
+        if self._conn.execute("SELECT 1 FROM pages LIMIT 1").fetchone():
+            return
+
+        try:
+            pages = orjson.loads(legacy_path.read_bytes())
+        except (orjson.JSONDecodeError, OSError):
+            return
+
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO pages "
+                "(url, title, summary, content, links, domain, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        page["url"],
+                        page.get("title", ""),
+                        page.get("summary", ""),
+                        page.get("content", ""),
+                        orjson.dumps(page.get("links", [])).decode(),
+                        page.get("domain", ""),
+                        page.get("fetched_at", ""),
+                    )
+                    for page in pages.values()
+                ],
+            )
+
+    @staticmethod
+    def _row_to_page(row: sqlite3.Row) -> CachedPage:
+        return CachedPage(
+            url=row["url"],
+            title=row["title"],
+            summary=row["summary"],
+            content=row["content"],
+            links=orjson.loads(row["links"]),
+            fetched_at=row["fetched_at"],
+            domain=row["domain"],
+        )
+
+    def _ttl_for(self, domain: str) -> int:
+        return self.domain_ttl.get(domain, self.ttl)
+
+    def _is_expired(self, domain: str, fetched_at: str, access_count: int = 0) -> bool:
+        """Check whether a page is past its TTL or read limit."""
+        if self.max_reads and access_count >= self.max_reads:
+            return True
+
+        ttl = self._ttl_for(domain)
+        if not ttl:
+            return False
+        try:
+            fetched = datetime.fromisoformat(fetched_at)
+        except ValueError:
+            return True
+        return (datetime.now(timezone.utc) - fetched).total_seconds() > ttl
+
+    def _delete(self, url: str) -> None:
+        with self._conn:
+            self._conn.execute("DELETE FROM pages WHERE url = ?", (url,))
+        self._memory.pop(url, None)
+
+    def sweep(self) -> int:
+        """Delete every page past its TTL or read limit.
+
+        Returns:
+            Number of pages deleted.
+        """
+        now = datetime.now(timezone.utc)
+        count = 0
+        with self._lock, self._conn:
+            if self.max_reads:
+                count += self._conn.execute(
+                    "DELETE FROM pages WHERE access_count >= ?", (self.max_reads,)
+                ).rowcount
+
+            # Overridden domains first, then the default TTL for everything else
+            for domain, ttl in self.domain_ttl.items():
+                if ttl:
+                    cutoff = (now - timedelta(seconds=ttl)).isoformat()
+                    count += self._conn.execute(
+                        "DELETE FROM pages WHERE domain = ? AND fetched_at < ?", (domain, cutoff)
+                    ).rowcount
+            if self.ttl:
+                cutoff = (now - timedelta(seconds=self.ttl)).isoformat()
+                placeholders = ",".join("?" * len(self.domain_ttl))
+                count += self._conn.execute(
+                    f"DELETE FROM pages WHERE fetched_at < ? AND domain NOT IN ({placeholders})",
+                    (cutoff, *self.domain_ttl),
+                ).rowcount
+            self._conn.execute("DELETE FROM failures WHERE expires_at <= ?", (time.time(),))
+            self._memory.clear()
+        return count
 
-    def _make_key(self, url: str) -> str:
-        """Create a cache key from URL."""
-        return hashlib.sha256(url.encode()).hexdigest()[:16]
+    def _trim(self) -> None:
+        """Evict the oldest pages if the database holds more than max_pages."""
+        count = self._conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+        excess = count - self.max_pages
+        if excess > 0:
+            # Evict a tenth extra so a full cache isn't trimmed on every put
+            urls = [
+                row["url"] for row in self._conn.execute(
+                    "SELECT url FROM pages ORDER BY fetched_at LIMIT ?",
+                    (excess + self.max_pages // 10,),
+                )
+            ]
+            self._conn.executemany("DELETE FROM pages WHERE url = ?", [(url,) for url in urls])
+            for url in urls:
+                self._memory.pop(url, None)
+            count -= len(urls)
+        self._page_count = count
+
+    def _remember(self, page: CachedPage) -> None:
+        """Add a page to the in-memory LRU, evicting the oldest if full."""
+        self._memory[page["url"]] = page
+        self._memory.move_to_end(page["url"])
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def subscribe(self, listener: Callable[[str], object]) -> None:
+        """Register a callback invoked with the URL of every page written.
 
-    def get(self, url: str) -> CachedPage | None:
+        Args:
+            listener: Callable receiving the URL passed to put().
+        """
+        self._listeners.append(listener)
+
+    def get(self, url: str, count_access: bool = True) -> CachedPage | None:
         """Get a cached page by URL.
 
         Args:
             url: The URL to look up.
+            count_access: Whether this read counts towards max_reads.
 
         Returns:
-            Cached page data or None if not found.
+            Cached page data or None if not found or expired.
         """
-        key = self._make_key(url)
-        return self._cache.get(key)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT domain, fetched_at, access_count FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                self._memory.pop(url, None)
+                self.misses += 1
+                return None
+
+            if self._is_expired(row["domain"], row["fetched_at"], row["access_count"]):
+                self._delete(url)
+                self.misses += 1
+                return None
+
+            if count_access and self.max_reads:
+                with self._conn:
+                    self._conn.execute(
+                        "UPDATE pages SET access_count = access_count + 1 WHERE url = ?", (url,)
+                    )
+
+            page = self._memory.get(url)
+            if page is None or page["fetched_at"] != row["fetched_at"]:
+                full_row = self._conn.execute(
+                    "SELECT * FROM pages WHERE url = ?", (url,)
+                ).fetchone()
+                if full_row is None:
+                    self.misses += 1
+                    return None
+                page = self._row_to_page(full_row)
+            self._remember(page)
+            self.hits += 1
+            return page
 
     def put(
         self,
@@ -81,8 +357,7 @@ class PageCache:
             links: List of links found on the page.
             domain: The domain this page belongs to.
         """
-        key = self._make_key(url)
-        self._cache[key] = CachedPage(
+        page = CachedPage(
             url=url,
             title=title,
             summary=summary,
@@ -91,43 +366,133 @@ class PageCache:
             fetched_at=datetime.now(timezone.utc).isoformat(),
             domain=domain,
         )
-        self._save_cache()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages "
+                "(url, title, summary, content, links, domain, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    url,
+                    title,
+                    summary,
+                    content,
+                    orjson.dumps(links).decode(),
+                    domain,
+                    page["fetched_at"],
+                ),
+            )
+            self._conn.execute("DELETE FROM failures WHERE url = ?", (url,))
+            self._remember(page)
+
+            # Counted without a query; _trim recounts, as replaced rows and
+            # other processes' writes make this an estimate
+            self._page_count += 1
+            if self.max_pages and self._page_count > self.max_pages:
+                self._trim()
+
+        for listener in self._listeners:
+            listener(url)
+
+    def put_negative(self, url: str, reason: str, ttl: int = DEFAULT_NEGATIVE_TTL) -> None:
+        """Remember that a URL couldn't be fetched.
 
-    def find_similar(self, query: str, domain: str | None = None) -> list[CachedPage]:
+        Args:
+            url: The URL that failed.
+            reason: Why it failed, e.g. the exception message.
+            ttl: Seconds before the URL may be tried again.
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO failures (url, reason, expires_at) VALUES (?, ?, ?)",
+                (url, reason, time.time() + ttl),
+            )
+
+    def is_negative(self, url: str) -> bool:
+        """Check whether a URL recently failed to fetch.
+
+        Args:
+            url: The URL to check.
+
+        Returns:
+            True if the URL should be skipped for now.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT expires_at FROM failures WHERE url = ?", (url,)
+            ).fetchone()
+        return row is not None and row["expires_at"] > time.time()
+
+    def find_similar(
+        self, query: str, domain: str | None = None, limit: int | None = None
+    ) -> list[CachedPage]:
         """Find cached pages that might be relevant to a query.
 
-        Uses simple keyword matching on titles and summaries.
-        The LLM can use this to find potentially relevant cached pages.
+        Uses the SQLite full-text index over titles, summaries and content,
+        ranked by BM25 with titles weighted highest.
 
         Args:
             query: Search query to match against.
             domain: Optional domain to filter results.
+            limit: Optional maximum number of pages to return.
 
         Returns:
             List of potentially relevant cached pages, sorted by relevance.
         """
-        query_words = set(query.lower().split())
-        results: list[tuple[int, CachedPage]] = []
-
-        for page in self._cache.values():
-            if domain and page["domain"] != domain:
-                continue
-
-            # Score based on word matches in title and summary
-            title_words = set(page["title"].lower().split())
-            summary_words = set(page["summary"].lower().split())
+        return [page for _, page in self.find_similar_scored(query, domain, limit)]
 
-            title_matches = len(query_words & title_words)
-            summary_matches = len(query_words & summary_words)
+    def find_similar_scored(
+        self, query: str, domain: str | None = None, limit: int | None = None
+    ) -> list[tuple[float, CachedPage]]:
+        """Find relevant cached pages along with how well each covers the query.
 
-            score = title_matches * 2 + summary_matches  # Title weighted higher
-
-            if score > 0:
-                results.append((score, page))
+        Args:
+            query: Search query to match against.
+            domain: Optional domain to filter results.
+            limit: Optional maximum number of pages to return.
 
-        # Sort by score descending
-        results.sort(key=lambda x: x[0], reverse=True)
-        return [page for _, page in results]
+        Returns:
+            List of (coverage, page) sorted by relevance, where coverage is
+            the fraction of query words found in the page's title or summary.
+        """
+        query_words = set(_WORD_PATTERN.findall(query.lower()))
+        if not query_words:
+            return []
+
+        # Any query word may match; FTS5's BM25 ranks title above summary
+        # above content (rank is lower-is-better)
+        match = " OR ".join(f'"{word}"' for word in query_words)
+        sql = (
+            "SELECT pages.url, pages.title, pages.summary, pages.domain, pages.fetched_at "
+            "FROM pages_fts JOIN pages ON pages.rowid = pages_fts.rowid "
+            "WHERE pages_fts MATCH ?"
+        )
+        params: list[Any] = [match]
+        if domain:
+            sql += " AND pages.domain = ?"
+            params.append(domain)
+        sql += f" ORDER BY bm25(pages_fts, {', '.join(map(str, _FTS_WEIGHTS))})"
+
+        # Rows are read lazily in rank order, so a limited search stops
+        # decoding matches once it has enough live pages
+        results: list[tuple[float, str]] = []
+        with self._lock:
+            for row in self._conn.execute(sql, params):
+                if self._is_expired(row["domain"], row["fetched_at"]):
+                    continue
+
+                # Coverage counts title and summary words only: a page describing
+                # the whole query can stand in for exploring
+                described = set(
+                    _WORD_PATTERN.findall(f"{row['title']} {row['summary']}".lower())
+                )
+                coverage = len(query_words & described) / len(query_words)
+                results.append((coverage, row["url"]))
+                if limit is not None and len(results) >= limit:
+                    break
+
+        # Load only the pages being returned; ranking them is not a read
+        scored = ((coverage, self.get(url, count_access=False)) for coverage, url in results)
+        return [(coverage, page) for coverage, page in scored if page is not None]
 
     def get_all_for_domain(self, domain: str) -> list[CachedPage]:
         """Get all cached pages for a domain.
@@ -138,10 +503,14 @@ class PageCache:
         Returns:
             List of all cached pages for the domain.
         """
-        return [page for page in self._cache.values() if page["domain"] == domain]
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM pages WHERE domain = ?", (domain,)
+            ).fetchall()
+        return [self._row_to_page(row) for row in rows]
 
     def get_index(self, domain: str | None = None) -> list[dict[str, str]]:
-        """Get an index of all cached pages (URL, title, summary only).
+        """Get an index of all cached pages (URL, title, summary, domain, fetched_at).
 
         Useful for giving the LLM a quick overview of what's cached.
 
@@ -151,16 +520,17 @@ class PageCache:
         Returns:
             List of page summaries.
         """
-        results = []
-        for page in self._cache.values():
-            if domain and page["domain"] != domain:
-                continue
-            results.append({
-                "url": page["url"],
-                "title": page["title"],
-                "summary": page["summary"],
-            })
-        return results
+        with self._lock:
+            if domain:
+                rows = self._conn.execute(
+                    "SELECT url, title, summary, domain, fetched_at FROM pages WHERE domain = ?",
+                    (domain,),
+                ).fetchall()
+            else:
+                rows = self._conn.execute(
+                    "SELECT url, title, summary, domain, fetched_at FROM pages"
+                ).fetchall()
+        return [dict(row) for row in rows]
 
     def clear(self, domain: str | None = None) -> int:
         """Clear cached pages.
@@ -172,17 +542,105 @@ class PageCache:
         Returns:
             Number of pages cleared.
         """
-        if domain is None:
-            count = len(self._cache)
-            self._cache = {}
-        else:
-            keys_to_remove = [
-                key for key, page in self._cache.items()
-                if page["domain"] == domain
-            ]
-            count = len(keys_to_remove)
-            for key in keys_to_remove:
-                del self._cache[key]
-
-        self._save_cache()
+        with self._lock, self._conn:
+            if domain is None:
+                count = self._conn.execute("DELETE FROM pages").rowcount
+                self._conn.execute("DELETE FROM failures")
+                self._memory.clear()
+            else:
+                count = self._conn.execute(
+                    "DELETE FROM pages WHERE domain = ?", (domain,)
+                ).rowcount
+                for url in [url for url, page in self._memory.items() if page["domain"] == domain]:
+                    del self._memory[url]
         return count
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._conn.close()
+
+
+class AnswerCache:
+    """In-memory TTL cache for LLM-synthesized answers and search results.
+
+    Keys are content-addressed (see make_key), so a change in the underlying
+    documentation produces a new key. Entries also remember the page URLs
+    they were built from, so a PageCache write can drop dependent answers
+    right away via invalidate_url. At most max_entries answers are kept;
+    the least recently used are evicted first.
+    """
+
+    def __init__(self, ttl: int = 3600, max_entries: int = DEFAULT_ANSWER_ENTRIES) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, Any, frozenset[str]]] = OrderedDict()
+        self._by_url: dict[str, set[str]] = {}
+
+    @staticmethod
+    def make_key(*parts: str) -> str:
+        """Create a cache key from the given parts."""
+        return hashlib.blake2b("|".join(parts).encode(), digest_size=16).hexdigest()
+
+    def get(self, key: str) -> Any:
+        """Get a cached answer, or None if missing or expired.
+
+        Args:
+            key: Key created with make_key.
+
+        Returns:
+            The cached answer or None.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, answer, _ = entry
+        if time.monotonic() >= expires_at:
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return answer
+
+    def put(self, key: str, answer: Any, urls: Iterable[str] = ()) -> None:
+        """Store an answer.
+
+        Args:
+            key: Key created with make_key.
+            answer: The answer text (or a full search result).
+            urls: Page URLs the answer was built from.
+        """
+        self._remove(key)
+        url_set = frozenset(canonicalize_url(url) for url in urls)
+        self._entries[key] = (time.monotonic() + self.ttl, answer, url_set)
+        for url in url_set:
+            self._by_url.setdefault(url, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    def invalidate_url(self, url: str) -> int:
+        """Drop every answer built from the given page.
+
+        URLs are canonicalized on both put() and here, so a page cached
+        under a variant of the URL an answer was built from still drops it.
+
+        Args:
+            url: The page URL that changed.
+
+        Returns:
+            Number of answers dropped.
+        """
+        keys = self._by_url.pop(canonicalize_url(url), set())
+        for key in keys:
+            self._remove(key)
+        return len(keys)
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for url in entry[2]:
+            keys = self._by_url.get(url)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_url[url]
@@ -4,12 +4,23 @@ This module provides content compression for reducing LLM token usage
 when processing large documentation content.
 """
 
+import asyncio
+import contextlib
+import hashlib
 import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
 from dataclasses import dataclass
+from pathlib import Path
 from typing import Any
 
 from opentelemetry import trace
 
+from doc2mcp.tokens import count_tokens
+
 # Optional tokenc integration - gracefully degrade if API key not available
 try:
     from tokenc import (
@@ -26,18 +37,99 @@ except ImportError:
     TokenClient = None
     CompressionSettings = None
 
+# Compressed results kept per compressor, so text seen again (e.g. a page
+# analyzed for several queries) isn't sent to the API twice
+DEFAULT_RESULT_CACHE_SIZE = 128
+
+# Where the shared compressor keeps results across restarts, and for how
+# long (in seconds, 0 = forever)
+DEFAULT_PERSISTENT_CACHE_PATH = os.environ.get(
+    "DOC2MCP_COMPRESSION_CACHE", "./compression_cache.db"
+)
+DEFAULT_PERSISTENT_CACHE_TTL = 86400
+
+_CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS compressions (
+    key TEXT PRIMARY KEY,
+    compressed_text TEXT NOT NULL,
+    original_tokens INTEGER NOT NULL,
+    compressed_tokens INTEGER NOT NULL,
+    tokens_saved INTEGER NOT NULL,
+    compression_ratio REAL NOT NULL,
+    created_at REAL NOT NULL
+);
+"""
+
+# Compression is skipped at an aggressiveness whose recent results averaged
+# a lower ratio than this (original / compressed tokens); every
+# RATIO_PROBE_INTERVAL-th skipped text is still sent, so the average can recover
+MIN_EXPECTED_RATIO = 1.15
+RATIO_EMA_ALPHA = 0.2
+RATIO_PROBE_INTERVAL = 20
+
+# API requests in flight at once for compress_many
+DEFAULT_BATCH_CONCURRENCY = 8
+
+# Markup that costs tokens without carrying meaning for the LLM
+_IMAGE_PATTERN = re.compile(r"!\[[^\]]*\]\([^)]*\)")
+_LINK_PATTERN = re.compile(r"\[([^\]]+)\]\([^)]*\)")
+_TRAILING_SPACE_PATTERN = re.compile(r"[ \t]+$", re.MULTILINE)
+_BLANK_LINES_PATTERN = re.compile(r"\n{3,}")
+
+# Lines of site chrome that survive content extraction, matched whole
+_CHROME_LINE_PATTERN = re.compile(
+    r"^[ \t]*(?:skip to (?:main )?content|menu|sign in|log in|sign up"
+    r"|toggle (?:navigation|menu|sidebar)|on this page|table of contents"
+    r"|edit this page|edit on github|was this page helpful\??|copy|copied!?"
+    r"|(?:accept|reject) (?:all )?cookies|cookie (?:settings|preferences))[ \t]*$",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+# Phrases that add tokens but no information
+_FILLER_PHRASES = (
+    "it is important to note that",
+    "it should be noted that",
+    "please note that",
+    "keep in mind that",
+    "note that",
+    "basically",
+    "simply",
+    "of course,",
+)
+_FILLER_PATTERN = re.compile(
+    r"\b(?:" + "|".join(map(re.escape, _FILLER_PHRASES)) + r")[ \t]+",
+    re.IGNORECASE,
+)
+
+
+def _tracing_enabled() -> bool:
+    """Whether a tracer provider has been installed to record spans.
+
+    Checked per call rather than once, since the shared compressor can be
+    created before tracing is initialized.
+    """
+    return not isinstance(
+        trace.get_tracer_provider(), (trace.ProxyTracerProvider, trace.NoOpTracerProvider)
+    )
+
 
-@dataclass
+
+@dataclass(slots=True, frozen=True)
 class CompressionResult:
-    """Result of a compression operation."""
+    """Result of a compression operation.
+
+    original_text is only set on results that passed the content through
+    unchanged. Compressed results are cached and outlive the call, so they
+    don't hold on to the (usually much larger) input; callers still have it.
+    """
 
-    original_text: str
     compressed_text: str
     original_tokens: int
     compressed_tokens: int
     tokens_saved: int
     compression_ratio: float
     was_compressed: bool
+    original_text: str | None = None
 
 
 class ContentCompressor:
@@ -57,6 +149,11 @@ class ContentCompressor:
         aggressiveness: float = 0.5,
         min_content_length: int = 1000,
         enabled: bool = True,
+        cache_size: int = DEFAULT_RESULT_CACHE_SIZE,
+        gzip: bool = True,
+        cache_path: str | Path | None = None,
+        cache_ttl: int = DEFAULT_PERSISTENT_CACHE_TTL,
+        min_content_tokens: int = 0,
     ) -> None:
         """Initialize the content compressor.
 
@@ -71,11 +168,37 @@ class ContentCompressor:
             min_content_length: Minimum content length to trigger compression.
                                Content shorter than this is returned as-is.
             enabled: Whether compression is enabled.
+            cache_size: Successful compressions kept in memory (0 = none).
+            gzip: Gzip request bodies, which speeds up compressing long
+                  documents; ignored by tokenc versions without the option.
+            cache_path: SQLite database keeping successful compressions
+                        across restarts (None = memory only).
+            cache_ttl: Seconds a persisted compression is reused (0 = forever).
+            min_content_tokens: Minimum estimated tokens to trigger compression,
+                                checked after min_content_length (0 = no minimum).
         """
         self.aggressiveness = aggressiveness
         self.min_content_length = min_content_length
         self.enabled = enabled
         self.tracer = trace.get_tracer("doc2mcp.compression")
+        self.cache_size = cache_size
+        self._results: OrderedDict[tuple[str, float, int | None], CompressionResult] = (
+            OrderedDict()
+        )
+        self._results_lock = threading.Lock()
+        # Requests compress_many is already waiting on, so duplicates join them
+        self._inflight: dict[tuple[str, float, int | None], asyncio.Future[CompressionResult]] = {}
+        self.cache_path = Path(cache_path) if cache_path is not None else None
+        self.cache_ttl = cache_ttl
+        self._conn: sqlite3.Connection | None = None
+        self.min_content_tokens = min_content_tokens
+
+        # tokenc CompressionSettings per (aggressiveness, max_output_tokens)
+        self._settings_cache: dict[tuple[float, int | None], Any] = {}
+
+        # Rolling average compression ratio and skip count per aggressiveness
+        self._ratio_ema: dict[float, float] = {}
+        self._ratio_skips: dict[float, int] = {}
 
         # Initialize client if possible
         self._client = None
@@ -83,7 +206,11 @@ class ContentCompressor:
             api_key = api_key or os.environ.get("TOKENC_API_KEY")
             if api_key:
                 try:
-                    self._client = TokenClient(api_key=api_key)
+                    try:
+                        self._client = TokenClient(api_key=api_key, gzip=gzip)
+                    except TypeError:
+                        # Older tokenc releases don't take the gzip option
+                        self._client = TokenClient(api_key=api_key)
                 except Exception:
                     # Silently fail - compression will be disabled
                     pass
@@ -111,29 +238,43 @@ class ContentCompressor:
         """
         # Return original if compression is not available or content is too short
         if not self.is_available or len(content) < self.min_content_length:
-            return CompressionResult(
-                original_text=content,
-                compressed_text=content,
-                original_tokens=0,
-                compressed_tokens=0,
-                tokens_saved=0,
-                compression_ratio=1.0,
-                was_compressed=False,
-            )
-
-        with self.tracer.start_as_current_span("compress_content") as span:
-            span.set_attribute("content_length", len(content))
-            span.set_attribute("aggressiveness", aggressiveness or self.aggressiveness)
+            return self._uncompressed(content)
+
+        key = self._result_key(content, aggressiveness, max_output_tokens)
+        with self._results_lock:
+            cached = self._results.get(key)
+            if cached is not None:
+                self._results.move_to_end(key)
+                return cached
+
+        cached = self._load(key)
+        if cached is not None:
+            self._remember(key, cached, persist=False)
+            return cached
+
+        if not self._worth_compressing(content, key[1]):
+            return self._uncompressed(content)
+
+        # Without a tracer provider the span would be a no-op; skip building it
+        span_cm = (
+            self.tracer.start_as_current_span("compress_content")
+            if _tracing_enabled()
+            else contextlib.nullcontext()
+        )
+        with span_cm as span:
+            if span is not None:
+                span.set_attribute("content_length", len(content))
+                span.set_attribute("aggressiveness", aggressiveness or self.aggressiveness)
 
             try:
-                # Build compression settings
-                settings_kwargs: dict[str, Any] = {
-                    "aggressiveness": aggressiveness or self.aggressiveness,
-                }
-                if max_output_tokens:
-                    settings_kwargs["max_output_tokens"] = max_output_tokens
-
-                settings = CompressionSettings(**settings_kwargs)
+                # Build compression settings; callers reuse a handful of combinations
+                settings = self._settings_cache.get(key[1:])
+                if settings is None:
+                    settings_kwargs: dict[str, Any] = {"aggressiveness": key[1]}
+                    if max_output_tokens:
+                        settings_kwargs["max_output_tokens"] = max_output_tokens
+                    settings = CompressionSettings(**settings_kwargs)
+                    self._settings_cache[key[1:]] = settings
 
                 # Compress
                 response = self._client.compress_input(
@@ -142,7 +283,6 @@ class ContentCompressor:
                 )
 
                 result = CompressionResult(
-                    original_text=content,
                     compressed_text=response.output,
                     original_tokens=response.original_input_tokens,
                     compressed_tokens=response.output_tokens,
@@ -151,37 +291,229 @@ class ContentCompressor:
                     was_compressed=True,
                 )
 
-                span.set_attribute("original_tokens", result.original_tokens)
-                span.set_attribute("compressed_tokens", result.compressed_tokens)
-                span.set_attribute("tokens_saved", result.tokens_saved)
-                span.set_attribute("compression_ratio", result.compression_ratio)
+                if span is not None:
+                    span.set_attribute("original_tokens", result.original_tokens)
+                    span.set_attribute("compressed_tokens", result.compressed_tokens)
+                    span.set_attribute("tokens_saved", result.tokens_saved)
+                    span.set_attribute("compression_ratio", result.compression_ratio)
 
+                self._record_ratio(key[1], result.compression_ratio)
+                self._remember(key, result)
                 return result
 
             except (AuthenticationError, InvalidRequestError, RateLimitError, APIError) as e:
                 # Log error and return original content
-                span.set_attribute("error", str(e))
-                return CompressionResult(
-                    original_text=content,
-                    compressed_text=content,
-                    original_tokens=0,
-                    compressed_tokens=0,
-                    tokens_saved=0,
-                    compression_ratio=1.0,
-                    was_compressed=False,
-                )
+                if span is not None:
+                    span.set_attribute("error", str(e))
+                return self._uncompressed(content)
             except Exception as e:
                 # Catch any unexpected errors
-                span.set_attribute("error", str(e))
-                return CompressionResult(
-                    original_text=content,
-                    compressed_text=content,
-                    original_tokens=0,
-                    compressed_tokens=0,
-                    tokens_saved=0,
-                    compression_ratio=1.0,
-                    was_compressed=False,
-                )
+                if span is not None:
+                    span.set_attribute("error", str(e))
+                return self._uncompressed(content)
+
+    @staticmethod
+    def _uncompressed(content: str) -> CompressionResult:
+        """Result for content passed through as-is."""
+        return CompressionResult(
+            original_text=content,
+            compressed_text=content,
+            original_tokens=0,
+            compressed_tokens=0,
+            tokens_saved=0,
+            compression_ratio=1.0,
+            was_compressed=False,
+        )
+
+    def _worth_compressing(self, content: str, aggressiveness: float) -> bool:
+        """Guess locally whether an API call would save enough tokens to pay off.
+
+        Args:
+            content: Text about to be sent for compression.
+            aggressiveness: The effective aggressiveness of the call.
+
+        Returns:
+            False if the text is too few tokens, or if recent compressions at
+            this aggressiveness saved too little (except for periodic probes).
+        """
+        if self.min_content_tokens and count_tokens(content) < self.min_content_tokens:
+            return False
+
+        with self._results_lock:
+            ratio = self._ratio_ema.get(aggressiveness)
+            if ratio is None or ratio >= MIN_EXPECTED_RATIO:
+                return True
+            skips = self._ratio_skips.get(aggressiveness, 0) + 1
+            self._ratio_skips[aggressiveness] = skips
+            return skips % RATIO_PROBE_INTERVAL == 0
+
+    def _record_ratio(self, aggressiveness: float, ratio: float) -> None:
+        """Fold an API result into the rolling ratio for its aggressiveness."""
+        with self._results_lock:
+            average = self._ratio_ema.get(aggressiveness)
+            self._ratio_ema[aggressiveness] = (
+                ratio if average is None else average + RATIO_EMA_ALPHA * (ratio - average)
+            )
+
+    def _result_key(
+        self, content: str, aggressiveness: float | None, max_output_tokens: int | None
+    ) -> tuple[str, float, int | None]:
+        """Key a compression; identical text at the same settings compresses the same way."""
+        return (
+            hashlib.blake2b(content.encode(), digest_size=16).hexdigest(),
+            aggressiveness or self.aggressiveness,
+            max_output_tokens,
+        )
+
+    async def compress_many(
+        self,
+        contents: list[str],
+        aggressiveness: float | None = None,
+        max_output_tokens: int | None = None,
+        concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+    ) -> list[CompressionResult]:
+        """Compress several texts concurrently.
+
+        The tokenc client is synchronous, so each API request runs on a
+        worker thread; up to concurrency requests are in flight at once,
+        and the event loop isn't blocked while they wait. A text that is
+        already being compressed, by this batch or a concurrent one, waits
+        for that request instead of sending its own.
+
+        Args:
+            contents: The texts to compress.
+            aggressiveness: Override default aggressiveness for these calls.
+            max_output_tokens: Optional maximum tokens for each compressed output.
+            concurrency: Maximum API requests in flight at once.
+
+        Returns:
+            One CompressionResult per text, in order.
+        """
+        slots = asyncio.Semaphore(concurrency)
+
+        async def compress_one(content: str) -> CompressionResult:
+            # Nothing to send; skip the thread hop
+            if not self.is_available or len(content) < self.min_content_length:
+                return self.compress(content, aggressiveness, max_output_tokens)
+            key = self._result_key(content, aggressiveness, max_output_tokens)
+            loop = asyncio.get_running_loop()
+
+            # Join an identical request that is already running
+            inflight = self._inflight.get(key)
+            if inflight is not None and inflight.get_loop() is loop:
+                return await asyncio.shield(inflight)
+
+            future: asyncio.Future[CompressionResult] = loop.create_future()
+            self._inflight[key] = future
+            try:
+                async with slots:
+                    result = await asyncio.to_thread(
+                        self.compress, content, aggressiveness, max_output_tokens
+                    )
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as e:
+                future.set_exception(e)
+                future.exception()  # Mark retrieved in case nobody joined
+                raise
+            else:
+                future.set_result(result)
+                return result
+            finally:
+                if self._inflight.get(key) is future:
+                    del self._inflight[key]
+
+        return list(await asyncio.gather(*[compress_one(content) for content in contents]))
+
+    def _remember(
+        self,
+        key: tuple[str, float, int | None],
+        result: CompressionResult,
+        persist: bool = True,
+    ) -> None:
+        """Keep a successful compression, evicting the least recently used."""
+        if self.cache_size:
+            with self._results_lock:
+                self._results[key] = result
+                while len(self._results) > self.cache_size:
+                    self._results.popitem(last=False)
+
+        if persist and self.cache_path is not None:
+            try:
+                with self._results_lock, self._connect() as conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO compressions "
+                        "(key, compressed_text, original_tokens, compressed_tokens, "
+                        "tokens_saved, compression_ratio, created_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (
+                            self._db_key(key),
+                            result.compressed_text,
+                            result.original_tokens,
+                            result.compressed_tokens,
+                            result.tokens_saved,
+                            result.compression_ratio,
+                            time.time(),
+                        ),
+                    )
+            except sqlite3.Error:
+                # The cache is an optimization; a failed write only costs a refetch
+                pass
+
+    def _load(self, key: tuple[str, float, int | None]) -> CompressionResult | None:
+        """Look up a compression persisted by this or an earlier process."""
+        if self.cache_path is None:
+            return None
+
+        try:
+            with self._results_lock:
+                row = self._connect().execute(
+                    "SELECT * FROM compressions WHERE key = ?", (self._db_key(key),)
+                ).fetchone()
+        except sqlite3.Error:
+            return None
+        if row is None or (self.cache_ttl and time.time() - row["created_at"] > self.cache_ttl):
+            return None
+
+        return CompressionResult(
+            compressed_text=row["compressed_text"],
+            original_tokens=row["original_tokens"],
+            compressed_tokens=row["compressed_tokens"],
+            tokens_saved=row["tokens_saved"],
+            compression_ratio=row["compression_ratio"],
+            was_compressed=True,
+        )
+
+    @staticmethod
+    def _db_key(key: tuple[str, float, int | None]) -> str:
+        return "|".join(map(str, key))
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the persistent cache on first use; call with _results_lock held."""
+        if self._conn is None:
+            assert self.cache_path is not None
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.cache_path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_CACHE_SCHEMA)
+            if self.cache_ttl:
+                with conn:
+                    conn.execute(
+                        "DELETE FROM compressions WHERE created_at < ?",
+                        (time.time() - self.cache_ttl,),
+                    )
+            self._conn = conn
+        return self._conn
+
+    def close(self) -> None:
+        """Close the persistent cache, if open."""
+        with self._results_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
 
     def compress_for_analysis(self, content: str) -> str:
         """Compress content for page analysis (moderate compression).
@@ -214,20 +546,97 @@ class ContentCompressor:
         return result.compressed_text
 
 
-# Default global compressor instance
-_default_compressor: ContentCompressor | None = None
+def fast_compress(content: str) -> str:
+    """Strip token-heavy markdown markup locally, without an API call.
 
+    Images are removed and links are reduced to their text, so this is
+    meant for content whose links are available separately. Code
+    indentation is left untouched.
 
-def get_compressor() -> ContentCompressor:
-    """Get or create the default content compressor instance.
+    Args:
+        content: Markdown or plain text content.
 
     Returns:
-        The default ContentCompressor instance.
+        The content with images, link targets, trailing whitespace and
+        extra blank lines removed.
     """
-    global _default_compressor
-    if _default_compressor is None:
-        _default_compressor = ContentCompressor()
-    return _default_compressor
+    content = _IMAGE_PATTERN.sub("", content)
+    content = _LINK_PATTERN.sub(r"\1", content)
+    content = _TRAILING_SPACE_PATTERN.sub("", content)
+    return _BLANK_LINES_PATTERN.sub("\n\n", content).strip()
+
+
+def strip_boilerplate(content: str) -> str:
+    """Drop site chrome lines and filler phrases, without an API call.
+
+    Only lines consisting entirely of a navigation or cookie-banner label
+    are removed, so prose mentioning those words is kept. Run before
+    fast_compress, which collapses the blank lines this leaves.
+
+    Args:
+        content: Markdown or plain text content.
+
+    Returns:
+        The content without chrome lines and filler phrases.
+    """
+    content = _CHROME_LINE_PATTERN.sub("", content)
+    return _FILLER_PATTERN.sub("", content)
+
+
+# Compressors shared by every agent in the process, per distinct settings
+_shared_compressors: dict[tuple[Any, ...], ContentCompressor] = {}
+_shared_compressors_lock = threading.Lock()
+
+
+def get_compressor(
+    aggressiveness: float = 0.5,
+    min_content_length: int = 1000,
+    enabled: bool = True,
+    gzip: bool = True,
+    cache_ttl: int = DEFAULT_PERSISTENT_CACHE_TTL,
+    min_content_tokens: int = 0,
+) -> ContentCompressor:
+    """Get the shared content compressor for the given settings.
+
+    Agents built from the same compression settings share one compressor,
+    and so its API client and its cache of recent results. Shared
+    compressors also persist their results (see DEFAULT_PERSISTENT_CACHE_PATH),
+    so a restarted server doesn't pay for compressing the same pages again.
+
+    Lookups of an existing compressor take no lock; creating one does, so
+    threads asking for the same settings at once still get a single
+    compressor (and a single API client).
+
+    Args:
+        aggressiveness: Default compression aggressiveness from 0.0 to 1.0.
+        min_content_length: Minimum content length to trigger compression.
+        enabled: Whether compression is enabled.
+        gzip: Whether API request bodies are gzipped.
+        cache_ttl: Seconds a persisted compression is reused (0 = forever).
+        min_content_tokens: Minimum estimated tokens to trigger compression.
+
+    Returns:
+        The ContentCompressor instance for these settings.
+    """
+    key = (aggressiveness, min_content_length, enabled, gzip, cache_ttl, min_content_tokens)
+    compressor = _shared_compressors.get(key)
+    if compressor is not None:
+        return compressor
+
+    with _shared_compressors_lock:
+        compressor = _shared_compressors.get(key)
+        if compressor is None:
+            compressor = ContentCompressor(
+                aggressiveness=aggressiveness,
+                min_content_length=min_content_length,
+                enabled=enabled,
+                gzip=gzip,
+                cache_path=DEFAULT_PERSISTENT_CACHE_PATH,
+                cache_ttl=cache_ttl,
+                min_content_tokens=min_content_tokens,
+            )
+            _shared_compressors[key] = compressor
+    return compressor
 
 
 def compress_content(content: str, aggressiveness: float = 0.5) -> str:
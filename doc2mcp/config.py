@@ -1,16 +1,44 @@
 """Configuration loading and validation for Doc2MCP."""
 
+import asyncio
+import functools
 import logging
 import os
 from pathlib import Path
-from typing import Literal
+from typing import Any, Literal
 
 import httpx
 import yaml
 from pydantic import BaseModel, Field
 
+# libyaml's C parser when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
 logger = logging.getLogger(__name__)
 
+# Optional HTTP/2 support for talking to the web API
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Parsed config files kept in memory between loads
+CONFIG_CACHE_SIZE = 8
+
+# Connections to the web API kept open between config loads
+API_KEEPALIVE_CONNECTIONS = 8
+API_KEEPALIVE_EXPIRY = 300
+
+_api_client: httpx.AsyncClient | None = None
+_api_client_loop: asyncio.AbstractEventLoop | None = None
+
+# Last export fetched from each URL, as (ETag, raw config)
+_api_exports: dict[str, tuple[str, dict[str, Any]]] = {}
+
 
 class WebSource(BaseModel):
     """Web-based documentation source."""
@@ -55,6 +83,11 @@ class CompressionSettings(BaseModel):
         default=1000,
         description="Minimum content length to trigger compression.",
     )
+    min_content_tokens: int = Field(
+        default=250,
+        ge=0,
+        description="Minimum estimated tokens to trigger compression (0 = no minimum).",
+    )
     analysis_aggressiveness: float = Field(
         default=0.4,
         ge=0.0,
@@ -67,6 +100,14 @@ class CompressionSettings(BaseModel):
         le=1.0,
         description="Compression level for answer synthesis (light).",
     )
+    strip_boilerplate: bool = Field(
+        default=True,
+        description="Drop site chrome lines and filler phrases locally before page analysis.",
+    )
+    gzip: bool = Field(
+        default=True,
+        description="Gzip compression API request bodies (faster for long documents).",
+    )
 
 
 class SitemapIndexSettings(BaseModel):
@@ -106,14 +147,149 @@ class SitemapIndexSettings(BaseModel):
     )
 
 
+class RetrievalSettings(BaseModel):
+    """Settings for chunk-level retrieval over cached and local documentation."""
+
+    enabled: bool = Field(
+        default=True,
+        description="Send only the most relevant chunks of long documents to the LLM.",
+    )
+    chunk_size: int = Field(
+        default=2000,
+        ge=200,
+        description="Maximum characters per chunk (roughly 512 tokens).",
+    )
+    top_k: int = Field(
+        default=8,
+        ge=1,
+        le=50,
+        description="Number of chunks kept per document.",
+    )
+    embedding_model: str | None = Field(
+        default="sentence-transformers/all-MiniLM-L6-v2",
+        description="sentence-transformers model for semantic ranking (None for BM25 only).",
+    )
+    quantize_embeddings: bool = Field(
+        default=True,
+        description="Store chunk embeddings as int8 (4x less memory than float32).",
+    )
+
+
 class Settings(BaseModel):
     """Global settings for Doc2MCP."""
 
     max_content_length: int = 50000
+    max_analysis_chars: int = Field(
+        default=50000,
+        ge=1000,
+        description="Characters of each page sent to the navigation LLM.",
+    )
+    max_prompt_links: int = Field(
+        default=15,
+        ge=1,
+        le=100,
+        description=(
+            "Links of each page listed in the navigation prompt, best query "
+            "matches first."
+        ),
+    )
+    min_page_relevance: float = Field(
+        default=0.2,
+        ge=0.0,
+        le=1.0,
+        description=(
+            "Fraction of query words a page must contain to be analyzed by the LLM "
+            "(0 analyzes every page)."
+        ),
+    )
+    max_synthesis_tokens: int = Field(
+        default=25000,
+        ge=1000,
+        description="Token budget for documentation sent to answer synthesis.",
+    )
     cache_ttl: int = 3600
+    cache_max_reads: int = Field(
+        default=100,
+        ge=0,
+        description="Reads after which a cached page is refetched (0 = unlimited).",
+    )
+    cache_domain_ttl: dict[str, int] = Field(
+        default_factory=dict,
+        description="Per-domain overrides of cache_ttl in seconds.",
+    )
+    cache_max_pages: int = Field(
+        default=10_000,
+        ge=0,
+        description="Pages kept in the page cache before the oldest are evicted (0 = unlimited).",
+    )
+    cache_hit_threshold: float = Field(
+        default=0.75,
+        ge=0.0,
+        le=1.0,
+        description="Query coverage of a cached page above which navigation is skipped.",
+    )
+    cache_shortcut: bool = Field(
+        default=True,
+        description=(
+            "On a cache hit, return the best covering cached pages as they are "
+            "instead of synthesizing an answer (tools without local sources only)."
+        ),
+    )
     request_timeout: int = 30
+    exploration_concurrency: int = Field(
+        default=5,
+        ge=1,
+        le=20,
+        description="Pages fetched and analyzed concurrently during deep search.",
+    )
+    sufficient_chars: int = Field(
+        default=8000,
+        ge=0,
+        description=(
+            "Stop exploring once this many characters of relevant content are "
+            "collected from at least sufficient_min_sources pages (0 = never)."
+        ),
+    )
+    sufficient_min_sources: int = Field(
+        default=2,
+        ge=1,
+        description="Pages that must contribute content before sufficient_chars applies.",
+    )
+    direct_answer_max_chars: int = Field(
+        default=4000,
+        ge=0,
+        description=(
+            "A single source at most this long is returned as-is instead of "
+            "being synthesized (0 = always synthesize)."
+        ),
+    )
+    navigation_concurrency: int = Field(
+        default=5,
+        ge=1,
+        le=50,
+        description=(
+            "Navigation and per-source summary LLM calls in flight at once, "
+            "shared by all searches."
+        ),
+    )
+    fetch_concurrency: int = Field(
+        default=10,
+        ge=1,
+        le=100,
+        description="Page fetches in flight at once, shared by all searches.",
+    )
+    navigation_batch_size: int = Field(
+        default=1,
+        ge=1,
+        le=10,
+        description=(
+            "Queued pages a deep search worker analyzes together in one "
+            "navigation LLM call (1 = one streamed call per page)."
+        ),
+    )
     compression: CompressionSettings = Field(default_factory=CompressionSettings)
     sitemap_index: SitemapIndexSettings = Field(default_factory=SitemapIndexSettings)
+    retrieval: RetrievalSettings = Field(default_factory=RetrievalSettings)
 
 
 class Config(BaseModel):
@@ -123,6 +299,13 @@ class Config(BaseModel):
     settings: Settings = Field(default_factory=Settings)
 
 
+@functools.lru_cache(maxsize=CONFIG_CACHE_SIZE)
+def _read_yaml(path: str, mtime_ns: int, size: int) -> dict[str, Any]:
+    """Parse a YAML file; cached until its mtime or size changes."""
+    with open(path) as f:
+        return yaml.load(f, Loader=SafeLoader) or {}
+
+
 def load_config(config_path: str | Path | None = None) -> Config:
     """Load configuration from YAML file (fallback method).
 
@@ -141,12 +324,43 @@ def load_config(config_path: str | Path | None = None) -> Config:
         # Return empty config if file doesn't exist
         return Config()
 
-    with open(path) as f:
-        raw = yaml.safe_load(f) or {}
+    # Unchanged files are served from memory instead of parsed again
+    stat = path.stat()
+    raw = _read_yaml(str(path), stat.st_mtime_ns, stat.st_size)
 
     return Config.model_validate(raw)
 
 
+def _get_api_client() -> httpx.AsyncClient:
+    """Get the client shared by config loads on the running event loop.
+
+    Connections to the web API are kept alive between loads, so reloading
+    the config doesn't pay for a new TCP and TLS handshake. A client is
+    bound to its event loop, so a new one is created if the loop changed.
+    """
+    global _api_client, _api_client_loop
+    loop = asyncio.get_running_loop()
+    if _api_client is None or _api_client.is_closed or _api_client_loop is not loop:
+        _api_client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            limits=httpx.Limits(
+                max_keepalive_connections=API_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=API_KEEPALIVE_EXPIRY,
+            ),
+        )
+        _api_client_loop = loop
+    return _api_client
+
+
+async def close_api_client() -> None:
+    """Close the client shared by config loads, if one is open."""
+    global _api_client, _api_client_loop
+    if _api_client is not None:
+        await _api_client.aclose()
+        _api_client = None
+        _api_client_loop = None
+
+
 async def load_config_from_api(api_url: str | None = None, timeout: float = 10.0) -> Config:
     """Load configuration from the web API.
 
@@ -168,12 +382,25 @@ async def load_config_from_api(api_url: str | None = None, timeout: float = 10.0
     logger.info(f"Fetching tool config from {export_url}")
 
     try:
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            response = await client.get(export_url)
+        # Ask for the export only if it changed since the last load
+        cached = _api_exports.get(export_url)
+        headers = {"If-None-Match": cached[0]} if cached else {}
+
+        client = _get_api_client()
+        response = await client.get(export_url, headers=headers, timeout=timeout)
+        if response.status_code == 304 and cached:
+            logger.info("Tool config unchanged since last fetch")
+            raw = cached[1]
+        else:
             response.raise_for_status()
             raw = response.json()
             logger.info(f"Fetched {len(raw.get('tools', {}))} tools from API")
-            return Config.model_validate(raw)
+            etag = response.headers.get("etag")
+            if etag:
+                _api_exports[export_url] = (etag, raw)
+
+        # Validated afresh each time, since callers may modify their Config
+        return Config.model_validate(raw)
     except httpx.HTTPStatusError as e:
         logger.warning(f"API returned error {e.response.status_code}: {e.response.text}")
         raise
@@ -188,8 +415,9 @@ async def load_config_with_fallback(
 ) -> Config:
     """Load configuration from API with fallback to YAML file.
 
-    First attempts to load from the web API. If that fails, falls back to
-    loading from the YAML config file.
+    The web API is preferred. The YAML config file is parsed on a worker
+    thread while the API request is in flight, so a failed request falls
+    back without waiting for the parse.
 
     Args:
         api_url: Base URL of the web API.
@@ -201,12 +429,18 @@ async def load_config_with_fallback(
     # Check if API loading is enabled (default: enabled)
     use_api = os.environ.get("DOC2MCP_USE_API", "true").lower() in ("true", "1", "yes")
 
-    if use_api:
-        try:
-            return await load_config_from_api(api_url)
-        except Exception as e:
-            logger.warning(f"Failed to load config from API, falling back to YAML: {e}")
+    if not use_api:
+        return load_config(config_path)
 
-    # Fallback to YAML
-    return load_config(config_path)
+    yaml_task = asyncio.create_task(asyncio.to_thread(load_config, config_path))
+    try:
+        return await load_config_from_api(api_url)
+    except Exception as e:
+        logger.warning(f"Failed to load config from API, falling back to YAML: {e}")
+        return await yaml_task
+    finally:
+        if not yaml_task.done():
+            yaml_task.cancel()
+        elif not yaml_task.cancelled():
+            yaml_task.exception()  # Mark retrieved when the API won
 
@@ -1,10 +1,45 @@
 """Local file fetcher for documentation."""
 
+import asyncio
 import fnmatch
+import functools
+import os
+import re
+from collections.abc import Callable
 from pathlib import Path
 
 from doc2mcp.config import LocalSource
 
+# Decoded files kept in memory between searches
+READ_CACHE_SIZE = 128
+
+# Compiled file name patterns kept between fetches
+PATTERN_CACHE_SIZE = 64
+
+# Files read at once when fetching a directory
+MAX_CONCURRENT_READS = 16
+
+
+@functools.lru_cache(maxsize=READ_CACHE_SIZE)
+def _read_text(path: str, mtime_ns: int, size: int) -> str:
+    """Read and decode a file; cached until its mtime or size changes."""
+    # Read once; try UTF-8 first, fall back to latin-1 on the same bytes
+    data = Path(path).read_bytes()
+    try:
+        return data.decode("utf-8")
+    except UnicodeDecodeError:
+        return data.decode("latin-1")
+
+
+@functools.lru_cache(maxsize=PATTERN_CACHE_SIZE)
+def _compile_patterns(patterns: tuple[str, ...]) -> Callable[[str], re.Match[str] | None]:
+    """Combine glob patterns into one regex matching a file name against any of them.
+
+    Sources are fetched again with the same patterns, so compiled
+    matchers are cached.
+    """
+    return re.compile("|".join(fnmatch.translate(pattern) for pattern in patterns)).match
+
 
 class LocalFetcher:
     """Fetches documentation from local files."""
@@ -26,19 +61,28 @@ class LocalFetcher:
         if base_path.is_file():
             return self._read_file(base_path)
 
-        # Collect all matching files
-        content_parts: list[str] = []
+        # Directory listing and file reads block, so they run on worker
+        # threads; reads overlap, up to MAX_CONCURRENT_READS at a time
+        files = await asyncio.to_thread(self._find_files, base_path, source.patterns)
+        slots = asyncio.Semaphore(MAX_CONCURRENT_READS)
+
+        async def read(file_path: Path) -> str:
+            async with slots:
+                return await asyncio.to_thread(self._read_file, file_path)
 
-        for file_path in self._find_files(base_path, source.patterns):
-            try:
-                file_content = self._read_file(file_path)
-                relative_path = file_path.relative_to(base_path)
-                content_parts.append(f"# File: {relative_path}\n\n{file_content}")
-            except Exception:
-                # Skip files that can't be read
+        contents = await asyncio.gather(*map(read, files), return_exceptions=True)
+
+        # Collect all matching files, skipping those that can't be read. Pieces
+        # are joined once at the end, so no per-file copy of the content is made
+        pieces: list[str] = []
+        for file_path, file_content in zip(files, contents):
+            if isinstance(file_content, BaseException):
                 continue
+            if pieces:
+                pieces.append("\n\n---\n\n")
+            pieces += ("# File: ", str(file_path.relative_to(base_path)), "\n\n", file_content)
 
-        return "\n\n---\n\n".join(content_parts)
+        return "".join(pieces)
 
     def _find_files(self, base_path: Path, patterns: list[str]) -> list[Path]:
         """Find all files matching the given patterns.
@@ -52,16 +96,36 @@ class LocalFetcher:
         """
         matching_files: set[Path] = set()
 
-        for pattern in patterns:
-            # Handle recursive patterns
-            if "**" in pattern:
-                for file_path in base_path.rglob(pattern.replace("**/", "")):
+        # Recursive patterns are matched below every directory; those that
+        # still contain a path after dropping "**/" are left to rglob
+        flat_patterns = [pattern for pattern in patterns if "**" not in pattern]
+        recursive_patterns = [
+            pattern.replace("**/", "") for pattern in patterns if "**" in pattern
+        ]
+        name_patterns = [pattern for pattern in recursive_patterns if "/" not in pattern]
+
+        # One scandir pass; DirEntry caches file type, so no stat per file
+        if flat_patterns:
+            matches = _compile_patterns(tuple(flat_patterns))
+            with os.scandir(base_path) as entries:
+                for entry in entries:
+                    if matches(entry.name) and entry.is_file():
+                        matching_files.add(Path(entry.path))
+
+        if name_patterns:
+            matches = _compile_patterns(tuple(name_patterns))
+            for dir_path, _, file_names in os.walk(base_path):
+                for name in file_names:
+                    if matches(name):
+                        file_path = Path(dir_path, name)
+                        if file_path.is_file():
+                            matching_files.add(file_path)
+
+        for pattern in recursive_patterns:
+            if "/" in pattern:
+                for file_path in base_path.rglob(pattern):
                     if file_path.is_file():
                         matching_files.add(file_path)
-            else:
-                for file_path in base_path.iterdir():
-                    if file_path.is_file() and fnmatch.fnmatch(file_path.name, pattern):
-                        matching_files.add(file_path)
 
         return sorted(matching_files)
 
@@ -74,8 +138,6 @@ class LocalFetcher:
         Returns:
             File content as string.
         """
-        # Try UTF-8 first, fall back to latin-1
-        try:
-            return file_path.read_text(encoding="utf-8")
-        except UnicodeDecodeError:
-            return file_path.read_text(encoding="latin-1")
+        # Unchanged files are served from memory instead of re-read and decoded
+        stat = file_path.stat()
+        return _read_text(str(file_path), stat.st_mtime_ns, stat.st_size)
@@ -1,17 +1,152 @@
 """Web scraping fetcher for documentation."""
 
+import asyncio
+import functools
+import multiprocessing
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
 from typing import Any
-from urllib.parse import urljoin, urlparse
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
 
 import httpx
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, Tag
 
 from doc2mcp.config import WebSource
 
+# Optional Lexbor parser - much faster than BeautifulSoup, which stays the fallback
+try:
+    from selectolax.lexbor import LexborHTMLParser, LexborNode
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    SELECTOLAX_AVAILABLE = False
+
+# Optional HTTP/2 support - multiplex requests to a host over one connection
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
 JINA_READER_PREFIX = "https://r.jina.ai/"
 
+# Connections kept open across fetches so crawls reuse TLS sessions
+MAX_KEEPALIVE_CONNECTIONS = 64
+MAX_CONNECTIONS = 128
+KEEPALIVE_EXPIRY = 30.0
+
+# Times a failed connection attempt is retried (e.g. a reset by the server)
+CONNECT_RETRIES = 2
+
+# Pages at least this many characters are parsed off the event loop
+PARSE_OFFLOAD_THRESHOLD = 200_000
+
+_parse_pool: ProcessPoolExecutor | None = None
+
+# Query parameters that only track the visit and never change the page
+# (besides every utm_* parameter)
+_TRACKING_PARAMS = frozenset({"gclid", "fbclid", "msclkid", "mc_cid", "mc_eid", "_ga", "_gl"})
+
+# Patterns applied to every fetched page
+_BLANK_LINES_PATTERN = re.compile(r"\n{3,}")
+_DOUBLE_SPACE_PATTERN = re.compile(r" {2,}")
+_MARKDOWN_TITLE_PATTERN = re.compile(r"^#\s+(.+)$", re.MULTILINE)
+_MARKDOWN_LINK_PATTERN = re.compile(r"\[([^\]]+)\]\(([^)]+)\)")
+_IMAGE_EXTENSIONS = (".png", ".jpg", ".gif", ".svg", ".ico")
+
+# Canonicalized URLs remembered per process
+CANONICAL_URL_CACHE_SIZE = 4096
+
+
+def canonicalize_url(url: str) -> str:
+    """Normalize a URL so that variants of the same page compare equal.
+
+    The scheme and host are lowercased, the fragment and tracking
+    parameters dropped and the remaining query parameters sorted. The path
+    is kept as-is, since a trailing slash changes how the page's relative
+    links resolve.
+
+    Args:
+        url: An absolute URL.
+
+    Returns:
+        The canonical URL; non-HTTP URLs are returned unchanged.
+    """
+    return _canonicalize(url)[0]
+
+
+@functools.lru_cache(maxsize=CANONICAL_URL_CACHE_SIZE)
+def _canonicalize(url: str) -> tuple[str, str]:
+    """Canonicalize a URL, also returning its host so callers needn't reparse it.
+
+    Crawls see the same links on page after page, and each is canonicalized
+    again when queued, so results are cached.
+
+    Returns:
+        Tuple of (canonical URL, lowercased netloc).
+    """
+    parts = urlsplit(url)
+    netloc = parts.netloc.lower()
+    if parts.scheme.lower() not in ("http", "https"):
+        return url, netloc
+
+    query = parts.query
+    if query:
+        query = urlencode(sorted(
+            (key, value)
+            for key, value in parse_qsl(query, keep_blank_values=True)
+            if not key.startswith("utm_") and key not in _TRACKING_PARAMS
+        ))
+    return urlunsplit((parts.scheme.lower(), netloc, parts.path or "/", query, "")), netloc
+
+
+def _get_parse_pool() -> ProcessPoolExecutor | None:
+    """Get the shared HTML parsing pool.
+
+    Returns:
+        The process pool, or None inside daemonic processes (e.g. Celery
+        prefork workers), which may not start children of their own.
+    """
+    global _parse_pool
+    if _parse_pool is None and not multiprocessing.current_process().daemon:
+        _parse_pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+    return _parse_pool
+
+
+def _parse_html(
+    html: str,
+    url: str,
+    base_domain: str | None,
+    selectors: dict[str, str] | None,
+) -> tuple[str, list[dict[str, str]], str]:
+    """Parse a page into (title, links, content); runs in a worker process.
+
+    The page is parsed once: title and links are read first, then the
+    same tree is pruned down to its content.
+    """
+    if SELECTOLAX_AVAILABLE:
+        tree = LexborHTMLParser(html)
+        title_node = tree.css_first("title")
+        title = title_node.text(strip=True) if title_node else ""
+        anchors: list[tuple[str, str]] = [
+            (node.attributes.get("href") or "", node.text(strip=True))
+            for node in tree.css("a[href]")
+        ]
+        text = WebFetcher._extract_text_lexbor(tree, selectors)
+    else:
+        soup = BeautifulSoup(html, "lxml")
+        title_tag = soup.find("title")
+        title = title_tag.get_text(strip=True) if title_tag else ""
+        anchors = [
+            (str(a_tag["href"]), a_tag.get_text(strip=True))
+            for a_tag in soup.find_all("a", href=True)
+        ]
+        text = WebFetcher._extract_text_bs4(soup, selectors)
+
+    links = WebFetcher._extract_html_links(anchors, url, base_domain)
+    return title, links, WebFetcher._clean_text(text)
+
 
 @dataclass
 class FetchResult:
@@ -40,6 +175,15 @@ class WebFetcher:
             self._client = httpx.AsyncClient(
                 timeout=self.timeout,
                 follow_redirects=True,
+                transport=httpx.AsyncHTTPTransport(
+                    http2=HTTP2_AVAILABLE,
+                    limits=httpx.Limits(
+                        max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                        max_connections=MAX_CONNECTIONS,
+                        keepalive_expiry=KEEPALIVE_EXPIRY,
+                    ),
+                    retries=CONNECT_RETRIES,
+                ),
                 headers={
                     "User-Agent": "Doc2MCP/0.1.0 (Documentation Fetcher)",
                     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
@@ -95,7 +239,7 @@ class WebFetcher:
         content = response.text
 
         # Clean up whitespace
-        content = re.sub(r"\n{3,}", "\n\n", content)
+        content = _BLANK_LINES_PATTERN.sub("\n\n", content)
         content = content.strip()
 
         # Extract title from markdown (first # heading)
@@ -123,17 +267,18 @@ class WebFetcher:
         response.raise_for_status()
 
         html = response.text
-        soup = BeautifulSoup(html, "lxml")
-
-        # Extract title
-        title_tag = soup.find("title")
-        title = title_tag.get_text(strip=True) if title_tag else ""
-
-        # Extract links before removing elements
-        links = self._extract_html_links(soup, source.url, base_domain)
-
-        # Extract content
-        content = self._extract_content(html, source.selectors)
+        parse_args = (html, source.url, base_domain, source.selectors)
+
+        # Parsing is CPU-bound; keep large pages from stalling the event loop
+        if len(html) >= PARSE_OFFLOAD_THRESHOLD:
+            pool = _get_parse_pool()
+            if pool is not None:
+                loop = asyncio.get_running_loop()
+                title, links, content = await loop.run_in_executor(pool, _parse_html, *parse_args)
+            else:
+                title, links, content = await asyncio.to_thread(_parse_html, *parse_args)
+        else:
+            title, links, content = _parse_html(*parse_args)
 
         return FetchResult(url=source.url, content=content, title=title, links=links)
 
@@ -159,7 +304,7 @@ class WebFetcher:
             The first heading or empty string.
         """
         # Look for first # heading
-        match = re.search(r"^#\s+(.+)$", content, re.MULTILINE)
+        match = _MARKDOWN_TITLE_PATTERN.search(content)
         if match:
             return match.group(1).strip()
 
@@ -184,28 +329,31 @@ class WebFetcher:
         Returns:
             List of link dictionaries with url and text.
         """
-        # Match markdown links: [text](url)
-        link_pattern = r"\[([^\]]+)\]\(([^)]+)\)"
-        matches = re.findall(link_pattern, content)
-
         links = []
         seen_urls = set()
+        seen_hrefs = set()
+
+        # Match markdown links: [text](url)
+        for match in _MARKDOWN_LINK_PATTERN.finditer(content):
+            text, href = match.groups()
 
-        for text, href in matches:
             # Skip anchors, images, and non-http links
             if href.startswith("#") or href.startswith("mailto:"):
                 continue
-            if any(href.lower().endswith(ext) for ext in [".png", ".jpg", ".gif", ".svg", ".ico"]):
+            if href.lower().endswith(_IMAGE_EXTENSIONS):
+                continue
+
+            # A repeated href resolves to a link already seen
+            if href in seen_hrefs:
                 continue
+            seen_hrefs.add(href)
 
-            # Resolve relative URLs
-            full_url = urljoin(base_url, href)
+            # Resolve relative URLs; variants of one page dedupe to one link
+            full_url, netloc = _canonicalize(urljoin(base_url, href))
 
             # Filter by domain if specified
-            if base_domain:
-                parsed = urlparse(full_url)
-                if parsed.netloc and base_domain not in parsed.netloc:
-                    continue
+            if base_domain and netloc and base_domain not in netloc:
+                continue
 
             # Deduplicate
             if full_url in seen_urls:
@@ -216,13 +364,14 @@ class WebFetcher:
 
         return links
 
+    @staticmethod
     def _extract_html_links(
-        self, soup: BeautifulSoup, base_url: str, base_domain: str | None = None
+        anchors: list[tuple[str, str]], base_url: str, base_domain: str | None = None
     ) -> list[dict[str, str]]:
         """Extract links from HTML.
 
         Args:
-            soup: BeautifulSoup object.
+            anchors: (href, text) of each <a href> on the page, in order.
             base_url: Base URL for resolving relative links.
             base_domain: If provided, only include links to this domain.
 
@@ -232,22 +381,17 @@ class WebFetcher:
         links = []
         seen_urls = set()
 
-        for a_tag in soup.find_all("a", href=True):
-            href = a_tag["href"]
-            text = a_tag.get_text(strip=True)
-
+        for href, text in anchors:
             # Skip anchors and non-http links
             if href.startswith("#") or href.startswith("mailto:") or href.startswith("javascript:"):
                 continue
 
-            # Resolve relative URLs
-            full_url = urljoin(base_url, href)
+            # Resolve relative URLs; variants of one page dedupe to one link
+            full_url, netloc = _canonicalize(urljoin(base_url, href))
 
             # Filter by domain if specified
-            if base_domain:
-                parsed = urlparse(full_url)
-                if parsed.netloc and base_domain not in parsed.netloc:
-                    continue
+            if base_domain and netloc and base_domain not in netloc:
+                continue
 
             # Deduplicate
             if full_url in seen_urls:
@@ -259,9 +403,8 @@ class WebFetcher:
 
         return links
 
-    def _extract_content(
-        self, html: str, selectors: dict[str, str] | None = None
-    ) -> str:
+    @staticmethod
+    def _extract_content(html: str, selectors: dict[str, str] | None = None) -> str:
         """Extract text content from HTML.
 
         Args:
@@ -271,8 +414,49 @@ class WebFetcher:
         Returns:
             Cleaned text content.
         """
-        soup = BeautifulSoup(html, "lxml")
+        if SELECTOLAX_AVAILABLE:
+            text = WebFetcher._extract_text_lexbor(LexborHTMLParser(html), selectors)
+        else:
+            text = WebFetcher._extract_text_bs4(BeautifulSoup(html, "lxml"), selectors)
+        return WebFetcher._clean_text(text)
+
+    @staticmethod
+    def _clean_text(text: str) -> str:
+        """Collapse the blank lines and runs of spaces left by text extraction."""
+        text = _BLANK_LINES_PATTERN.sub("\n\n", text)
+        text = _DOUBLE_SPACE_PATTERN.sub(" ", text)
+        return text.strip()
 
+    @staticmethod
+    def _extract_text_lexbor(tree: Any, selectors: dict[str, str] | None) -> str:
+        """Extract raw page text from a selectolax tree, pruning it in place."""
+        # Remove script and style elements
+        for tag in ("script", "style", "noscript"):
+            for node in tree.css(tag):
+                node.decompose()
+
+        # Apply exclude selectors if provided
+        if selectors and "exclude" in selectors:
+            for selector in selectors["exclude"].split(","):
+                for node in tree.css(selector.strip()):
+                    node.decompose()
+
+        # Find content area
+        content_node: LexborNode | None = tree.root
+        if selectors and "content" in selectors:
+            for selector in selectors["content"].split(","):
+                found = tree.css_first(selector.strip())
+                if found is not None:
+                    content_node = found
+                    break
+
+        if content_node is None:
+            return ""
+        return content_node.text(separator="\n", strip=True)
+
+    @staticmethod
+    def _extract_text_bs4(soup: BeautifulSoup, selectors: dict[str, str] | None) -> str:
+        """Extract raw page text from a BeautifulSoup tree, pruning it in place."""
         # Remove script and style elements
         for element in soup(["script", "style", "noscript"]):
             element.decompose()
@@ -285,7 +469,7 @@ class WebFetcher:
                     element.decompose()
 
         # Find content area
-        content_element: Any = soup
+        content_element: Tag = soup
         if selectors and "content" in selectors:
             for selector in selectors["content"].split(","):
                 selector = selector.strip()
@@ -294,14 +478,7 @@ class WebFetcher:
                     content_element = found
                     break
 
-        # Extract text
-        text = content_element.get_text(separator="\n", strip=True)
-
-        # Clean up whitespace
-        text = re.sub(r"\n{3,}", "\n\n", text)
-        text = re.sub(r" {2,}", " ", text)
-
-        return text.strip()
+        return content_element.get_text(separator="\n", strip=True)
 
     async def close(self) -> None:
         """Close the HTTP client."""
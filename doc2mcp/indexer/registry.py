@@ -1,41 +1,155 @@
 """Tool registry that manages auto-generated MCP tools with lazy content loading."""
 
+import asyncio
 import hashlib
-import json
+import heapq
 import logging
-from dataclasses import asdict
+import random
+import time
+import zlib
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import replace
 from pathlib import Path
 from typing import Any
+from urllib.parse import urlsplit
 
-from doc2mcp.fetchers.web import WebFetcher
+import httpx
+import orjson
+
+# Optional zstd compression for cached pages, with zlib as the fallback
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+from doc2mcp.fetchers.web import FetchResult, WebFetcher
 from doc2mcp.indexer.tool_generator import GeneratedTool, index_documentation_source
 
 logger = logging.getLogger(__name__)
 
+# Seconds an empty page is cached before it is fetched again
+EMPTY_PAGE_TTL = 600
+
+# Cached pages also kept in memory, most recently used first
+MEMORY_CACHE_SIZE = 256
+
+# zstd level for cached pages; higher levels gain little on text
+ZSTD_LEVEL = 3
+
+# Blobs written by one codec aren't read back by the other
+_BLOB_SUFFIX = ".json.zst" if ZSTD_AVAILABLE else ".json.z"
+_DECOMPRESS_ERRORS = (zlib.error, zstandard.ZstdError) if ZSTD_AVAILABLE else (zlib.error,)
+
+# Content fetches in flight at once when prefetching, overall and per host
+PREFETCH_CONCURRENCY = 32
+PREFETCH_PER_HOST = 8
+
+# Content fetches are spaced to at most this many per second per host
+HOST_REQUESTS_PER_SECOND = 4.0
+
+# Transient fetch failures are retried with exponential backoff and jitter,
+# or after the server's Retry-After when it sends one
+FETCH_ATTEMPTS = 3
+RETRY_BASE_DELAY = 1.0
+RETRY_JITTER = 0.5
+MAX_RETRY_DELAY = 30.0
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+def _retry_delay(error: Exception, attempt: int) -> float | None:
+    """Seconds to wait before retrying a failed fetch.
+
+    Args:
+        error: The exception the fetch raised.
+        attempt: Zero-based number of the attempt that failed.
+
+    Returns:
+        The delay, or None if the error isn't worth retrying.
+    """
+    if isinstance(error, httpx.HTTPStatusError):
+        if error.response.status_code not in RETRYABLE_STATUS_CODES:
+            return None
+        retry_after = error.response.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            return min(float(retry_after), MAX_RETRY_DELAY)
+    elif not isinstance(error, httpx.TransportError):
+        return None
+    delay = RETRY_BASE_DELAY * 2.0**attempt + random.uniform(0, RETRY_JITTER)
+    return min(delay, MAX_RETRY_DELAY)
+
 
 class ContentCache:
-    """Simple file-based content cache."""
+    """Simple file-based page cache.
+    
+    Each page is stored as a compressed JSON blob holding its content, title
+    and links (zstd when installed, zlib otherwise), and the most recently
+    used pages are also kept in memory. Pages that came back empty are
+    remembered too, for EMPTY_PAGE_TTL seconds, so they aren't refetched
+    on every call.
+    """
     
-    def __init__(self, cache_dir: str | Path):
+    def __init__(self, cache_dir: str | Path, memory_size: int = MEMORY_CACHE_SIZE):
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.memory_size = memory_size
+        self._memory: OrderedDict[str, tuple[float, FetchResult]] = OrderedDict()
+        self._compress: Callable[[bytes], bytes]
+        self._decompress: Callable[[bytes], bytes]
+        if ZSTD_AVAILABLE:
+            self._compress = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress
+            self._decompress = zstandard.ZstdDecompressor().decompress
+        else:
+            self._compress = zlib.compress
+            self._decompress = zlib.decompress
     
     def _url_to_path(self, url: str) -> Path:
         """Convert URL to cache file path."""
         url_hash = hashlib.sha256(url.encode()).hexdigest()[:16]
-        return self.cache_dir / f"{url_hash}.txt"
+        return self.cache_dir / f"{url_hash}{_BLOB_SUFFIX}"
     
-    def get(self, url: str) -> str | None:
-        """Get cached content for a URL."""
-        path = self._url_to_path(url)
-        if path.exists():
-            return path.read_text(encoding="utf-8")
-        return None
+    def get(self, url: str) -> FetchResult | None:
+        """Get the cached page for a URL."""
+        entry = self._memory.get(url)
+        if entry is not None:
+            self._memory.move_to_end(url)
+        else:
+            try:
+                data: dict[str, Any] = orjson.loads(
+                    self._decompress(self._url_to_path(url).read_bytes())
+                )
+            except (OSError, ValueError, *_DECOMPRESS_ERRORS):
+                return None
+            page = FetchResult(
+                url=url, content=data["content"], title=data["title"], links=data["links"]
+            )
+            entry = (float(data["fetched_at"]), page)
+            self._remember(url, entry)
+        
+        fetched_at, page = entry
+        if not page.content and time.time() - fetched_at > EMPTY_PAGE_TTL:
+            return None
+        return page
+    
+    def set(self, url: str, result: FetchResult) -> None:
+        """Cache the page fetched for a URL."""
+        fetched_at = time.time()
+        data = {
+            "content": result.content,
+            "title": result.title,
+            "links": result.links,
+            "fetched_at": fetched_at,
+        }
+        self._url_to_path(url).write_bytes(self._compress(orjson.dumps(data)))
+        self._remember(url, (fetched_at, result))
     
-    def set(self, url: str, content: str) -> None:
-        """Cache content for a URL."""
-        path = self._url_to_path(url)
-        path.write_text(content, encoding="utf-8")
+    def _remember(self, url: str, entry: tuple[float, FetchResult]) -> None:
+        """Keep a page in memory, evicting the least recently used beyond memory_size."""
+        self._memory[url] = entry
+        self._memory.move_to_end(url)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
 
 
 class ToolRegistry:
@@ -62,6 +176,10 @@ class ToolRegistry:
         self._content_cache = ContentCache(self.cache_dir / "content")
         self._fetcher = WebFetcher()
         
+        # Per-host request spacing: host -> earliest time of its next request
+        self._host_locks: dict[str, asyncio.Lock] = {}
+        self._host_next_request: dict[str, float] = {}
+        
         # Load persisted tools
         self._load_registry()
     
@@ -70,8 +188,7 @@ class ToolRegistry:
         registry_file = self.cache_dir / "registry.json"
         if registry_file.exists():
             try:
-                with open(registry_file) as f:
-                    data = json.load(f)
+                data = orjson.loads(registry_file.read_bytes())
                 
                 for tool_data in data.get("tools", []):
                     tool = GeneratedTool(**tool_data)
@@ -89,15 +206,17 @@ class ToolRegistry:
         """Persist tool registry to disk."""
         registry_file = self.cache_dir / "registry.json"
         try:
-            data = {
-                "tools": [asdict(t) for t in self._tools.values()]
-            }
             # Don't save content to registry (it's in separate cache)
-            for tool_data in data["tools"]:
-                tool_data["content"] = None
+            tools = [
+                t if t.content is None else replace(t, content=None)
+                for t in self._tools.values()
+            ]
+            data = orjson.dumps({"tools": tools}, option=orjson.OPT_INDENT_2)
             
-            with open(registry_file, 'w') as f:
-                json.dump(data, f, indent=2)
+            # Write aside and rename, so a crash mid-write can't corrupt the registry
+            tmp_file = registry_file.with_suffix(".json.tmp")
+            tmp_file.write_bytes(data)
+            tmp_file.replace(registry_file)
         except Exception as e:
             logger.warning(f"Failed to save registry: {e}")
     
@@ -172,30 +291,95 @@ class ToolRegistry:
         Returns:
             The documentation content or None
         """
+        page = await self.get_tool_page(tool_id)
+        return page.content if page and page.content else None
+    
+    async def get_tool_page(self, tool_id: str) -> FetchResult | None:
+        """
+        Get the fetched page for a tool, with its title and links.
+        
+        Args:
+            tool_id: The tool ID
+            
+        Returns:
+            The page (whose content may be empty) or None if it couldn't be fetched
+        """
         tool = self._tools.get(tool_id)
         if not tool:
             return None
         
         # Check cache first
         cached = self._content_cache.get(tool.url)
-        if cached:
+        if cached is not None:
             logger.debug(f"Cache hit for {tool_id}")
             return cached
         
         # Fetch content
         logger.info(f"Fetching content for {tool_id}: {tool.url}")
         try:
-            result = await self._fetcher.fetch_with_links(tool.url)
-            content = result.content
-            
-            if content:
-                # Cache the content
-                self._content_cache.set(tool.url, content)
-                return content
+            result = await self._fetch(tool.url)
         except Exception as e:
             logger.error(f"Failed to fetch content for {tool_id}: {e}")
+            return None
         
-        return None
+        # Cache the page, even when empty
+        self._content_cache.set(tool.url, result)
+        return result
+    
+    async def _fetch(self, url: str) -> FetchResult:
+        """Fetch a page, spacing requests per host and retrying transient failures."""
+        host = urlsplit(url).netloc
+        attempt = 0
+        while True:
+            await self._wait_for_host(host)
+            try:
+                return await self._fetcher.fetch_with_links(url)
+            except Exception as e:
+                delay = _retry_delay(e, attempt)
+                attempt += 1
+                if delay is None or attempt >= FETCH_ATTEMPTS:
+                    raise
+                logger.info(f"Retrying {url} in {delay:.1f}s after: {e}")
+                await asyncio.sleep(delay)
+    
+    async def _wait_for_host(self, host: str) -> None:
+        """Wait until another request to a host fits its rate limit."""
+        lock = self._host_locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            loop = asyncio.get_running_loop()
+            wait = self._host_next_request.get(host, 0.0) - loop.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._host_next_request[host] = loop.time() + 1 / HOST_REQUESTS_PER_SECOND
+    
+    async def prefetch(
+        self,
+        tool_ids: list[str],
+        concurrency: int = PREFETCH_CONCURRENCY,
+        per_host: int = PREFETCH_PER_HOST,
+    ) -> None:
+        """
+        Warm the content cache for several tools concurrently.
+        
+        Args:
+            tool_ids: The tool IDs to fetch content for
+            concurrency: Maximum fetches in flight at once
+            per_host: Maximum fetches in flight to any one host
+        """
+        slots = asyncio.Semaphore(concurrency)
+        host_slots: dict[str, asyncio.Semaphore] = {}
+        
+        async def fetch_one(tool_id: str) -> None:
+            tool = self._tools.get(tool_id)
+            if not tool:
+                return
+            host = urlsplit(tool.url).netloc
+            if host not in host_slots:
+                host_slots[host] = asyncio.Semaphore(per_host)
+            async with host_slots[host], slots:
+                await self.get_tool_content(tool_id)
+        
+        await asyncio.gather(*[fetch_one(tid) for tid in tool_ids], return_exceptions=True)
     
     def to_mcp_tools(self) -> list[dict[str, Any]]:
         """Convert all tools to MCP tool definitions."""
@@ -232,10 +416,8 @@ class ToolRegistry:
             if score > 0:
                 scored.append((score, tool))
         
-        # Sort by score descending
-        scored.sort(key=lambda x: -x[0])
-        
-        return [t for _, t in scored[:limit]]
+        # Best scores first
+        return [t for _, t in heapq.nlargest(limit, scored, key=lambda x: x[0])]
 
 
 # Global registry instance
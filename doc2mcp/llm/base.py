@@ -1,8 +1,11 @@
 """Base LLM provider interface."""
 
 from abc import ABC, abstractmethod
+from collections.abc import AsyncGenerator
 from dataclasses import dataclass
 
+from pydantic import BaseModel
+
 
 @dataclass
 class LLMResponse:
@@ -12,6 +15,7 @@ class LLMResponse:
     tokens_in: int | None = None
     tokens_out: int | None = None
     model: str | None = None
+    tokens_cached: int | None = None  # Part of tokens_in served from the provider's prompt cache
 
 
 class LLMProvider(ABC):
@@ -25,6 +29,7 @@ class LLMProvider(ABC):
         max_tokens: int = 4096,
         temperature: float = 0.1,
         json_response: bool = False,
+        response_schema: type[BaseModel] | None = None,
     ) -> LLMResponse:
         """Generate a response from the LLM.
         
@@ -34,12 +39,59 @@ class LLMProvider(ABC):
             max_tokens: Maximum tokens in response.
             temperature: Sampling temperature.
             json_response: Whether to request JSON output.
+            response_schema: Optional model the JSON output must follow.
+                Ignored by providers without supports_response_schema.
             
         Returns:
             LLMResponse with generated text and metadata.
         """
         pass
     
+    async def stream_generate(
+        self,
+        prompt: str,
+        system_instruction: str | None = None,
+        max_tokens: int = 4096,
+        temperature: float = 0.1,
+        json_response: bool = False,
+        response_schema: type[BaseModel] | None = None,
+    ) -> AsyncGenerator[LLMResponse, None]:
+        """Generate a response from the LLM as a stream of text chunks.
+        
+        Each yielded LLMResponse carries the next piece of text; token counts
+        are set on whichever chunk the provider reports them with. Providers
+        without streaming support yield the full response as one chunk.
+        
+        Args:
+            prompt: The user prompt.
+            system_instruction: Optional system instruction.
+            max_tokens: Maximum tokens in response.
+            temperature: Sampling temperature.
+            json_response: Whether to request JSON output.
+            response_schema: Optional model the JSON output must follow.
+                Ignored by providers without supports_response_schema.
+            
+        Yields:
+            LLMResponse chunks in generation order.
+        """
+        yield await self.generate(
+            prompt=prompt,
+            system_instruction=system_instruction,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            json_response=json_response,
+            response_schema=response_schema,
+        )
+    
+    @property
+    def supports_response_schema(self) -> bool:
+        """Whether JSON output can be constrained to a response_schema.
+
+        Callers must describe the expected JSON in the prompt for providers
+        that don't.
+        """
+        return False
+    
     @property
     @abstractmethod
     def name(self) -> str:
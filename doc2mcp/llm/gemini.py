@@ -1,15 +1,39 @@
 """Gemini LLM provider."""
 
 import os
+from collections.abc import AsyncGenerator
 
 from google import genai
 from google.genai import types
+from pydantic import BaseModel
 
 from doc2mcp.llm.base import LLMProvider, LLMResponse
 
 
+def _token_counts(
+    response: types.GenerateContentResponse,
+) -> tuple[int | None, int | None, int | None]:
+    """Read prompt, output and cached prompt token counts, if reported."""
+    usage = response.usage_metadata
+    if usage is None:
+        # Not reported, e.g. on intermediate stream chunks
+        return None, None, None
+    return (
+        usage.prompt_token_count,
+        usage.candidates_token_count,
+        usage.cached_content_token_count,
+    )
+
+
 class GeminiProvider(LLMProvider):
-    """Google Gemini LLM provider."""
+    """Google Gemini LLM provider.
+
+    System instructions are passed inline rather than through explicit
+    context caches: Gemini only accepts caches above a minimum size (1024+
+    tokens depending on the model), well beyond the agent's instructions.
+    Identical configs keep every request's prefix stable so implicit
+    caching applies instead; hits are reported as tokens_cached.
+    """
     
     def __init__(self, api_key: str | None = None, model: str = "gemini-2.0-flash-exp"):
         self.api_key = api_key or os.environ.get("GOOGLE_API_KEY")
@@ -18,11 +42,48 @@ class GeminiProvider(LLMProvider):
         
         self.client = genai.Client(api_key=self.api_key)
         self.model = model
+        
+        # Callers reuse a handful of settings; build each config once
+        self._configs: dict[
+            tuple[str | None, int, float, bool, type[BaseModel] | None],
+            types.GenerateContentConfig,
+        ] = {}
     
     @property
     def name(self) -> str:
         return "gemini"
     
+    @property
+    def supports_response_schema(self) -> bool:
+        return True
+    
+    def _build_config(
+        self,
+        system_instruction: str | None,
+        max_tokens: int,
+        temperature: float,
+        json_response: bool,
+        response_schema: type[BaseModel] | None,
+    ) -> types.GenerateContentConfig:
+        key = (system_instruction, max_tokens, temperature, json_response, response_schema)
+        cached = self._configs.get(key)
+        if cached is not None:
+            return cached
+        
+        config = types.GenerateContentConfig(
+            system_instruction=system_instruction,
+            max_output_tokens=max_tokens,
+            temperature=temperature,
+        )
+        
+        if json_response or response_schema is not None:
+            config.response_mime_type = "application/json"
+        if response_schema is not None:
+            config.response_schema = response_schema
+        
+        self._configs[key] = config
+        return config
+    
     async def generate(
         self,
         prompt: str,
@@ -30,37 +91,55 @@ class GeminiProvider(LLMProvider):
         max_tokens: int = 4096,
         temperature: float = 0.1,
         json_response: bool = False,
+        response_schema: type[BaseModel] | None = None,
     ) -> LLMResponse:
         """Generate a response using Gemini."""
-        config = types.GenerateContentConfig(
-            system_instruction=system_instruction,
-            max_output_tokens=max_tokens,
-            temperature=temperature,
+        config = self._build_config(
+            system_instruction, max_tokens, temperature, json_response, response_schema
         )
         
-        if json_response:
-            config.response_mime_type = "application/json"
-        
         response = await self.client.aio.models.generate_content(
             model=self.model,
             contents=prompt,
             config=config,
         )
         
-        tokens_in = getattr(
-            getattr(response, "usage_metadata", None),
-            "prompt_token_count",
-            None,
-        )
-        tokens_out = getattr(
-            getattr(response, "usage_metadata", None),
-            "candidates_token_count",
-            None,
-        )
+        tokens_in, tokens_out, tokens_cached = _token_counts(response)
         
         return LLMResponse(
             text=response.text,
             tokens_in=tokens_in,
             tokens_out=tokens_out,
             model=self.model,
+            tokens_cached=tokens_cached,
         )
+    
+    async def stream_generate(
+        self,
+        prompt: str,
+        system_instruction: str | None = None,
+        max_tokens: int = 4096,
+        temperature: float = 0.1,
+        json_response: bool = False,
+        response_schema: type[BaseModel] | None = None,
+    ) -> AsyncGenerator[LLMResponse, None]:
+        """Stream a response from Gemini chunk by chunk."""
+        config = self._build_config(
+            system_instruction, max_tokens, temperature, json_response, response_schema
+        )
+        
+        stream = await self.client.aio.models.generate_content_stream(
+            model=self.model,
+            contents=prompt,
+            config=config,
+        )
+        
+        async for chunk in stream:
+            tokens_in, tokens_out, tokens_cached = _token_counts(chunk)
+            yield LLMResponse(
+                text=chunk.text or "",
+                tokens_in=tokens_in,
+                tokens_out=tokens_out,
+                model=self.model,
+                tokens_cached=tokens_cached,
+            )
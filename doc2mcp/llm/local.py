@@ -1,8 +1,12 @@
 """Local LLM provider (Ollama-compatible)."""
 
 import os
+from collections.abc import AsyncGenerator
+from typing import Any
 
 import httpx
+import orjson
+from pydantic import BaseModel
 
 from doc2mcp.llm.base import LLMProvider, LLMResponse
 
@@ -23,34 +27,59 @@ class LocalLLMProvider(LLMProvider):
     def name(self) -> str:
         return "local"
     
-    async def generate(
+    @property
+    def supports_response_schema(self) -> bool:
+        return True
+    
+    def _build_payload(
         self,
         prompt: str,
-        system_instruction: str | None = None,
-        max_tokens: int = 4096,
-        temperature: float = 0.1,
-        json_response: bool = False,
-    ) -> LLMResponse:
-        """Generate a response using local Ollama API."""
+        system_instruction: str | None,
+        max_tokens: int,
+        temperature: float,
+        json_response: bool,
+        response_schema: type[BaseModel] | None,
+        stream: bool,
+    ) -> dict[str, Any]:
         # Build the full prompt with system instruction
         full_prompt = prompt
         if system_instruction:
             full_prompt = f"{system_instruction}\n\n{prompt}"
         
         # Use Ollama's generate endpoint
-        payload = {
+        payload: dict[str, Any] = {
             "model": self.model,
             "prompt": full_prompt,
-            "stream": False,
+            "stream": stream,
             "options": {
                 "num_predict": max_tokens,
                 "temperature": temperature,
             }
         }
         
-        if json_response:
+        if response_schema is not None:
+            # Ollama constrains output to a JSON schema passed as the format
+            payload["format"] = response_schema.model_json_schema()
+        elif json_response:
             payload["format"] = "json"
         
+        return payload
+    
+    async def generate(
+        self,
+        prompt: str,
+        system_instruction: str | None = None,
+        max_tokens: int = 4096,
+        temperature: float = 0.1,
+        json_response: bool = False,
+        response_schema: type[BaseModel] | None = None,
+    ) -> LLMResponse:
+        """Generate a response using local Ollama API."""
+        payload = self._build_payload(
+            prompt, system_instruction, max_tokens, temperature, json_response, response_schema,
+            stream=False,
+        )
+        
         response = await self.client.post(
             f"{self.base_url}/api/generate",
             json=payload,
@@ -66,6 +95,38 @@ class LocalLLMProvider(LLMProvider):
             model=self.model,
         )
     
+    async def stream_generate(
+        self,
+        prompt: str,
+        system_instruction: str | None = None,
+        max_tokens: int = 4096,
+        temperature: float = 0.1,
+        json_response: bool = False,
+        response_schema: type[BaseModel] | None = None,
+    ) -> AsyncGenerator[LLMResponse, None]:
+        """Stream a response from the local Ollama API chunk by chunk."""
+        payload = self._build_payload(
+            prompt, system_instruction, max_tokens, temperature, json_response, response_schema,
+            stream=True,
+        )
+        
+        async with self.client.stream(
+            "POST", f"{self.base_url}/api/generate", json=payload
+        ) as response:
+            response.raise_for_status()
+            
+            # Ollama streams one JSON object per line
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                data = orjson.loads(line)
+                yield LLMResponse(
+                    text=data.get("response", ""),
+                    tokens_in=data.get("prompt_eval_count"),
+                    tokens_out=data.get("eval_count"),
+                    model=self.model,
+                )
+    
     async def close(self):
         """Close the HTTP client."""
         await self.client.aclose()
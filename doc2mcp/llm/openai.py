@@ -1,8 +1,11 @@
 """OpenAI LLM provider."""
 
 import os
+from collections.abc import AsyncGenerator
+from typing import Any
 
 from openai import AsyncOpenAI
+from pydantic import BaseModel
 
 from doc2mcp.llm.base import LLMProvider, LLMResponse
 
@@ -22,15 +25,19 @@ class OpenAIProvider(LLMProvider):
     def name(self) -> str:
         return "openai"
     
-    async def generate(
+    @property
+    def supports_response_schema(self) -> bool:
+        return True
+    
+    def _build_kwargs(
         self,
         prompt: str,
-        system_instruction: str | None = None,
-        max_tokens: int = 4096,
-        temperature: float = 0.1,
-        json_response: bool = False,
-    ) -> LLMResponse:
-        """Generate a response using OpenAI."""
+        system_instruction: str | None,
+        max_tokens: int,
+        temperature: float,
+        json_response: bool,
+        response_schema: type[BaseModel] | None,
+    ) -> dict[str, Any]:
         messages = []
         
         if system_instruction:
@@ -38,16 +45,42 @@ class OpenAIProvider(LLMProvider):
         
         messages.append({"role": "user", "content": prompt})
         
-        kwargs = {
+        kwargs: dict[str, Any] = {
             "model": self.model,
             "messages": messages,
             "max_tokens": max_tokens,
             "temperature": temperature,
         }
         
-        if json_response:
+        if response_schema is not None:
+            # Structured outputs, non-strict: strict mode needs additionalProperties
+            # set to false on every object, which pydantic schemas don't include
+            kwargs["response_format"] = {
+                "type": "json_schema",
+                "json_schema": {
+                    "name": response_schema.__name__,
+                    "schema": response_schema.model_json_schema(),
+                },
+            }
+        elif json_response:
             kwargs["response_format"] = {"type": "json_object"}
         
+        return kwargs
+    
+    async def generate(
+        self,
+        prompt: str,
+        system_instruction: str | None = None,
+        max_tokens: int = 4096,
+        temperature: float = 0.1,
+        json_response: bool = False,
+        response_schema: type[BaseModel] | None = None,
+    ) -> LLMResponse:
+        """Generate a response using OpenAI."""
+        kwargs = self._build_kwargs(
+            prompt, system_instruction, max_tokens, temperature, json_response, response_schema
+        )
+        
         response = await self.client.chat.completions.create(**kwargs)
         
         return LLMResponse(
@@ -56,3 +89,31 @@ class OpenAIProvider(LLMProvider):
             tokens_out=response.usage.completion_tokens if response.usage else None,
             model=self.model,
         )
+    
+    async def stream_generate(
+        self,
+        prompt: str,
+        system_instruction: str | None = None,
+        max_tokens: int = 4096,
+        temperature: float = 0.1,
+        json_response: bool = False,
+        response_schema: type[BaseModel] | None = None,
+    ) -> AsyncGenerator[LLMResponse, None]:
+        """Stream a response from OpenAI chunk by chunk."""
+        kwargs = self._build_kwargs(
+            prompt, system_instruction, max_tokens, temperature, json_response, response_schema
+        )
+        
+        stream = await self.client.chat.completions.create(
+            **kwargs,
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+        
+        async for chunk in stream:
+            yield LLMResponse(
+                text=(chunk.choices[0].delta.content or "") if chunk.choices else "",
+                tokens_in=chunk.usage.prompt_tokens if chunk.usage else None,
+                tokens_out=chunk.usage.completion_tokens if chunk.usage else None,
+                model=self.model,
+            )
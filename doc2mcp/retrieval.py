@@ -0,0 +1,508 @@
+"""Chunk-level retrieval for documentation content.
+
+Documents are split into chunks on paragraph, line, sentence and word
+boundaries, then ranked against a query with BM25 and, when
+sentence-transformers is installed, embedding similarity. The two rankings
+are merged with reciprocal rank fusion so that only the most relevant chunks
+are sent to the LLM instead of whole documents.
+
+Chunks are embedded in batches by a background task rather than one
+document at a time, so the model's matrix multiplies are amortized over
+many chunks; until a document's batch is done it is ranked by BM25 alone.
+"""
+
+import asyncio
+import hashlib
+import math
+import re
+from collections import Counter
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Any
+
+# Optional embedding support - fall back to BM25-only ranking if unavailable
+try:
+    import numpy as np
+    from sentence_transformers import SentenceTransformer
+    EMBEDDINGS_AVAILABLE = True
+except ImportError:
+    EMBEDDINGS_AVAILABLE = False
+    np = None
+    SentenceTransformer = None
+
+DEFAULT_EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+# Roughly 512 tokens of English documentation
+DEFAULT_CHUNK_SIZE = 2000
+
+# Split on the coarsest boundary first, falling back to finer ones
+_SEPARATORS = ("\n\n", "\n", ". ", " ")
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+# Chunks embedded per model call, and how long to wait for a batch to fill
+EMBED_BATCH_SIZE = 32
+EMBED_BATCH_WINDOW = 0.2
+
+# Normalized embeddings are stored as int8 with this fixed scale (4x smaller
+# than float32; ranking by inner product is preserved to within rounding)
+INT8_SCALE = 127
+
+# Paragraphs within this many differing SimHash bits count as duplicates;
+# shorter paragraphs (headings, code fences) are never deduplicated
+SIMHASH_MAX_DISTANCE = 3
+MIN_DEDUPE_TOKENS = 8
+
+# Reciprocal rank fusion and BM25 constants
+_RRF_K = 60
+_BM25_K1 = 1.5
+_BM25_B = 0.75
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into lowercase word tokens."""
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+def query_terms(query: str) -> set[str]:
+    """Distinct query words long enough to be meaningful (3+ characters)."""
+    return {token for token in tokenize(query) if len(token) > 2}
+
+
+def term_coverage(terms: set[str], text: str) -> float:
+    """Fraction of query terms that occur anywhere in text.
+
+    Args:
+        terms: Terms from query_terms().
+        text: Text to check.
+
+    Returns:
+        Coverage between 0 and 1 (1 when there are no terms to look for).
+    """
+    if not terms:
+        return 1.0
+    return len(terms.intersection(tokenize(text))) / len(terms)
+
+
+def simhash(tokens: Iterable[str]) -> int:
+    """Compute a 64-bit SimHash fingerprint of a token sequence.
+
+    Texts sharing most of their words get fingerprints that differ in only
+    a few bits, so near-duplicates can be found by Hamming distance.
+
+    Args:
+        tokens: Word tokens, usually from tokenize().
+
+    Returns:
+        The fingerprint as an unsigned 64-bit integer.
+    """
+    weights = [0] * 64
+    for token, count in Counter(tokens).items():
+        value = int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), "big")
+        for bit in range(64):
+            if value >> bit & 1:
+                weights[bit] += count
+            else:
+                weights[bit] -= count
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+def dedupe_paragraphs(
+    texts: Iterable[str], max_distance: int = SIMHASH_MAX_DISTANCE
+) -> tuple[list[str], int]:
+    """Drop paragraphs that nearly duplicate an earlier one.
+
+    Each text is split on blank lines; the first occurrence of a paragraph
+    is kept wherever it appears and later near-copies (shared navigation,
+    headers, boilerplate) are removed.
+
+    Args:
+        texts: Texts in priority order.
+        max_distance: Maximum differing fingerprint bits for a duplicate.
+
+    Returns:
+        Tuple of (texts with duplicates removed, paragraphs dropped).
+    """
+    seen: list[int] = []
+    deduped: list[str] = []
+    dropped = 0
+
+    for text in texts:
+        kept: list[str] = []
+        for paragraph in text.split("\n\n"):
+            tokens = tokenize(paragraph)
+            if len(tokens) >= MIN_DEDUPE_TOKENS:
+                fingerprint = simhash(tokens)
+                if any((fingerprint ^ other).bit_count() <= max_distance for other in seen):
+                    dropped += 1
+                    continue
+                seen.append(fingerprint)
+            kept.append(paragraph)
+        deduped.append("\n\n".join(kept))
+
+    return deduped, dropped
+
+
+def quantize_embeddings(embeddings: Any) -> Any:
+    """Quantize unit-normalized embeddings to int8.
+
+    Args:
+        embeddings: (n, dim) float array with components in [-1, 1].
+
+    Returns:
+        (n, dim) int8 array scaled by INT8_SCALE.
+    """
+    return np.clip(np.rint(embeddings * INT8_SCALE), -INT8_SCALE, INT8_SCALE).astype(np.int8)
+
+
+def chunk_text(text: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> list[str]:
+    """Split text into chunks of at most chunk_size characters.
+
+    Args:
+        text: The text to split.
+        chunk_size: Maximum characters per chunk.
+
+    Returns:
+        List of non-empty chunks in document order.
+    """
+    text = text.strip()
+    if not text:
+        return []
+    return [chunk for chunk in _split(text, chunk_size, 0) if chunk.strip()]
+
+
+def _split(text: str, chunk_size: int, level: int) -> list[str]:
+    """Recursively split text, packing pieces up to chunk_size."""
+    if len(text) <= chunk_size:
+        return [text]
+
+    if level >= len(_SEPARATORS):
+        return [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)]
+
+    separator = _SEPARATORS[level]
+    chunks: list[str] = []
+    current = ""
+
+    for piece in text.split(separator):
+        if len(piece) > chunk_size:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.extend(_split(piece, chunk_size, level + 1))
+            continue
+
+        candidate = f"{current}{separator}{piece}" if current else piece
+        if len(candidate) <= chunk_size:
+            current = candidate
+        else:
+            chunks.append(current)
+            current = piece
+
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+@dataclass
+class Chunk:
+    """A chunk of an indexed document."""
+
+    doc_id: str
+    text: str
+    term_counts: Counter[str]
+    length: int
+
+
+class ChunkIndex:
+    """Hybrid BM25 + embedding index over document chunks.
+
+    Documents are identified by an arbitrary doc_id (usually the page URL)
+    and re-indexed only when their content changes.
+    """
+
+    def __init__(
+        self,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        embedding_model: str | None = DEFAULT_EMBEDDING_MODEL,
+        quantize: bool = True,
+    ) -> None:
+        """Initialize the chunk index.
+
+        Args:
+            chunk_size: Maximum characters per chunk.
+            embedding_model: sentence-transformers model name used for
+                             semantic ranking. None disables embeddings.
+            quantize: Store chunk embeddings as int8 instead of float32.
+        """
+        self.chunk_size = chunk_size
+        self.embedding_model = embedding_model
+        self.quantize = quantize
+        self._model: Any = None
+        self._embeddings_enabled = EMBEDDINGS_AVAILABLE and embedding_model is not None
+
+        self._docs: dict[str, list[Chunk]] = {}
+        self._doc_hashes: dict[str, str] = {}
+        self._embeddings: dict[str, Any] = {}  # doc_id -> (n_chunks, dim) int8/float32 array
+
+        # Documents waiting to be embedded, drained by the background task
+        self._pending: dict[str, list[Chunk]] = {}
+        self._pending_event: asyncio.Event | None = None
+        self._embed_task: asyncio.Task[None] | None = None
+
+        # Corpus statistics for BM25
+        self._doc_freq: Counter[str] = Counter()
+        self._total_length = 0
+        self._chunk_count = 0
+
+    @property
+    def uses_embeddings(self) -> bool:
+        """Check if embedding similarity is used for ranking."""
+        return self._embeddings_enabled
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._docs
+
+    def add(self, doc_id: str, text: str) -> bool:
+        """Index a document, replacing any previous version.
+
+        Args:
+            doc_id: Identifier for the document.
+            text: Full document text.
+
+        Returns:
+            True if the document was (re-)indexed, False if unchanged.
+        """
+        content_hash = hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+        if self._doc_hashes.get(doc_id) == content_hash:
+            return False
+
+        self.remove(doc_id)
+
+        chunks = []
+        for piece in chunk_text(text, self.chunk_size):
+            tokens = tokenize(piece)
+            chunks.append(Chunk(
+                doc_id=doc_id,
+                text=piece,
+                term_counts=Counter(tokens),
+                length=len(tokens),
+            ))
+
+        for chunk in chunks:
+            self._doc_freq.update(chunk.term_counts.keys())
+            self._total_length += chunk.length
+        self._chunk_count += len(chunks)
+
+        self._docs[doc_id] = chunks
+        self._doc_hashes[doc_id] = content_hash
+
+        if chunks and self._embeddings_enabled:
+            self._pending[doc_id] = chunks
+            self._schedule_embedding()
+
+        return True
+
+    def remove(self, doc_id: str) -> None:
+        """Remove a document from the index.
+
+        Args:
+            doc_id: Identifier for the document.
+        """
+        chunks = self._docs.pop(doc_id, None)
+        self._doc_hashes.pop(doc_id, None)
+        self._embeddings.pop(doc_id, None)
+        self._pending.pop(doc_id, None)
+        if not chunks:
+            return
+
+        for chunk in chunks:
+            self._doc_freq.subtract(chunk.term_counts.keys())
+            self._total_length -= chunk.length
+        self._chunk_count -= len(chunks)
+        self._doc_freq = +self._doc_freq  # Drop zero counts
+
+    def search(
+        self, query: str, k: int = 8, doc_ids: Iterable[str] | None = None
+    ) -> list[Chunk]:
+        """Find the chunks most relevant to a query.
+
+        Args:
+            query: Search query.
+            k: Maximum number of chunks to return.
+            doc_ids: Optional documents to restrict the search to.
+
+        Returns:
+            Up to k chunks, most relevant first.
+        """
+        selected = list(self._docs) if doc_ids is None else [
+            doc_id for doc_id in doc_ids if doc_id in self._docs
+        ]
+        candidates = [chunk for doc_id in selected for chunk in self._docs[doc_id]]
+        if not candidates:
+            return []
+
+        rankings = [self._rank_bm25(query, candidates)]
+        if self._embeddings_enabled:
+            embedding_ranking = self._rank_embeddings(query, selected)
+            if embedding_ranking:
+                rankings.append(embedding_ranking)
+
+        # Reciprocal rank fusion across the rankings
+        fused: dict[int, float] = {}
+        for ranking in rankings:
+            for rank, index in enumerate(ranking):
+                fused[index] = fused.get(index, 0.0) + 1.0 / (_RRF_K + rank + 1)
+
+        best = sorted(fused, key=lambda index: fused[index], reverse=True)[:k]
+        return [candidates[index] for index in best]
+
+    def _rank_bm25(self, query: str, candidates: list[Chunk]) -> list[int]:
+        """Rank candidate chunks by BM25, dropping chunks with no matches."""
+        query_terms = set(tokenize(query))
+        if not query_terms or not self._chunk_count:
+            return []
+
+        avg_length = self._total_length / self._chunk_count or 1.0
+        idf = {
+            term: math.log(
+                1 + (self._chunk_count - self._doc_freq[term] + 0.5)
+                / (self._doc_freq[term] + 0.5)
+            )
+            for term in query_terms
+        }
+
+        scores: list[tuple[float, int]] = []
+        for index, chunk in enumerate(candidates):
+            score = 0.0
+            norm = _BM25_K1 * (1 - _BM25_B + _BM25_B * chunk.length / avg_length)
+            for term in query_terms:
+                freq = chunk.term_counts.get(term, 0)
+                if freq:
+                    score += idf[term] * freq * (_BM25_K1 + 1) / (freq + norm)
+            if score > 0:
+                scores.append((score, index))
+
+        scores.sort(reverse=True)
+        return [index for _, index in scores]
+
+    def _rank_embeddings(self, query: str, doc_ids: list[str]) -> list[int]:
+        """Rank chunks of the given documents by cosine similarity."""
+        matrices = []
+        offsets: list[int] = []
+        offset = 0
+        for doc_id in doc_ids:
+            count = len(self._docs[doc_id])
+            if doc_id in self._embeddings:
+                matrices.append(self._embeddings[doc_id])
+                offsets.extend(range(offset, offset + count))
+            offset += count
+
+        if not matrices:
+            return []
+
+        query_embedding = self._encode([query])
+        if query_embedding is None:
+            return []
+
+        # Scores are only compared with each other, so int8 vectors need no rescaling
+        similarities = np.vstack(matrices) @ query_embedding[0]
+        order = np.argsort(-similarities)
+        return [offsets[i] for i in order]
+
+    def _schedule_embedding(self) -> None:
+        """Wake the background embedding task, starting it if needed.
+
+        Without a running event loop, pending documents are embedded on the
+        next flush_embeddings() call instead.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+
+        event = self._pending_event
+        if event is None or self._embed_task is None or self._embed_task.done():
+            event = self._pending_event = asyncio.Event()
+            self._embed_task = loop.create_task(self._embed_worker(event))
+        event.set()
+
+    def _take_batch(self) -> list[tuple[str, list[Chunk]]]:
+        """Remove pending documents totalling about EMBED_BATCH_SIZE chunks."""
+        batch: list[tuple[str, list[Chunk]]] = []
+        size = 0
+        while self._pending and size < EMBED_BATCH_SIZE:
+            doc_id = next(iter(self._pending))
+            chunks = self._pending.pop(doc_id)
+            batch.append((doc_id, chunks))
+            size += len(chunks)
+        return batch
+
+    def _store_batch(self, batch: list[tuple[str, list[Chunk]]], embeddings: Any) -> None:
+        """Split a batch's embeddings back out per document."""
+        if self.quantize:
+            embeddings = quantize_embeddings(embeddings)
+
+        offset = 0
+        for doc_id, chunks in batch:
+            # Skip documents re-indexed or removed while the batch was encoding
+            if self._docs.get(doc_id) is chunks:
+                self._embeddings[doc_id] = embeddings[offset:offset + len(chunks)]
+            offset += len(chunks)
+
+    async def _embed_worker(self, pending_event: asyncio.Event) -> None:
+        """Embed pending documents in batches until none are left.
+
+        Args:
+            pending_event: Set while documents are waiting to be embedded.
+        """
+        while self._embeddings_enabled:
+            await pending_event.wait()
+
+            # Give more documents a moment to arrive so batches fill up
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + EMBED_BATCH_WINDOW
+            while sum(map(len, self._pending.values())) < EMBED_BATCH_SIZE:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                await asyncio.sleep(min(remaining, 0.02))
+
+            batch = self._take_batch()
+            if not self._pending:
+                pending_event.clear()
+            if not batch:
+                continue
+
+            texts = [chunk.text for _, chunks in batch for chunk in chunks]
+            embeddings = await asyncio.to_thread(self._encode, texts)
+            if embeddings is not None:
+                self._store_batch(batch, embeddings)
+
+    def flush_embeddings(self) -> None:
+        """Embed every pending document now, in batches, on the calling thread."""
+        while self._pending and self._embeddings_enabled:
+            batch = self._take_batch()
+            embeddings = self._encode([chunk.text for _, chunks in batch for chunk in chunks])
+            if embeddings is not None:
+                self._store_batch(batch, embeddings)
+
+    def close(self) -> None:
+        """Stop the background embedding task."""
+        if self._embed_task is not None:
+            self._embed_task.cancel()
+            self._embed_task = None
+
+    def _encode(self, texts: list[str]) -> Any:
+        """Embed texts as normalized vectors, disabling embeddings on failure."""
+        try:
+            if self._model is None:
+                self._model = SentenceTransformer(self.embedding_model)
+            return self._model.encode(
+                texts, batch_size=EMBED_BATCH_SIZE, normalize_embeddings=True
+            )
+        except Exception:
+            # Model unavailable (e.g. offline) - continue with BM25 only
+            self._embeddings_enabled = False
+            self._embeddings.clear()
+            self._pending.clear()
+            return None
@@ -7,7 +7,7 @@ This module provides lazy indexing of documentation sites by:
 """
 
 import asyncio
-import json
+import heapq
 import re
 import xml.etree.ElementTree as ET
 from dataclasses import dataclass
@@ -17,6 +17,7 @@ from typing import TypedDict
 from urllib.parse import urljoin, urlparse
 
 import httpx
+import orjson
 
 
 class IndexedUrl(TypedDict):
@@ -74,22 +75,32 @@ class SitemapIndex:
         self.parallel_fetch_limit = parallel_fetch_limit
         self._index: dict[str, DomainIndex] = {}
         self._indexing_locks: dict[str, asyncio.Lock] = {}
+        self._save_lock = asyncio.Lock()
         self._load_index()
 
     def _load_index(self) -> None:
         """Load index from disk."""
         if self.index_path.exists():
             try:
-                with open(self.index_path, encoding="utf-8") as f:
-                    self._index = json.load(f)
-            except (json.JSONDecodeError, OSError):
+                self._index = orjson.loads(self.index_path.read_bytes())
+            except (orjson.JSONDecodeError, OSError):
                 self._index = {}
 
     def _save_index(self) -> None:
         """Save index to disk."""
+        self._write_index(orjson.dumps(self._index))
+
+    async def _save_index_async(self) -> None:
+        """Save index to disk with the file write off the event loop."""
+        # Snapshot on the loop so the index can't change mid-dump; saves run
+        # one at a time so an older snapshot never lands after a newer one
+        async with self._save_lock:
+            data = orjson.dumps(self._index)
+            await asyncio.to_thread(self._write_index, data)
+
+    def _write_index(self, data: bytes) -> None:
         self.index_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(self.index_path, "w", encoding="utf-8") as f:
-            json.dump(self._index, f, indent=2, ensure_ascii=False)
+        self.index_path.write_bytes(data)
 
     def _is_stale(self, domain: str) -> bool:
         """Check if a domain's index is stale."""
@@ -401,7 +412,7 @@ class SitemapIndex:
                 urls=urls,
                 url_count=len(urls),
             )
-            self._save_index()
+            await self._save_index_async()
 
             return self._index[domain]
 
@@ -474,9 +485,8 @@ class SitemapIndex:
                     match_reasons=reasons,
                 ))
 
-        # Sort by score descending
-        matches.sort(key=lambda m: m.score, reverse=True)
-        return matches[:max_results]
+        # Best scores first; a partial sort, as domains can have thousands of URLs
+        return heapq.nlargest(max_results, matches, key=lambda m: m.score)
 
     def get_domain_stats(self, domain: str) -> dict | None:
         """Get statistics about a domain's index."""
@@ -0,0 +1,125 @@
+"""Token counting and token-budgeted packing of prompt content.
+
+Prompt size limits are expressed in tokens rather than characters so that
+prompts stay inside a known cost and latency envelope regardless of how
+dense the text is, and so that content is cut on section and paragraph
+boundaries instead of mid-identifier.
+"""
+
+from collections.abc import Iterable
+
+# Optional tiktoken integration - fall back to a character-based estimate
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+    tiktoken = None
+
+# BPE close enough to the Gemini and GPT tokenizers for budgeting purposes
+TIKTOKEN_ENCODING = "cl100k_base"
+
+# Rough average for English prose and code when no tokenizer is available
+CHARS_PER_TOKEN = 4
+
+# Don't bother including a partial section smaller than this
+MIN_PARTIAL_TOKENS = 200
+
+_encoding: "tiktoken.Encoding | None" = None
+
+
+def _get_encoding() -> "tiktoken.Encoding | None":
+    """Load the tiktoken encoding on first use."""
+    global _encoding
+    if _encoding is None and TIKTOKEN_AVAILABLE:
+        _encoding = tiktoken.get_encoding(TIKTOKEN_ENCODING)
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """Count (or estimate) the number of tokens in text.
+
+    Args:
+        text: Text to measure.
+
+    Returns:
+        Token count from tiktoken if installed, otherwise an estimate.
+    """
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text to at most max_tokens, preferring a paragraph or line break.
+
+    Args:
+        text: Text to truncate.
+        max_tokens: Token budget.
+
+    Returns:
+        The longest prefix within budget, ending on a natural boundary
+        where one exists in the second half of the prefix.
+    """
+    if max_tokens <= 0:
+        return ""
+
+    prefix: str
+    encoding = _get_encoding()
+    if encoding is not None:
+        tokens = encoding.encode(text, disallowed_special=())
+        if len(tokens) <= max_tokens:
+            return text
+        prefix = encoding.decode(tokens[:max_tokens])
+    else:
+        max_chars = max_tokens * CHARS_PER_TOKEN
+        if len(text) <= max_chars:
+            return text
+        prefix = text[:max_chars]
+
+    for boundary in ("\n\n", "\n", " "):
+        cut = prefix.rfind(boundary)
+        if cut >= len(prefix) // 2:
+            return prefix[:cut]
+    return prefix
+
+
+def pack_sections(
+    sections: Iterable[str], max_tokens: int, separator: str = "\n\n---\n\n"
+) -> tuple[str, bool]:
+    """Join sections in order until the token budget is used up.
+
+    Whole sections are kept while they fit; the first section that doesn't
+    fit is truncated on a paragraph boundary if enough budget remains, and
+    everything after it is dropped.
+
+    Args:
+        sections: Text sections in priority order.
+        max_tokens: Token budget for the joined result.
+        separator: String placed between sections.
+
+    Returns:
+        Tuple of (joined text, whether anything was cut).
+    """
+    separator_tokens = count_tokens(separator)
+    packed: list[str] = []
+    remaining = max_tokens
+
+    for section in sections:
+        if packed:
+            remaining -= separator_tokens
+
+        section_tokens = count_tokens(section)
+        if section_tokens <= remaining:
+            packed.append(section)
+            remaining -= section_tokens
+            continue
+
+        if remaining >= MIN_PARTIAL_TOKENS or not packed:
+            partial = truncate_to_tokens(section, remaining)
+            if partial:
+                packed.append(partial)
+        return separator.join(packed), True
+
+    return separator.join(packed), False
@@ -124,6 +124,7 @@ def trace_llm_call(
     response: str,
     tokens_in: int | None = None,
     tokens_out: int | None = None,
+    tokens_cached: int | None = None,
 ) -> None:
     """Record an LLM call in the trace.
 
@@ -133,6 +134,7 @@ def trace_llm_call(
         response: Model response.
         tokens_in: Input token count (optional).
         tokens_out: Output token count (optional).
+        tokens_cached: Input tokens served from the prompt cache (optional).
     """
     tracer = get_tracer()
 
@@ -145,6 +147,8 @@ def trace_llm_call(
             span.set_attribute("llm.tokens_in", tokens_in)
         if tokens_out is not None:
             span.set_attribute("llm.tokens_out", tokens_out)
+        if tokens_cached is not None:
+            span.set_attribute("llm.tokens_cached", tokens_cached)
 
 
 def trace_doc_retrieval(
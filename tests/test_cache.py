@@ -0,0 +1,230 @@
+"""Tests for page and answer caches."""
+
+import json
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+from doc2mcp.cache import AnswerCache, PageCache
+
+
+class TestPageCache:
+    """Tests for the documentation page cache."""
+
+    @pytest.fixture
+    def cache(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = PageCache(Path(tmpdir) / "doc_cache.db")
+            yield cache
+            cache.close()
+
+    def _put(self, cache, url, title, summary="", domain="docs.example.com"):
+        cache.put(url=url, title=title, summary=summary, content=f"{title} content",
+                  links=[{"url": "https://docs.example.com/", "text": "Home"}], domain=domain)
+
+    def test_put_and_get(self, cache):
+        """Test storing and retrieving a page."""
+        cache.put(
+            url="https://docs.example.com/intro",
+            title="Intro",
+            summary="Getting started",
+            content="Welcome to the docs.",
+            links=[],
+            domain="docs.example.com",
+        )
+        page = cache.get("https://docs.example.com/intro")
+        assert page is not None
+        assert page["title"] == "Intro"
+        assert cache.get("https://docs.example.com/missing") is None
+
+    def test_subscribers_notified_on_put(self, cache):
+        """Test that listeners receive the URL of each written page."""
+        written = []
+        cache.subscribe(written.append)
+        cache.put(
+            url="https://docs.example.com/intro",
+            title="Intro",
+            summary="",
+            content="Welcome.",
+            links=[],
+            domain="docs.example.com",
+        )
+        assert written == ["https://docs.example.com/intro"]
+
+    def test_pages_persist_across_instances(self, cache):
+        """Test that a second cache on the same database sees written pages."""
+        self._put(cache, "https://docs.example.com/intro", "Intro")
+        other = PageCache(cache.cache_path)
+        page = other.get("https://docs.example.com/intro")
+        other.close()
+        assert page is not None
+        assert page["links"] == [{"url": "https://docs.example.com/", "text": "Home"}]
+
+    def test_find_similar_ranks_and_limits(self, cache):
+        """Test that title matches outrank summary matches and limit applies."""
+        self._put(cache, "https://docs.example.com/a", "Other", summary="install guide")
+        self._put(cache, "https://docs.example.com/b", "Install guide")
+        self._put(cache, "https://docs.example.com/c", "Unrelated")
+        self._put(cache, "https://other.example.com/d", "Install", domain="other.example.com")
+
+        pages = cache.find_similar("install guide", domain="docs.example.com")
+        assert [page["url"] for page in pages] == [
+            "https://docs.example.com/b",
+            "https://docs.example.com/a",
+        ]
+        assert len(cache.find_similar("install guide", limit=1)) == 1
+
+    def test_find_similar_scored_reports_query_coverage(self, cache):
+        """Test that coverage is the fraction of query words a page matches."""
+        self._put(cache, "https://docs.example.com/a", "Install guide", summary="setup")
+        [(coverage, page)] = cache.find_similar_scored("install setup windows guide")
+        assert page["url"] == "https://docs.example.com/a"
+        assert coverage == 0.75
+
+    def test_find_similar_matches_content_and_follows_updates(self, cache):
+        """Test that content is searchable and rewritten pages are reindexed."""
+        cache.put(url="https://docs.example.com/a", title="A", summary="",
+                  content="Configure retries with backoff.", links=[],
+                  domain="docs.example.com")
+        [(coverage, page)] = cache.find_similar_scored("backoff")
+        assert page["url"] == "https://docs.example.com/a"
+        assert coverage == 0.0
+
+        self._put(cache, "https://docs.example.com/a", "Webhooks")
+        assert cache.find_similar("backoff") == []
+        assert [p["url"] for p in cache.find_similar("webhooks")] == ["https://docs.example.com/a"]
+
+    def test_clear_domain(self, cache):
+        """Test that clearing a domain leaves other domains intact."""
+        self._put(cache, "https://docs.example.com/a", "A")
+        self._put(cache, "https://other.example.com/b", "B", domain="other.example.com")
+        assert cache.clear("docs.example.com") == 1
+        assert cache.get("https://docs.example.com/a") is None
+        assert cache.get("https://other.example.com/b") is not None
+
+    def test_ttl_respects_domain_overrides(self):
+        """Test that per-domain TTLs override the default TTL."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = PageCache(
+                Path(tmpdir) / "doc_cache.db", ttl=1, domain_ttl={"docs.example.com": 0}
+            )
+            assert cache._is_expired("other.example.com", "2024-01-01T00:00:00+00:00")
+            assert not cache._is_expired("docs.example.com", "2024-01-01T00:00:00+00:00")
+            cache.close()
+
+    def test_pages_expire_after_max_reads(self):
+        """Test that a page is refetched after max_reads lookups."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = PageCache(Path(tmpdir) / "doc_cache.db", max_reads=2)
+            self._put(cache, "https://docs.example.com/a", "A")
+            assert cache.get("https://docs.example.com/a", count_access=False) is not None
+            assert cache.find_similar_scored("A") and cache.find_similar_scored("A")
+            assert cache.get("https://docs.example.com/a") is not None
+            assert cache.get("https://docs.example.com/a") is not None
+            assert cache.get("https://docs.example.com/a") is None
+            cache.close()
+
+    def test_oldest_pages_evicted_over_max_pages(self):
+        """Test that the cache keeps at most max_pages, dropping the oldest."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = PageCache(Path(tmpdir) / "doc_cache.db", max_pages=2)
+            for name in ("a", "b", "c"):
+                self._put(cache, f"https://docs.example.com/{name}", name.upper())
+            assert cache.get("https://docs.example.com/a") is None
+            assert cache.get("https://docs.example.com/c") is not None
+            assert (cache.hits, cache.misses) == (1, 1)
+            cache.close()
+
+    def test_imports_legacy_json_cache(self):
+        """Test that pages from an old JSON cache file are imported."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            legacy = {"k": {
+                "url": "https://docs.example.com/old", "title": "Old", "summary": "",
+                "content": "Old content", "links": [],
+                "fetched_at": datetime.now(timezone.utc).isoformat(),
+                "domain": "docs.example.com",
+            }}
+            (Path(tmpdir) / "doc_cache.json").write_text(json.dumps(legacy))
+            cache = PageCache(Path(tmpdir) / "doc_cache.db")
+            page = cache.get("https://docs.example.com/old")
+            cache.close()
+            assert page is not None
+            assert page["content"] == "Old content"
+
+    def test_negative_entries_expire_and_clear_on_put(self, cache):
+        """Test that failed URLs are skipped until expiry or a successful put."""
+        url = "https://docs.example.com/broken"
+        assert not cache.is_negative(url)
+
+        cache.put_negative(url, "404 Not Found")
+        assert cache.is_negative(url)
+
+        self._put(cache, url, "Fixed")
+        assert not cache.is_negative(url)
+
+        cache.put_negative(url, "timeout", ttl=-1)
+        assert not cache.is_negative(url)
+
+
+class TestAnswerCache:
+    """Tests for the synthesized answer cache."""
+
+    def test_put_and_get(self):
+        """Test storing and retrieving an answer."""
+        cache = AnswerCache(ttl=60)
+        key = cache.make_key("query", "tool", "hash")
+        cache.put(key, "answer", urls=["https://docs.example.com/a"])
+        assert cache.get(key) == "answer"
+
+    def test_make_key_depends_on_all_parts(self):
+        """Test that different inputs produce different keys."""
+        assert AnswerCache.make_key("q", "tool", "a") != AnswerCache.make_key("q", "tool", "b")
+
+    def test_expired_entries_are_misses(self):
+        """Test that entries past their TTL are not returned."""
+        cache = AnswerCache(ttl=0)
+        key = cache.make_key("query")
+        cache.put(key, "answer")
+        assert cache.get(key) is None
+
+    def test_least_recently_used_evicted_over_max_entries(self):
+        """Test that reading an answer protects it from eviction."""
+        cache = AnswerCache(ttl=60, max_entries=2)
+        cache.put("a", "answer a", urls=["https://docs.example.com/a"])
+        cache.put("b", "answer b")
+        cache.get("a")
+        cache.put("c", "answer c")
+        assert cache.get("b") is None
+        assert cache.get("a") == "answer a"
+        assert cache.get("c") == "answer c"
+
+    def test_invalidate_url_drops_dependent_answers(self):
+        """Test that invalidating a page drops only answers built from it."""
+        cache = AnswerCache(ttl=60)
+        cache.put("a", "answer a", urls=["https://docs.example.com/a"])
+        cache.put("b", "answer b", urls=["https://docs.example.com/b"])
+
+        assert cache.invalidate_url("https://docs.example.com/a") == 1
+        assert cache.get("a") is None
+        assert cache.get("b") == "answer b"
+
+    def test_invalidate_url_matches_url_variants(self, tmp_path):
+        """Test that a page written under a URL variant drops answers built from it."""
+        pages = PageCache(str(tmp_path / "pages.db"))
+        answers = AnswerCache(ttl=60)
+        pages.subscribe(answers.invalidate_url)
+        answers.put("a", "answer a", urls=["https://Docs.example.com/a?utm_source=x#intro"])
+
+        pages.put(
+            url="https://docs.example.com/a",
+            title="A",
+            summary="",
+            content="Body",
+            links=[],
+            domain="docs.example.com",
+        )
+
+        assert answers.get("a") is None
+        pages.close()
@@ -0,0 +1,197 @@
+"""Tests for content compression."""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+from doc2mcp import compression
+from doc2mcp.compression import ContentCompressor, fast_compress, strip_boilerplate
+
+
+class TestFastCompress:
+    """Tests for the local markup-stripping pass."""
+
+    def test_links_reduced_to_text(self):
+        """Test that markdown links keep their text but drop the target."""
+        text = "See [the guide](https://example.com/guide) for details."
+        assert fast_compress(text) == "See the guide for details."
+
+    def test_images_removed(self):
+        """Test that markdown images are removed entirely."""
+        text = "Intro ![diagram](https://example.com/a.png) text"
+        assert fast_compress(text) == "Intro  text"
+
+    def test_whitespace_cleanup_keeps_indentation(self):
+        """Test that blank lines and trailing spaces go but indentation stays."""
+        text = "def f():   \n    return 1\n\n\n\nEnd"
+        assert fast_compress(text) == "def f():\n    return 1\n\nEnd"
+
+
+class TestStripBoilerplate:
+    """Tests for the site chrome and filler removal pass."""
+
+    def test_chrome_lines_removed_but_prose_kept(self):
+        """Test that only lines made up entirely of a chrome label are dropped."""
+        text = "Skip to content\nMenu\n# Auth\nSign in with an API key.\nCopy\nEdit this page"
+        assert strip_boilerplate(text) == "\n\n# Auth\nSign in with an API key.\n\n"
+
+    def test_filler_phrases_removed(self):
+        """Test that filler phrases are removed wherever they appear."""
+        text = "Please note that keys expire. You can simply rotate them."
+        assert strip_boilerplate(text) == "keys expire. You can rotate them."
+
+
+class TestContentCompressor:
+    """Tests for the tokenc-backed compressor without an API key."""
+
+    def test_unavailable_returns_original(self, monkeypatch):
+        """Test that content passes through when compression is unavailable."""
+        monkeypatch.delenv("TOKENC_API_KEY", raising=False)
+        compressor = ContentCompressor(min_content_length=0)
+        result = compressor.compress("some content")
+        assert result.compressed_text == "some content"
+        assert not result.was_compressed
+
+    def test_repeated_content_served_from_cache(self, monkeypatch):
+        """Test that compressing the same text twice calls the API once."""
+        calls = []
+
+        def compress_input(input, compression_settings):
+            calls.append(input)
+            return SimpleNamespace(
+                output=input[:5], original_input_tokens=10, output_tokens=2,
+                tokens_saved=8, compression_ratio=5.0,
+            )
+
+        monkeypatch.setattr(compression, "CompressionSettings", dict)
+        compressor = ContentCompressor(min_content_length=0)
+        compressor._client = SimpleNamespace(compress_input=compress_input)
+
+        first = compressor.compress("some content")
+        second = compressor.compress("some content")
+        compressor.compress("some content", aggressiveness=0.9)
+
+        assert first.was_compressed and second is first
+        assert len(calls) == 2
+
+    def test_get_compressor_shared_per_settings(self):
+        """Test that agents with the same settings share one compressor."""
+        assert compression.get_compressor(0.5, 1000, True) is compression.get_compressor(
+            0.5, 1000, True
+        )
+        assert compression.get_compressor(0.5, 1000, True) is not compression.get_compressor(
+            0.7, 1000, True
+        )
+
+    async def test_compress_many_keeps_order(self, monkeypatch):
+        """Test that batched compression returns one result per input, in order."""
+        def compress_input(input, compression_settings):
+            return SimpleNamespace(
+                output=input.upper(), original_input_tokens=10, output_tokens=2,
+                tokens_saved=8, compression_ratio=5.0,
+            )
+
+        monkeypatch.setattr(compression, "CompressionSettings", dict)
+        compressor = ContentCompressor(min_content_length=3)
+        compressor._client = SimpleNamespace(compress_input=compress_input)
+
+        results = await compressor.compress_many(["first", "x", "third"], concurrency=2)
+
+        assert [result.compressed_text for result in results] == ["FIRST", "x", "THIRD"]
+        assert [result.was_compressed for result in results] == [True, False, True]
+
+    async def test_compress_many_coalesces_duplicates(self, monkeypatch):
+        """Test that concurrent compressions of the same text share one request."""
+        calls = []
+
+        def compress_input(input, compression_settings):
+            calls.append(input)
+            time.sleep(0.05)
+            return SimpleNamespace(
+                output=input.upper(), original_input_tokens=10, output_tokens=2,
+                tokens_saved=8, compression_ratio=5.0,
+            )
+
+        monkeypatch.setattr(compression, "CompressionSettings", dict)
+        compressor = ContentCompressor(min_content_length=3)
+        compressor._client = SimpleNamespace(compress_input=compress_input)
+
+        first, second = await asyncio.gather(
+            compressor.compress_many(["shared", "other"]),
+            compressor.compress_many(["shared"]),
+        )
+
+        assert sorted(calls) == ["other", "shared"]
+        assert first[0].compressed_text == second[0].compressed_text == "SHARED"
+        assert not compressor._inflight
+
+    def test_compression_settings_reused(self, monkeypatch):
+        """Test that settings are built once per aggressiveness and token limit."""
+        built = []
+
+        def settings(**kwargs):
+            built.append(kwargs)
+            return kwargs
+
+        def compress_input(input, compression_settings):
+            return SimpleNamespace(
+                output=input[:3], original_input_tokens=10, output_tokens=2,
+                tokens_saved=8, compression_ratio=5.0,
+            )
+
+        monkeypatch.setattr(compression, "CompressionSettings", settings)
+        compressor = ContentCompressor(min_content_length=3)
+        compressor._client = SimpleNamespace(compress_input=compress_input)
+
+        compressor.compress("first text")
+        compressor.compress("second text")
+        compressor.compress("third text", max_output_tokens=100)
+
+        assert built == [{"aggressiveness": 0.5}, {"aggressiveness": 0.5, "max_output_tokens": 100}]
+
+    def test_persisted_results_survive_restart(self, monkeypatch, tmp_path):
+        """Test that a new compressor reuses results persisted by an earlier one."""
+        calls = []
+
+        def compress_input(input, compression_settings):
+            calls.append(input)
+            return SimpleNamespace(
+                output=input[:5], original_input_tokens=10, output_tokens=2,
+                tokens_saved=8, compression_ratio=5.0,
+            )
+
+        monkeypatch.setattr(compression, "CompressionSettings", dict)
+        cache_path = tmp_path / "compression.db"
+        for _ in range(2):
+            compressor = ContentCompressor(min_content_length=0, cache_path=cache_path)
+            compressor._client = SimpleNamespace(compress_input=compress_input)
+            result = compressor.compress("some content")
+            compressor.close()
+
+        assert result.was_compressed and result.compressed_text == "some "
+        assert result.original_text is None
+        assert len(calls) == 1
+
+    def test_low_value_compression_skipped(self, monkeypatch):
+        """Test that short texts and poorly compressing settings skip the API."""
+        calls = []
+
+        def compress_input(input, compression_settings):
+            calls.append(input)
+            return SimpleNamespace(
+                output=input, original_input_tokens=10, output_tokens=10,
+                tokens_saved=0, compression_ratio=1.0,
+            )
+
+        monkeypatch.setattr(compression, "CompressionSettings", dict)
+        compressor = ContentCompressor(min_content_length=0, min_content_tokens=3)
+        compressor._client = SimpleNamespace(compress_input=compress_input)
+
+        assert not compressor.compress("short").was_compressed
+        assert calls == []
+
+        compressor.compress("first text worth sending")
+        result = compressor.compress("second text worth sending")
+
+        assert not result.was_compressed
+        assert len(calls) == 1
@@ -3,9 +3,20 @@
 import tempfile
 from pathlib import Path
 
+import httpx
 import pytest
 
-from doc2mcp.config import Config, LocalSource, Settings, ToolConfig, WebSource, load_config
+from doc2mcp import config as config_module
+from doc2mcp.config import (
+    Config,
+    LocalSource,
+    Settings,
+    ToolConfig,
+    WebSource,
+    load_config,
+    load_config_from_api,
+    load_config_with_fallback,
+)
 
 
 def test_empty_config():
@@ -73,3 +84,43 @@ def test_settings_defaults():
     assert settings.max_content_length == 50000
     assert settings.cache_ttl == 3600
     assert settings.request_timeout == 30
+
+
+async def test_api_config_revalidated_with_etag(monkeypatch):
+    """Test that an unchanged API export is answered by a 304 and reused."""
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304, headers={"ETag": '"v1"'})
+        body = {"tools": {"t": {"name": "T", "description": "d", "sources": []}}}
+        return httpx.Response(200, json=body, headers={"ETag": '"v1"'})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(config_module, "_get_api_client", lambda: client)
+    monkeypatch.setattr(config_module, "_api_exports", {})
+
+    first = await load_config_from_api("http://api.test")
+    second = await load_config_from_api("http://api.test")
+
+    assert "if-none-match" not in requests[0].headers
+    assert requests[1].headers["if-none-match"] == '"v1"'
+    assert second.tools["t"].name == "T"
+    assert second is not first
+    await client.aclose()
+
+
+async def test_fallback_uses_yaml_when_api_fails(monkeypatch, tmp_path):
+    """Test that a failed API load returns the YAML config parsed alongside it."""
+    async def fail(api_url=None):
+        raise httpx.ConnectError("unreachable")
+
+    config_path = tmp_path / "tools.yaml"
+    config_path.write_text("tools:\n  t:\n    name: T\n    description: d\n    sources: []\n")
+    monkeypatch.setenv("DOC2MCP_USE_API", "true")
+    monkeypatch.setattr(config_module, "load_config_from_api", fail)
+
+    config = await load_config_with_fallback(config_path=config_path)
+
+    assert config.tools["t"].name == "T"
@@ -0,0 +1,118 @@
+"""Tests for the deep search agent."""
+
+import asyncio
+
+import pytest
+
+from doc2mcp.agents.doc_search import DocSearchAgent
+from doc2mcp.config import Config, ToolConfig, WebSource
+
+
+class TestDocSearchAgent:
+    """Tests for the deep search agent."""
+
+    @pytest.fixture
+    def agent(self, tmp_path):
+        agent = DocSearchAgent(
+            Config(),
+            cache_path=str(tmp_path / "pages.db"),
+            sitemap_index_path=str(tmp_path / "sitemap_index.json"),
+            llm_provider=object(),
+        )
+        yield agent
+        agent.cache.close()
+
+    @pytest.mark.parametrize("batch_size", [1, 4])
+    async def test_failing_exploration_does_not_hang(self, agent, monkeypatch, batch_size):
+        """Test that a search finishes when every page or batch exploration raises."""
+        agent.config.settings.navigation_batch_size = batch_size
+        calls = []
+
+        async def sitemap_candidates(query, tool_config):
+            return [(f"https://docs.example.com/page{i}", 5.0) for i in range(40)]
+
+        async def explore_pages(query, urls, domains, skip_urls=()):
+            calls.append(urls)
+            raise RuntimeError("database is locked")
+
+        monkeypatch.setattr(agent, "_get_sitemap_candidates", sitemap_candidates)
+        monkeypatch.setattr(agent, "_explore_pages", explore_pages)
+        tool = ToolConfig(
+            name="Docs", description="d", sources=[WebSource(url="https://docs.example.com/")]
+        )
+
+        result = await asyncio.wait_for(agent._deep_search("how to install", tool), timeout=3)
+
+        assert result["content"] == "No relevant documentation found."
+        assert result["pages_explored"] == agent.max_pages
+        assert calls
+
+    async def test_dead_workers_end_the_search(self, agent, monkeypatch):
+        """Test that a search finishes when every exploration worker has died."""
+        async def sitemap_candidates(query, tool_config):
+            return [(f"https://docs.example.com/page{i}", 5.0) for i in range(40)]
+
+        async def explore_pages(query, urls, domains, skip_urls=()):
+            # A malformed link makes the worker itself raise
+            return [{"links_to_explore": ["not a link"]} for _ in urls]
+
+        monkeypatch.setattr(agent, "_get_sitemap_candidates", sitemap_candidates)
+        monkeypatch.setattr(agent, "_explore_pages", explore_pages)
+        tool = ToolConfig(
+            name="Docs", description="d", sources=[WebSource(url="https://docs.example.com/")]
+        )
+
+        result = await asyncio.wait_for(agent._deep_search("how to install", tool), timeout=3)
+
+        assert result["content"] == "No relevant documentation found."
+
+    async def test_identical_searches_join(self, agent, monkeypatch):
+        """Test that concurrent identical searches share one run and its failure."""
+        calls = []
+        outcome: dict = {"content": "answer"}
+
+        async def search(tool_name, query, on_chunk):
+            calls.append(query)
+            await asyncio.sleep(0.05)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        monkeypatch.setattr(agent, "_search", search)
+
+        first, second = await asyncio.gather(
+            agent.search("docs", "install"), agent.search("docs", "install")
+        )
+        assert first == second == {"content": "answer"}
+        assert calls == ["install"]
+
+        outcome = RuntimeError("provider down")
+        results = await asyncio.gather(
+            agent.search("docs", "install"),
+            agent.search("docs", "install"),
+            return_exceptions=True,
+        )
+        assert [str(r) for r in results] == ["provider down", "provider down"]
+        assert len(calls) == 2
+        assert not agent._inflight
+
+    async def test_cancelled_leader_does_not_cancel_joiners(self, agent, monkeypatch):
+        """Test that a joined caller reruns the search when the leader is cancelled."""
+        calls = []
+
+        async def search(tool_name, query, on_chunk):
+            calls.append(query)
+            await asyncio.sleep(0.05)
+            return {"content": "answer"}
+
+        monkeypatch.setattr(agent, "_search", search)
+
+        leader = asyncio.create_task(agent.search("docs", "install"))
+        await asyncio.sleep(0)
+        joiner = asyncio.create_task(agent.search("docs", "install"))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+
+        assert await joiner == {"content": "answer"}
+        assert leader.cancelled()
+        assert calls == ["install", "install"]
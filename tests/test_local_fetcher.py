@@ -58,9 +58,34 @@ class TestLocalFetcher:
         assert "Guide content" in content
         assert "not" not in content  # JSON not matched
 
+    @pytest.mark.asyncio
+    async def test_fetch_recursive_pattern(self, fetcher, temp_docs):
+        """Test that recursive patterns match files at every depth."""
+        source = LocalSource(path=str(temp_docs), patterns=["**/*.md"])
+        content = await fetcher.fetch(source)
+        assert "Test Readme" in content
+        assert "Nested content" in content
+        assert "Guide content" not in content
+
+    @pytest.mark.asyncio
+    async def test_non_utf8_file_decoded_as_latin1(self, fetcher, temp_docs):
+        """Test that files that aren't valid UTF-8 are still read."""
+        (temp_docs / "legacy.txt").write_bytes("Caf\xe9 menu".encode("latin-1"))
+        source = LocalSource(path=str(temp_docs / "legacy.txt"))
+        assert await fetcher.fetch(source) == "Caf\xe9 menu"
+
     @pytest.mark.asyncio
     async def test_nonexistent_path(self, fetcher):
         """Test fetching from nonexistent path raises error."""
         source = LocalSource(path="/nonexistent/path")
         with pytest.raises(FileNotFoundError):
             await fetcher.fetch(source)
+
+    @pytest.mark.asyncio
+    async def test_changed_file_is_reread(self, fetcher, temp_docs):
+        """Test that cached reads pick up edits to a file."""
+        source = LocalSource(path=str(temp_docs / "readme.md"))
+        assert "Some content" in await fetcher.fetch(source)
+
+        (temp_docs / "readme.md").write_text("# Test Readme\n\nRewritten content, longer now.")
+        assert "Rewritten content" in await fetcher.fetch(source)
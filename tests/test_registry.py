@@ -0,0 +1,122 @@
+"""Tests for the generated tool registry."""
+
+import asyncio
+
+import httpx
+import pytest
+
+from doc2mcp.fetchers.web import FetchResult
+from doc2mcp.indexer import registry as registry_module
+from doc2mcp.indexer.registry import ContentCache, ToolRegistry
+from doc2mcp.indexer.tool_generator import GeneratedTool
+
+
+class TestToolRegistry:
+    """Tests for the tool registry."""
+
+    @pytest.fixture
+    def registry(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(registry_module, "HOST_REQUESTS_PER_SECOND", 1000.0)
+        registry = ToolRegistry(cache_dir=str(tmp_path))
+        for tool_id, url in [
+            ("a_one", "https://a.example.com/one"),
+            ("a_two", "https://a.example.com/two"),
+            ("b_one", "https://b.example.com/one"),
+        ]:
+            registry._tools[tool_id] = GeneratedTool(
+                tool_id=tool_id, name=tool_id, description="", url=url
+            )
+        return registry
+
+    def test_registry_persisted_without_content(self, registry, tmp_path):
+        """Test that saved tools reload in a new registry, without their content."""
+        registry._tools["a_one"].content = "cached elsewhere"
+        registry._tools["a_one"].parent_source = "a"
+        registry._save_registry()
+
+        reloaded = ToolRegistry(cache_dir=str(tmp_path))
+
+        assert set(reloaded._tools) == {"a_one", "a_two", "b_one"}
+        assert reloaded.get_tool("a_one").content is None
+        assert reloaded.get_source_tools("a") == [reloaded.get_tool("a_one")]
+        assert registry.get_tool("a_one").content == "cached elsewhere"
+        assert not (tmp_path / "registry.json.tmp").exists()
+
+    async def test_prefetch_limits_each_host(self, registry, monkeypatch):
+        """Test that prefetching caches every tool without exceeding the per-host limit."""
+        active: dict[str, int] = {}
+        peak: dict[str, int] = {}
+
+        async def fetch_with_links(url, base_domain=None):
+            host = url.split("/")[2]
+            active[host] = active.get(host, 0) + 1
+            peak[host] = max(peak.get(host, 0), active[host])
+            await asyncio.sleep(0.01)
+            active[host] -= 1
+            return FetchResult(url=url, content=f"content of {url}", title="")
+
+        monkeypatch.setattr(registry._fetcher, "fetch_with_links", fetch_with_links)
+
+        await registry.prefetch(["a_one", "a_two", "b_one", "missing"], per_host=1)
+
+        assert peak == {"a.example.com": 1, "b.example.com": 1}
+        assert registry._content_cache.get("https://a.example.com/two").content == (
+            "content of https://a.example.com/two"
+        )
+
+    async def test_transient_errors_are_retried(self, registry, monkeypatch):
+        """Test that a 503 is retried after Retry-After and a 404 is not."""
+        calls = []
+
+        async def fetch_with_links(url, base_domain=None):
+            calls.append(url)
+            status = 404 if "b.example" in url else 503 if len(calls) == 1 else 200
+            response = httpx.Response(
+                status, headers={"Retry-After": "0"}, request=httpx.Request("GET", url)
+            )
+            response.raise_for_status()
+            return FetchResult(url=url, content="fetched", title="")
+
+        monkeypatch.setattr(registry._fetcher, "fetch_with_links", fetch_with_links)
+
+        assert await registry.get_tool_content("a_one") == "fetched"
+        assert len(calls) == 2
+        assert await registry.get_tool_content("b_one") is None
+        assert len(calls) == 3
+
+    async def test_page_cached_with_links(self, registry, monkeypatch):
+        """Test that a fetched page is cached with its title and links, even when empty."""
+        calls = []
+
+        async def fetch_with_links(url, base_domain=None):
+            calls.append(url)
+            content = "" if "b.example" in url else "Body"
+            links = [{"url": "https://a.example.com/two", "text": "Two"}]
+            return FetchResult(url=url, content=content, title="One", links=links)
+
+        monkeypatch.setattr(registry._fetcher, "fetch_with_links", fetch_with_links)
+
+        assert await registry.get_tool_content("a_one") == "Body"
+        page = await registry.get_tool_page("a_one")
+        assert page.title == "One"
+        assert page.links == [{"url": "https://a.example.com/two", "text": "Two"}]
+        assert await registry.get_tool_content("b_one") is None
+        assert await registry.get_tool_content("b_one") is None
+        assert calls == ["https://a.example.com/one", "https://b.example.com/one"]
+
+
+class TestContentCache:
+    """Tests for the compressed page cache."""
+
+    def test_pages_read_back_from_disk(self, tmp_path):
+        """Test that pages survive a new cache instance and memory stays bounded."""
+        cache = ContentCache(tmp_path, memory_size=1)
+        for name in ("one", "two"):
+            url = f"https://example.com/{name}"
+            cache.set(url, FetchResult(url=url, content=name * 100, title=name))
+
+        assert list(cache._memory) == ["https://example.com/two"]
+        page = ContentCache(tmp_path).get("https://example.com/one")
+        assert page.content == "one" * 100
+        assert page.title == "one"
+        assert all(path.stat().st_size < 100 for path in tmp_path.iterdir())
@@ -0,0 +1,143 @@
+"""Tests for chunk-level retrieval."""
+
+from doc2mcp.retrieval import (
+    ChunkIndex,
+    chunk_text,
+    dedupe_paragraphs,
+    query_terms,
+    simhash,
+    term_coverage,
+)
+
+
+def test_chunk_text_short_text_is_single_chunk():
+    """Test that text under the chunk size is not split."""
+    assert chunk_text("Short text.", chunk_size=100) == ["Short text."]
+
+
+def test_chunk_text_respects_chunk_size():
+    """Test that chunks never exceed the chunk size."""
+    text = "\n\n".join(f"Paragraph {i} " + "word " * 40 for i in range(20))
+    chunks = chunk_text(text, chunk_size=300)
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 300 for chunk in chunks)
+    assert "Paragraph 0" in chunks[0]
+
+
+def test_chunk_text_splits_long_words():
+    """Test that text without separators is still split."""
+    chunks = chunk_text("x" * 1000, chunk_size=300)
+    assert all(len(chunk) <= 300 for chunk in chunks)
+    assert "".join(chunks) == "x" * 1000
+
+
+def test_chunk_text_empty():
+    """Test that blank text produces no chunks."""
+    assert chunk_text("   ") == []
+
+
+class TestChunkIndex:
+    """Tests for the hybrid chunk index (BM25 only, no embedding model)."""
+
+    def make_index(self):
+        return ChunkIndex(chunk_size=200, embedding_model=None)
+
+    def test_search_ranks_matching_chunks_first(self):
+        """Test that chunks sharing query terms rank highest."""
+        index = self.make_index()
+        index.add("doc", "\n\n".join([
+            "Installation guide: run pip install to set up the package.",
+            "Authentication uses API keys passed in the header.",
+            "Rate limits apply to every endpoint.",
+        ]))
+        results = index.search("how do I authenticate with API keys", k=1)
+        assert len(results) == 1
+        assert "Authentication" in results[0].text
+
+    def test_search_restricted_to_doc_ids(self):
+        """Test restricting a search to specific documents."""
+        index = self.make_index()
+        index.add("a", "Streaming responses are sent as server events.")
+        index.add("b", "Streaming uploads are chunked.")
+        results = index.search("streaming", doc_ids=["b"])
+        assert [chunk.doc_id for chunk in results] == ["b"]
+
+    def test_add_skips_unchanged_documents(self):
+        """Test that re-adding identical content is a no-op."""
+        index = self.make_index()
+        assert index.add("doc", "Some content.") is True
+        assert index.add("doc", "Some content.") is False
+        assert index.add("doc", "Changed content.") is True
+
+    def test_remove(self):
+        """Test removing a document from the index."""
+        index = self.make_index()
+        index.add("doc", "Webhooks notify your server of events.")
+        index.remove("doc")
+        assert "doc" not in index
+        assert index.search("webhooks") == []
+
+    def test_flush_embeds_pending_documents_in_batches(self):
+        """Test that pending documents are embedded together, not per add()."""
+        calls = []
+
+        class FakeModel:
+            def encode(self, texts, batch_size, normalize_embeddings):
+                calls.append(len(texts))
+                return [[1.0]] * len(texts)
+
+        index = ChunkIndex(chunk_size=50, embedding_model="fake", quantize=False)
+        index._embeddings_enabled = True
+        index._model = FakeModel()
+        for i in range(3):
+            index.add(f"doc{i}", "Short document.")
+
+        assert calls == []
+        index.flush_embeddings()
+        assert calls == [3]
+        assert len(index._embeddings) == 3
+
+
+def test_query_terms_drops_short_words():
+    """Test that query terms skip words under three characters."""
+    assert query_terms("How to use an API key") == {"how", "use", "api", "key"}
+
+
+def test_term_coverage():
+    """Test that coverage is the fraction of terms present in the text."""
+    terms = query_terms("configure retry backoff")
+    assert term_coverage(terms, "Retry with exponential backoff.") == 2 / 3
+    assert term_coverage(terms, "Unrelated page") == 0.0
+    assert term_coverage(set(), "anything") == 1.0
+
+
+def test_simhash_near_duplicates_are_close():
+    """Test that texts differing by one word have nearby fingerprints."""
+    base = "the quick brown fox jumps over the lazy dog near the river bank today".split()
+    changed = base[:-1] + ["tomorrow"]
+    unrelated = "configure retries with exponential backoff for every http client".split()
+    assert (simhash(base) ^ simhash(changed)).bit_count() < (
+        simhash(base) ^ simhash(unrelated)
+    ).bit_count()
+    assert simhash(base) == simhash(list(base))
+
+
+def test_dedupe_paragraphs_drops_repeats_across_texts():
+    """Test that repeated boilerplate is kept only where it first appears."""
+    nav = "Home Guides API Reference Tutorials Changelog Community Blog Search"
+    texts = [
+        f"{nav}\n\nInstall the package with pip before importing it.",
+        f"{nav}\n\nConfigure the client with your API key and region.",
+    ]
+    deduped, dropped = dedupe_paragraphs(texts)
+    assert dropped == 1
+    assert deduped[0].startswith(nav)
+    assert deduped[1] == "Configure the client with your API key and region."
+
+
+def test_dedupe_paragraphs_keeps_short_paragraphs():
+    """Test that short paragraphs such as code fences are never dropped."""
+    texts = ["```\n\nprint(1)\n\n```", "```\n\nprint(1)\n\n```"]
+    deduped, dropped = dedupe_paragraphs(texts)
+    assert dropped == 0
+    assert deduped == texts
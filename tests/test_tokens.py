@@ -0,0 +1,37 @@
+"""Tests for token counting and budgeted packing."""
+
+from doc2mcp.tokens import count_tokens, pack_sections, truncate_to_tokens
+
+
+class TestTruncateToTokens:
+    """Tests for token-budgeted truncation."""
+
+    def test_short_text_unchanged(self):
+        """Test that text within budget is returned as-is."""
+        assert truncate_to_tokens("hello world", 100) == "hello world"
+
+    def test_cuts_on_paragraph_boundary(self):
+        """Test that truncation prefers a paragraph break."""
+        first = ("word " * 300).strip()
+        text = first + "\n\n" + ("more " * 400).strip()
+        result = truncate_to_tokens(text, count_tokens(first) + 50)
+        assert result == first
+
+
+class TestPackSections:
+    """Tests for packing sections into a token budget."""
+
+    def test_all_sections_fit(self):
+        """Test that sections within budget are joined untouched."""
+        packed, truncated = pack_sections(["a", "b"], 1000, separator="|")
+        assert packed == "a|b"
+        assert not truncated
+
+    def test_drops_sections_past_budget(self):
+        """Test that later sections are dropped once the budget runs out."""
+        first = "alpha " * 50
+        second = "beta " * 5000
+        packed, truncated = pack_sections([first, second, "gamma"], count_tokens(first) + 10)
+        assert truncated
+        assert packed == first
+        assert "gamma" not in packed
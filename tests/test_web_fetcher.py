@@ -4,7 +4,8 @@ import pytest
 from unittest.mock import AsyncMock, Mock, patch
 
 from doc2mcp.config import WebSource
-from doc2mcp.fetchers.web import WebFetcher
+from doc2mcp.fetchers import web
+from doc2mcp.fetchers.web import WebFetcher, canonicalize_url
 
 
 class TestWebFetcher:
@@ -315,6 +316,43 @@ class TestWebFetcher:
         assert "Real content" in content
         assert "enable JavaScript" not in content
 
+    @pytest.mark.skipif(not web.SELECTOLAX_AVAILABLE, reason="selectolax not installed")
+    def test_parsers_extract_same_content(self, fetcher, monkeypatch):
+        """Test that the selectolax and BeautifulSoup paths agree."""
+        html = """
+        <html>
+        <head><title>Guide</title></head>
+        <body>
+            <nav>Menu</nav>
+            <main><h1>Install</h1><p>Run <code>pip install</code> first.</p>
+            <div class="ad">Buy now</div><a href="/next">Next page</a></main>
+        </body>
+        </html>
+        """
+        selectors = {"content": "main", "exclude": "nav, .ad"}
+
+        fast = fetcher._extract_content(html, selectors)
+        fast_page = web._parse_html(html, "https://example.com/", None, None)
+        monkeypatch.setattr(web, "SELECTOLAX_AVAILABLE", False)
+        slow = fetcher._extract_content(html, selectors)
+        slow_page = web._parse_html(html, "https://example.com/", None, None)
+
+        assert fast.split() == slow.split()
+        assert "Buy now" not in fast and "Menu" not in fast
+        assert fast_page[:2] == slow_page[:2]
+        assert fast_page[2].split() == slow_page[2].split()
+
+    def test_extract_markdown_links_dedupes(self, fetcher):
+        """Test that repeated, image and anchor links are dropped from markdown."""
+        content = (
+            "[Intro](/intro) [Intro again](/intro) [Logo](/logo.PNG) [Top](#top) "
+            "[Intro variant](https://example.com/intro#part) [Other](https://other.com/x)"
+        )
+
+        links = fetcher._extract_markdown_links(content, "https://example.com/", "example.com")
+
+        assert links == [{"url": "https://example.com/intro", "text": "Intro"}]
+
     def test_custom_timeout(self):
         """Test creating fetcher with custom timeout."""
         fetcher = WebFetcher(timeout=60)
@@ -404,3 +442,21 @@ const example = 'code';
             assert "Line 1" in content
             assert "Line 2" in content
             assert "Line 3" in content
+
+
+class TestCanonicalizeUrl:
+    """Tests for URL canonicalization."""
+
+    def test_variants_of_one_page_match(self):
+        """Test that fragments, tracking parameters and query order are ignored."""
+        assert canonicalize_url("HTTPS://Docs.Example.com/api?b=2&a=1&utm_source=x#auth") == (
+            "https://docs.example.com/api?a=1&b=2"
+        )
+        assert canonicalize_url("https://docs.example.com") == "https://docs.example.com/"
+
+    def test_path_and_non_http_urls_kept(self):
+        """Test that trailing slashes and non-HTTP URLs are left alone."""
+        assert canonicalize_url("https://docs.example.com/guide/") == (
+            "https://docs.example.com/guide/"
+        )
+        assert canonicalize_url("mailto:team@example.com") == "mailto:team@example.com"
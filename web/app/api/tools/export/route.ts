@@ -1,3 +1,4 @@
+import { createHash } from 'crypto'
 import { NextResponse } from 'next/server'
 import { prisma } from '@/lib/db'
 
@@ -7,6 +8,9 @@ import { prisma } from '@/lib/db'
  * 
  * Optional query params:
  * - userId: Filter tools by user ID (for multi-tenant setups)
+ *
+ * Responses carry an ETag; a request whose If-None-Match matches gets an
+ * empty 304, so unchanged configs aren't downloaded again.
  */
 export async function GET(request: Request) {
   try {
@@ -56,13 +60,22 @@ export async function GET(request: Request) {
       }
     }
 
-    return NextResponse.json({
+    const body = JSON.stringify({
       tools: toolsConfig,
       settings: {
         max_content_length: 50000,
         cache_ttl: 3600,
       },
     })
+    const etag = `"${createHash('sha1').update(body).digest('base64url')}"`
+
+    if (request.headers.get('if-none-match') === etag) {
+      return new NextResponse(null, { status: 304, headers: { ETag: etag } })
+    }
+
+    return new NextResponse(body, {
+      headers: { 'Content-Type': 'application/json', ETag: etag },
+    })
   } catch (error) {
     console.error('Error exporting tools:', error)
     return NextResponse.json({ error: 'Failed to export tools' }, { status: 500 })
@@ -129,11 +129,16 @@ export function JobsList({ jobs: initialJobs }: { jobs: Job[] }) {
     websocket.onmessage = (event) => {
       const data = JSON.parse(event.data)
       
-      if (data.type === 'log') {
+      // Updates arrive batched; the last log event carries the latest state
+      // (answer chunks streamed during search carry no progress)
+      const events = data.type === 'logs' ? data.events : [data]
+      const update = events.filter((e: any) => e.type === 'log').pop()
+
+      if (update && update.type === 'log') {
         // Update job in list
         setJobs(prev => prev.map(job => 
           job.id === jobId 
-            ? { ...job, progress: data.progress, status: data.status }
+            ? { ...job, progress: update.progress, status: update.status }
             : job
         ))
       }